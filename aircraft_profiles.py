@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from dataset_snapshot import LazyRecords, StringTable, load_snapshot
+
+# Jet A-1 at 15 C, used to turn catalog fuel volumes into mass
+FUEL_DENSITY_KG_PER_L = 0.8
+
+# Conversion factors into the units the simulators work in
+UNIT_FACTORS = {
+    "kg": {"kg": 1, "lb": 0.45359237, "lbs": 0.45359237, "l": FUEL_DENSITY_KG_PER_L, "usg": 3.785411784 * FUEL_DENSITY_KG_PER_L},
+    "m": {"m": 1, "ft": 0.3048},
+    "ft": {"ft": 1, "m": 1 / 0.3048},
+    "kt": {"kt": 1, "kts": 1, "km/h": 1 / 1.852},
+    "fpm": {"fpm": 1, "ft/min": 1, "m/s": 196.850394},
+    "kg/hr": {"kg/hr": 1, "kg/h": 1, "lb/hr": 0.45359237},
+    "min": {"min": 1, "hr": 60}
+}
+
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive form of a category or model name."""
+    return " ".join(str(name).lower().split())
+
+def convert_unit(value, unit, target):
+    factors = UNIT_FACTORS.get(target, {})
+    factor = factors.get(normalize_name(unit)) if unit else None
+    return value * factor if factor is not None else value
+
+def parse_power(val):
+    if isinstance(val, str) and "x" in val.lower():
+        a, b = val.lower().split("x")
+        return float(a) * float(b)
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return 0
+
+
+class AircraftCatalog:
+    """
+    aircraft_parameters.json with a normalized-name index. `version` is a
+    content hash, so profiles compiled from it can be memoized safely.
+    """
+
+    def __init__(self, data, version=None):
+
+        self.data = data
+        self.version = version or hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+        self.index = {}
+        self.models = {}
+
+        for category, models in data.items():
+            for model in models:
+                self.index[normalize_name(category), normalize_name(model)] = (category, model)
+                self.models.setdefault(normalize_name(model), (category, model))
+
+    def find(self, ac_name, ac_type=None):
+        """(category, model) for a model name, optionally within one category."""
+
+        if ac_type is None:
+            found = self.models.get(normalize_name(ac_name))
+        else:
+            found = self.index.get((normalize_name(ac_type), normalize_name(ac_name)))
+
+        if found is None:
+            raise KeyError(f"Unknown aircraft: {ac_name} ({ac_type})")
+
+        return found
+
+    def params(self, ac_name, ac_type=None):
+        category, model = self.find(ac_name, ac_type)
+        return self.data[category][model]
+
+    def compile(self, category, model):
+        return AircraftProfile(model, category, self.data[category][model])
+
+
+class AircraftProfile:
+    """
+    Compiled, immutable aircraft profile. Attribute access replaces the
+    string-keyed dicts the simulators used to rebuild per run; derived
+    constants are computed once here. Recompile from the catalog to change
+    a value.
+    """
+
+    __slots__ = (
+        "name", "category", "type",
+        "empty", "mtow", "mlw",
+        "takeoff_base", "landing_base",
+        "roc", "roc_loss", "cruise",
+        "fuel_flow", "climb_fuel_rate", "reserve_min", "fuel_capacity_kg",
+        "engine_power", "hover_ceiling_oge", "to_da_sensitivity",
+        "min_climb_margin", "min_power_margin", "min_visibility", "max_crosswind",
+        "cg_min", "cg_max", "cg_current",
+        # Derived constants
+        "reserve_fuel", "climb_gradient_sl", "hours_per_nm", "fuel_per_nm",
+        # Every value above, for cache keys
+        "key"
+    )
+
+    def __init__(self, name, category, params):
+
+        def get_val(key, default=0, unit=None):
+            entry = params.get(key, {})
+            value = entry.get("value")
+            if value is None:
+                return default
+            if unit is not None and isinstance(value, (int, float)):
+                return convert_unit(value, entry.get("unit"), unit)
+            return value
+
+        fields = {
+            "name": name,
+            "category": category,
+            "type": "fixed" if "fixed" in category.lower() else "rotary",
+            "empty": get_val("Empty Weight (OEW)", unit="kg") or get_val("Empty Weight", unit="kg"),
+            "mtow": get_val("Max Takeoff Weight (MTOW)", unit="kg") or get_val("MTOW", unit="kg"),
+            "mlw": get_val("Max Landing Weight", unit="kg") or get_val("MTOW", unit="kg"),
+            "takeoff_base": get_val("Takeoff Distance", unit="m"),
+            "landing_base": get_val("Landing Distance", unit="m"),
+            "roc": get_val("Rate of Climb", unit="fpm") or get_val("ROC", unit="fpm"),
+            "roc_loss": get_val("ROC loss per 1000 ft") / 100,
+            "cruise": get_val("Cruise Speed", unit="kt") or get_val("Cruised Speed", unit="kt"),
+            "fuel_flow": get_val("Cruise", unit="kg/hr") or get_val("Phase Cruise", unit="kg/hr"),
+            "climb_fuel_rate": get_val("Phase Climb", unit="kg/hr") or get_val("Cruise", unit="kg/hr"),
+            "reserve_min": get_val("Reserve Policy", unit="min") or get_val("Phase Reserve", unit="min") or 30,
+            "fuel_capacity_kg": get_val("Fuel Capacity", unit="kg"),
+            "engine_power": parse_power(get_val("Max Continuous Power")),
+            "hover_ceiling_oge": get_val("Hover Ceiling OGE", unit="ft"),
+            "to_da_sensitivity": get_val("Takeoff Increase per 1000 ft DA") / 100,
+            "min_climb_margin": 0.01,
+            "min_power_margin": 0.05,
+            "min_visibility": 5,
+            "max_crosswind": get_val("Max Crosswind", unit="kt") or 20,
+            "cg_min": 20,
+            "cg_max": 30,
+            "cg_current": 25
+        }
+
+        cruise = fields["cruise"]
+        fields["reserve_fuel"] = fields["fuel_flow"] * (fields["reserve_min"] / 60)
+        fields["climb_gradient_sl"] = fields["roc"] / (cruise * 101.27) if cruise else 0
+        fields["hours_per_nm"] = 1 / cruise if cruise > 0 else 0
+        fields["fuel_per_nm"] = fields["fuel_flow"] * fields["hours_per_nm"]
+        self._assign(fields)
+
+    @classmethod
+    def from_fields(cls, fields):
+        """Profile from already compiled values (name, category, type and NUMERIC_FIELDS)."""
+
+        profile = cls.__new__(cls)
+        profile._assign(fields)
+        return profile
+
+    def _assign(self, fields):
+        fields["key"] = tuple(fields.items())
+
+        for slot, value in fields.items():
+            object.__setattr__(self, slot, value)
+
+    def __setattr__(self, slot, value):
+        raise AttributeError("AircraftProfile is immutable; recompile it from the catalog")
+
+    def __repr__(self):
+        return f"AircraftProfile({self.name!r}, {self.category!r})"
+
+    def get(self, attr, default=None):
+        return getattr(self, attr, default)
+
+
+# Compiled numeric profile values, in slot order (see CatalogSnapshot)
+NUMERIC_FIELDS = tuple(slot for slot in AircraftProfile.__slots__ if slot not in ("name", "category", "type", "key"))
+
+# Bump when AircraftProfile compilation changes, so snapshots get recompiled
+PROFILE_FORMAT = 1
+
+
+def compile_catalog_snapshot(path):
+    """
+    (meta, arrays, strings) for aircraft_parameters.json: one float64 row
+    of NUMERIC_FIELDS per model (plus an int mask so integral catalog
+    values come back as ints), and the raw params of each model as JSON.
+    """
+    with open(path) as f:
+        catalog = AircraftCatalog(json.load(f))
+
+    strings = StringTable()
+    names, values, is_int = [], [], []
+
+    for category, models in catalog.data.items():
+        for model, params in models.items():
+            profile = catalog.compile(category, model)
+            row = [getattr(profile, field) for field in NUMERIC_FIELDS]
+
+            names.append([strings.add(category), strings.add(model), strings.add(json.dumps(params))])
+            values.append(row)
+            is_int.append([isinstance(value, int) for value in row])
+
+    meta = {"version": catalog.version, "fields": NUMERIC_FIELDS}
+    arrays = {
+        "names": np.array(names, dtype=np.int32).reshape(-1, 3),
+        "values": np.array(values, dtype=np.float64).reshape(-1, len(NUMERIC_FIELDS)),
+        "is_int": np.array(is_int, dtype=bool).reshape(-1, len(NUMERIC_FIELDS))
+    }
+
+    return meta, arrays, strings
+
+
+class CatalogSnapshot(AircraftCatalog):
+    """
+    AircraftCatalog over a binary snapshot (see dataset_snapshot). Profiles
+    are rebuilt from fixed-dtype rows without touching the nested params;
+    a model's raw params are decoded only when something asks for them.
+    """
+
+    def __init__(self, snapshot):
+
+        self.snapshot = snapshot
+        self.rows = {}
+
+        data = {}
+        for row, (category_id, model_id, params_id) in enumerate(snapshot.array("names").tolist()):
+            category, model = snapshot.string(category_id), snapshot.string(model_id)
+            data.setdefault(category, {})[model] = params_id
+            self.rows[category, model] = row
+
+        super().__init__(
+            {category: LazyRecords(snapshot, models) for category, models in data.items()},
+            snapshot.meta["version"]
+        )
+
+    def compile(self, category, model):
+
+        row = self.rows[category, model]
+        values = self.snapshot.array("values")[row].tolist()
+        is_int = self.snapshot.array("is_int")[row].tolist()
+
+        fields = {
+            "name": model,
+            "category": category,
+            "type": "fixed" if "fixed" in category.lower() else "rotary"
+        }
+        for field, value, integral in zip(NUMERIC_FIELDS, values, is_int):
+            fields[field] = int(value) if integral else value
+
+        return AircraftProfile.from_fields(fields)
+
+
+_catalogs = {}
+_profiles = {}
+
+def load_catalog(path="aircraft_parameters.json"):
+    """Catalog for `path` (through its binary snapshot), re-read only when the file changes."""
+
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _catalogs.get(path)
+    if cached is None or cached[0] != stamp:
+        # The profile format is part of the kind, so a new compiler writes a new snapshot
+        snapshot = load_snapshot(f"aircraft-v{PROFILE_FORMAT}", [path], compile_catalog_snapshot)
+        cached = (stamp, CatalogSnapshot(snapshot))
+        _catalogs[path] = cached
+
+    return cached[1]
+
+def build_aircraft(ac_name, ac_type, catalog=None):
+    """Compiled profile for a fleet entry, memoized per catalog version."""
+
+    catalog = catalog or load_catalog()
+    category, model = catalog.find(ac_name, ac_type)
+
+    key = (catalog.version, category, model)
+    if key not in _profiles:
+        _profiles[key] = catalog.compile(category, model)
+
+    return _profiles[key]
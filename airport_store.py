@@ -0,0 +1,390 @@
+import argparse
+import json
+import math
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from aircraft_profiles import AircraftCatalog, normalize_name
+from dataset_snapshot import LazyRecords
+from distance_matrix import EARTH_RADIUS_KM, NM_PER_KM, DistanceMatrix, haversine_matrix_nm
+from mission_inputs import load_json
+
+DEFAULT_STORE_PATH = "aerobridge.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS airports (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    icao TEXT,
+    name_norm TEXT,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    record TEXT NOT NULL,
+    UNIQUE (key, kind)
+);
+CREATE INDEX IF NOT EXISTS airports_icao ON airports (icao);
+CREATE INDEX IF NOT EXISTS airports_name ON airports (name_norm);
+CREATE INDEX IF NOT EXISTS airports_kind ON airports (kind, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS airports_bbox USING rtree (id, min_lat, max_lat, min_lon, max_lon);
+
+CREATE TABLE IF NOT EXISTS weather (
+    airport_id INTEGER NOT NULL REFERENCES airports (id),
+    observed_at INTEGER NOT NULL,
+    weather TEXT NOT NULL,
+    PRIMARY KEY (airport_id, observed_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS aircraft (
+    category TEXT NOT NULL,
+    model TEXT NOT NULL,
+    name_norm TEXT NOT NULL,
+    params TEXT NOT NULL,
+    PRIMARY KEY (category, model)
+);
+CREATE INDEX IF NOT EXISTS aircraft_name ON aircraft (name_norm);
+
+CREATE TABLE IF NOT EXISTS extras (
+    source TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+# Airport kind -> its table in location_params / alternate_airports data
+KINDS = {"location": "locations", "alternate": "alternates"}
+
+
+def to_timestamp(when):
+    """Unix seconds for an ISO 8601 string, datetime or number (None -> 0, the static baseline)."""
+
+    if when is None:
+        return 0
+    if isinstance(when, (int, float)):
+        return int(when)
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp())
+
+
+class AirportStore:
+    """
+    SQLite store of airports, per-hour weather and aircraft, indexed by
+    ICAO, normalized name and a lat/lon R-tree, with weather keyed by
+    (airport, observation time).
+
+    inputs() serves the same location_data / alternate_data / distances
+    structure as mission_inputs.load_inputs(), so the simulators run on it
+    unchanged; airports are read on first access, with the weather valid
+    at the requested time.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connect(self):
+        # Connections must not cross a fork, so each process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    # ---- Import ----
+
+    def import_airports(self, location_data, alternate_data, observed_at=None):
+        """
+        Loads location_params / alternate_airports data (replacing stored
+        airports of the same key). Their weather becomes the observation at
+        `observed_at` (default: the static baseline valid at any time).
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for kind, table in KINDS.items():
+                    data = location_data if kind == "location" else alternate_data
+                    for key, airport in data[table].items():
+                        self._put_airport(conn, kind, key, airport, to_timestamp(observed_at))
+
+                # Everything else in the files (e.g. per-destination alternate lists)
+                conn.executemany("INSERT OR REPLACE INTO extras VALUES (?, ?)", [
+                    ("location", json.dumps(dict(location_data, locations=None))),
+                    ("alternate", json.dumps(dict(alternate_data, alternates=None)))
+                ])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _put_airport(self, conn, kind, key, airport, observed_at):
+
+        lat, lon = airport["coords"]
+        existing = conn.execute("SELECT id FROM airports WHERE key = ? AND kind = ?", (key, kind)).fetchone()
+
+        row = (
+            airport.get("icao"),
+            normalize_name(airport.get("name", key)),
+            lat,
+            lon,
+            json.dumps(dict(airport, weather=None) if "weather" in airport else airport)
+        )
+
+        if existing is None:
+            airport_id = conn.execute(
+                "INSERT INTO airports (icao, name_norm, lat, lon, record, key, kind) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                row + (key, kind)
+            ).lastrowid
+        else:
+            airport_id = existing[0]
+            conn.execute(
+                "UPDATE airports SET icao = ?, name_norm = ?, lat = ?, lon = ?, record = ? WHERE id = ?",
+                row + (airport_id,)
+            )
+
+        conn.execute("INSERT OR REPLACE INTO airports_bbox VALUES (?, ?, ?, ?, ?)", (airport_id, lat, lat, lon, lon))
+
+        if "weather" in airport:
+            conn.execute(
+                "INSERT OR REPLACE INTO weather VALUES (?, ?, ?)",
+                (airport_id, observed_at, json.dumps(airport["weather"]))
+            )
+
+    def add_weather(self, key, observed_at, weather):
+        """Stores one observation (a full location_params style weather dict) for every record of an airport."""
+
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute("SELECT id FROM airports WHERE key = ?", (key,)).fetchall()
+            if not rows:
+                raise KeyError(f"Unknown airport: {key}")
+            conn.executemany(
+                "INSERT OR REPLACE INTO weather VALUES (?, ?, ?)",
+                [(airport_id, to_timestamp(observed_at), json.dumps(weather)) for airport_id, in rows]
+            )
+
+    def import_catalog(self, catalog_data):
+        """Loads aircraft_parameters.json data."""
+
+        rows = [
+            (category, model, normalize_name(model), json.dumps(params))
+            for category, models in catalog_data.items()
+            for model, params in models.items()
+        ]
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT OR REPLACE INTO aircraft VALUES (?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+
+    # ---- Lookups ----
+
+    def airport(self, key, at=None, kind=None):
+        """
+        Airport dict as in location_params.json, with the latest weather at
+        or before `at` (default: latest). A key in both files resolves to
+        its location record unless `kind` says otherwise.
+        """
+        rows = self._query(
+            "SELECT a.record, w.weather FROM airports a "
+            "LEFT JOIN weather w ON w.airport_id = a.id AND w.observed_at = ("
+            "SELECT MAX(observed_at) FROM weather WHERE airport_id = a.id AND observed_at <= ?) "
+            "WHERE a.key = ? AND a.kind = COALESCE(?, a.kind) ORDER BY a.kind != 'location' LIMIT 1",
+            (to_timestamp(at) if at is not None else 2 ** 62, key, kind)
+        )
+        if not rows:
+            raise KeyError(key)
+
+        record, weather = rows[0]
+        airport = json.loads(record)
+
+        if "weather" in airport:
+            if weather is None:
+                raise LookupError(f"No weather for {key} at or before {at}")
+            airport["weather"] = json.loads(weather)
+
+        return airport
+
+    def keys(self, kind=None):
+        if kind is None:
+            return [key for key, in self._query("SELECT key FROM airports GROUP BY key ORDER BY MIN(id)")]
+        return [key for key, in self._query("SELECT key FROM airports WHERE kind = ? ORDER BY id", (kind,))]
+
+    def find(self, icao=None, name=None):
+        """Airport keys by ICAO code and/or (case/space-insensitive) name."""
+
+        clauses, params = [], []
+        if icao is not None:
+            clauses.append("icao = ?")
+            params.append(icao.upper())
+        if name is not None:
+            clauses.append("name_norm = ?")
+            params.append(normalize_name(name))
+
+        where = " AND ".join(clauses) or "1"
+        return [key for key, in self._query(
+            f"SELECT key FROM airports WHERE {where} GROUP BY key ORDER BY MIN(id)", params
+        )]
+
+    def within(self, min_lat, max_lat, min_lon, max_lon):
+        """Airport keys inside a lat/lon box (R-tree lookup)."""
+
+        return [key for key, in self._query(
+            "SELECT a.key FROM airports_bbox b JOIN airports a ON a.id = b.id "
+            "WHERE b.min_lat <= ? AND b.max_lat >= ? AND b.min_lon <= ? AND b.max_lon >= ? "
+            "GROUP BY a.key ORDER BY MIN(a.id)",
+            (max_lat, min_lat, max_lon, min_lon)
+        )]
+
+    def nearby(self, lat, lon, radius_nm):
+        """(key, distance_nm) of airports within a great-circle radius, nearest first."""
+
+        dlat = math.degrees(radius_nm / NM_PER_KM / EARTH_RADIUS_KM)
+        dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+
+        keys = self.within(lat - dlat, lat + dlat, lon - dlon, lon + dlon)
+        if not keys:
+            return []
+
+        # Location coordinates win for keys in both files, as in the distance matrix
+        coords = dict(
+            (key, (a_lat, a_lon))
+            for key, a_lat, a_lon in self._query(
+                f"SELECT key, lat, lon FROM airports WHERE key IN ({','.join('?' * len(keys))}) "
+                "ORDER BY kind = 'location'",
+                keys
+            )
+        )
+        lats, lons = zip(*(coords[key] for key in keys))
+        distances = haversine_matrix_nm([lat], [lon], lats, lons)[0].tolist()
+
+        return sorted(((k, d) for k, d in zip(keys, distances) if d <= radius_nm), key=lambda item: item[1])
+
+    def catalog(self):
+        """AircraftCatalog over the stored aircraft."""
+
+        data = {}
+        for category, model, params in self._query("SELECT category, model, params FROM aircraft ORDER BY rowid"):
+            data.setdefault(category, {})[model] = json.loads(params)
+        return AircraftCatalog(data)
+
+    # ---- Repository ----
+
+    def inputs(self, mission_data=None, at=None):
+        """
+        load_inputs()-shaped dict over the store: airport mappings read (and
+        then keep) each airport with the weather valid at `at`.
+        """
+        view = _StoreRecords(self, at)
+        extras = dict(self._query("SELECT source, data FROM extras"))
+
+        location_data = json.loads(extras["location"])
+        location_data["locations"] = LazyRecords(view, {key: (key, "location") for key in self.keys("location")})
+
+        alternate_data = json.loads(extras["alternate"])
+        alternate_data["alternates"] = LazyRecords(view, {key: (key, "alternate") for key in self.keys("alternate")})
+
+        # Matrix order as in build_distance_matrix: locations, then alternates not already listed
+        rows = self._query(
+            "SELECT key, lat, lon FROM airports a WHERE kind = 'location' OR NOT EXISTS ("
+            "SELECT 1 FROM airports l WHERE l.key = a.key AND l.kind = 'location') "
+            "ORDER BY kind != 'location', id"
+        )
+        keys = [key for key, _, _ in rows]
+        coords = [[lat, lon] for _, lat, lon in rows]
+        lats, lons = [c[0] for c in coords], [c[1] for c in coords]
+
+        return {
+            "location_data": location_data,
+            "mission_data": mission_data,
+            "alternate_data": alternate_data,
+            "distances": DistanceMatrix.from_arrays(keys, coords, haversine_matrix_nm(lats, lons, lats, lons))
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class _StoreRecords:
+    """Record source for LazyRecords: one airport at a fixed time."""
+
+    def __init__(self, store, at):
+        self.store = store
+        self.at = at
+
+    def record(self, key_kind):
+        key, kind = key_kind
+        return self.store.airport(key, self.at, kind)
+
+
+def load_store_inputs(store_path=DEFAULT_STORE_PATH, mission_path="payloads.json", at=None):
+    """Like mission_inputs.load_inputs(), with airports and weather from an AirportStore."""
+
+    return AirportStore(store_path).inputs(load_json(mission_path) if mission_path else None, at)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="SQLite airport / weather / aircraft store")
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH, help=f"store file (default: {DEFAULT_STORE_PATH})")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("import", help="load location_params, alternate_airports and aircraft_parameters")
+    load.add_argument("--observed-at", help="time of the weather in the files (default: static baseline)")
+
+    weather = commands.add_parser("weather", help="add observations from a JSONL file")
+    weather.add_argument("file", help='lines of {"airport": key, "observed_at": ISO time, "weather": {...}}')
+
+    find = commands.add_parser("find", help="look up airports")
+    find.add_argument("--icao")
+    find.add_argument("--name")
+    find.add_argument("--near", nargs=3, type=float, metavar=("LAT", "LON", "NM"))
+    find.add_argument("--at", help="weather time (default: latest)")
+
+    args = parser.parse_args()
+    store = AirportStore(args.db)
+
+    if args.command == "import":
+        store.import_airports(load_json("location_params.json"), load_json("alternate_airports.json"), args.observed_at)
+        store.import_catalog(load_json("aircraft_parameters.json"))
+        print(f"Imported {len(store.keys())} airports into {args.db}")
+
+    elif args.command == "weather":
+        count = 0
+        with open(args.file) as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    store.add_weather(row["airport"], row["observed_at"], row["weather"])
+                    count += 1
+        print(f"Stored {count} weather observations")
+
+    else:
+        if args.near:
+            found = store.nearby(*args.near)
+        else:
+            found = [(key, None) for key in store.find(args.icao, args.name)]
+
+        for key, distance_nm in found:
+            airport = store.airport(key, args.at)
+            print(json.dumps({"key": key, "distance_nm": distance_nm, **airport}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from planning_service import SEARCH_MODES, check_mission, plan_mission, warm_inputs
+from plan_cache import DEFAULT_CACHE_PATH
+from planning_context import fork_context
+
+
+def iter_missions(lines):
+    """(line number, mission or parse error) for each non-blank JSONL line, read lazily."""
+
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+def plan_record(line_no, mission_data, search="bnb", top_k=3, location_path="location_params.json",
+                alternate_path="alternate_airports.json", cache_path=None):
+    """One output line: the planning output, or the error that stopped this mission."""
+
+    record = {"line": line_no, "mission_id": None}
+
+    try:
+        if isinstance(mission_data, Exception):
+            raise ValueError(f"Invalid JSON: {mission_data}")
+
+        check_mission(mission_data, search)
+        record["mission_id"] = mission_data["mission_id"]
+        record["result"] = plan_mission(mission_data, search, top_k, location_path, alternate_path, cache_path)
+
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    return record
+
+def plan_batch(missions, search="bnb", top_k=3, jobs=2, location_path="location_params.json",
+               alternate_path="alternate_airports.json", cache_path=None):
+    """
+    Plans (line number, mission) pairs, yielding one record per mission in
+    input order.
+
+    Workers fork from a parent that already holds the warm inputs, and at
+    most a few missions per worker are in flight, so memory stays flat
+    however long the stream is. jobs > 1 needs the POSIX fork start method;
+    jobs <= 1 plans in this process on any platform.
+    """
+    if jobs <= 1:
+        for line_no, mission_data in missions:
+            yield plan_record(line_no, mission_data, search, top_k, location_path, alternate_path, cache_path)
+        return
+
+    warm_inputs(location_path, alternate_path)
+
+    with ProcessPoolExecutor(jobs, mp_context=fork_context()) as pool:
+
+        pending = deque()
+
+        for line_no, mission_data in missions:
+            pending.append(pool.submit(
+                plan_record, line_no, mission_data, search, top_k, location_path, alternate_path, cache_path
+            ))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Plan a JSONL stream of missions (one payloads.json per line)")
+    parser.add_argument("missions", nargs="?", default="-", help="JSONL mission file (default: stdin)")
+    parser.add_argument("--output", default="-", help="JSONL result file (default: stdout)")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="bnb")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=2, help="planner worker processes (default: 2)")
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+        help=f"reuse plans from a SQLite plan cache (default: {DEFAULT_CACHE_PATH})"
+    )
+    args = parser.parse_args()
+
+    source = sys.stdin if args.missions == "-" else open(args.missions)
+    sink = sys.stdout if args.output == "-" else open(args.output, "w")
+
+    planned = failed = 0
+    start = time.perf_counter()
+
+    try:
+        for record in plan_batch(iter_missions(source), args.search, args.top_k, args.jobs, cache_path=args.cache):
+            sink.write(json.dumps(record) + "\n")
+            sink.flush()
+
+            if "error" in record:
+                failed += 1
+            else:
+                planned += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(
+        f"Batch planning completed: {planned} planned, {failed} failed in {time.perf_counter() - start:.2f} s",
+        file=sys.stderr
+    )
+
+if __name__ == "__main__":
+    main()
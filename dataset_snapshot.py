@@ -0,0 +1,234 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import MutableMapping
+
+import numpy as np
+
+MAGIC = b"AEROSNAP"
+
+# Bump when the container layout changes; older files are rebuilt
+SNAPSHOT_FORMAT = 1
+
+# Snapshots live next to their first source file
+SNAPSHOT_DIR = ".aerobridge_cache"
+
+_PREFIX = struct.Struct("<8sII")
+
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class StringTable:
+    """Strings appended once and addressed by integer ID."""
+
+    def __init__(self):
+        self.ids = {}
+        self.items = []
+
+    def add(self, text):
+        if text not in self.ids:
+            self.ids[text] = len(self.items)
+            self.items.append(text)
+        return self.ids[text]
+
+    def arrays(self):
+        encoded = [s.encode() for s in self.items]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _pack_header(kind, sources, meta, layout):
+    """Prefix and JSON header, padded so the arrays after it stay 8-byte aligned."""
+
+    header = json.dumps({
+        "kind": kind,
+        "sources": sources,
+        "meta": meta,
+        "arrays": layout
+    }).encode()
+    header += b" " * (-(_PREFIX.size + len(header)) % 8)
+
+    return _PREFIX.pack(MAGIC, SNAPSHOT_FORMAT, len(header)) + header
+
+def write_snapshot(f, kind, sources, meta, arrays, strings):
+    """
+    Writes a snapshot to a binary file object: a JSON header (format,
+    sources, meta, array layout) followed by 8-byte aligned raw arrays,
+    the string table included.
+    """
+    offsets, data = strings.arrays()
+    arrays = dict(arrays, string_offsets=offsets, string_data=data)
+
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        layout[name] = [array.dtype.str, list(array.shape), position]
+        position += -(-array.nbytes // 8) * 8
+
+    f.write(_pack_header(kind, sources, meta, layout))
+    for array in arrays.values():
+        f.write(array.tobytes())
+        f.write(b"\0" * (-array.nbytes % 8))
+
+
+class Snapshot:
+    """
+    Read side of a snapshot over a memory map (or bytes). Arrays are
+    read-only views created on first access; nothing is copied up front.
+    """
+
+    def __init__(self, buffer):
+
+        magic, version, header_len = _PREFIX.unpack_from(buffer)
+        if magic != MAGIC or version != SNAPSHOT_FORMAT:
+            raise ValueError("Not a current-format dataset snapshot")
+
+        header = json.loads(bytes(buffer[_PREFIX.size:_PREFIX.size + header_len]))
+
+        self.buffer = buffer
+        self.kind = header["kind"]
+        self.sources = header["sources"]
+        self.meta = header["meta"]
+
+        self.layout = header["arrays"]
+        self.base = _PREFIX.size + header_len
+        self._arrays = {}
+
+    def array(self, name):
+        if name not in self._arrays:
+            dtype, shape, offset = self.layout[name]
+            count = int(np.prod(shape, dtype=np.int64))
+            self._arrays[name] = np.frombuffer(
+                self.buffer, dtype=dtype, count=count, offset=self.base + offset
+            ).reshape(shape)
+        return self._arrays[name]
+
+    def string(self, string_id):
+        offsets = self.array("string_offsets")
+        start, stop = int(offsets[string_id]), int(offsets[string_id + 1])
+        return self.array("string_data")[start:stop].tobytes().decode()
+
+    def record(self, string_id):
+        """A JSON-encoded entry of the string table, decoded."""
+        return json.loads(self.string(string_id))
+
+
+class LazyRecords(MutableMapping):
+    """
+    Mapping of key -> JSON record whose values are decoded from a snapshot
+    on first access (and then kept, so in-place updates stick). Copies and
+    pickles are plain dicts.
+    """
+
+    def __init__(self, snapshot, record_ids):
+        self._snapshot = snapshot
+        self._ids = record_ids
+        self._decoded = {}
+
+    def __getitem__(self, key):
+        record = self._decoded.get(key)
+        if record is None:
+            # setdefault keeps one object per key when threads race here
+            record = self._decoded.setdefault(key, self._snapshot.record(self._ids[key]))
+        return record
+
+    def __setitem__(self, key, value):
+        self._ids.setdefault(key, None)
+        self._decoded[key] = value
+
+    def __delitem__(self, key):
+        del self._ids[key]
+        self._decoded.pop(key, None)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def __reduce__(self):
+        return dict, (dict(self.items()),)
+
+    def __repr__(self):
+        return f"LazyRecords({list(self._ids)})"
+
+
+def snapshot_path(kind, source_paths):
+    """Snapshot file for a kind of dataset built from these sources."""
+
+    digest = hashlib.sha1("\0".join(os.path.abspath(p) for p in source_paths).encode()).hexdigest()[:12]
+    directory = os.path.join(os.path.dirname(os.path.abspath(source_paths[0])), SNAPSHOT_DIR)
+
+    return os.path.join(directory, f"{kind}-{digest}.snap")
+
+def _open(path):
+    try:
+        with open(path, "rb") as f:
+            return Snapshot(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except (OSError, ValueError, struct.error):
+        return None
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique per thread: the pipeline's thread pool may load inputs concurrently
+    temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp, "wb") as f:
+        write(f)
+    os.replace(temp, path)
+
+def load_snapshot(kind, source_paths, compile_snapshot):
+    """
+    Memory-mapped snapshot of `source_paths`. Sources whose mtime/size
+    match the ones recorded in the snapshot are trusted as is; otherwise
+    their content hashes are compared, so a touched but unchanged source
+    (e.g. after a checkout) only rewrites the recorded stamps, and the
+    snapshot is recompiled only when some content changed.
+
+    `compile_snapshot(*source_paths)` returns (meta, arrays, StringTable).
+    If the snapshot directory is not writable the snapshot is built in
+    memory instead.
+    """
+    path = snapshot_path(kind, source_paths)
+    stamps = [file_stamp(p) for p in source_paths]
+
+    snapshot = _open(path)
+    if snapshot is not None and snapshot.kind == kind and [s[1] for s in snapshot.sources] == stamps:
+        return snapshot
+
+    sources = [[os.path.basename(p), stamp, file_hash(p)] for p, stamp in zip(source_paths, stamps)]
+
+    if snapshot is not None and snapshot.kind == kind and [s[2] for s in snapshot.sources] == [s[2] for s in sources]:
+        data = snapshot.buffer[snapshot.base:]
+        try:
+            _write_atomic(path, lambda f: f.write(_pack_header(kind, sources, snapshot.meta, snapshot.layout) + data))
+        except OSError:
+            return snapshot
+        return _open(path)
+
+    meta, arrays, strings = compile_snapshot(*source_paths)
+
+    try:
+        _write_atomic(path, lambda f: write_snapshot(f, kind, sources, meta, arrays, strings))
+    except OSError:
+        f = io.BytesIO()
+        write_snapshot(f, kind, sources, meta, arrays, strings)
+        return Snapshot(f.getvalue())
+
+    return _open(path)
@@ -0,0 +1,251 @@
+import json
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+NM_PER_KM = 0.539957
+EARTH_RADIUS_NM = EARTH_RADIUS_KM * NM_PER_KM
+
+# nearest_within() scans airport sets up to this size instead of indexing them
+SCAN_MAX = 32
+
+
+def haversine_matrix_nm(lat_a, lon_a, lat_b, lon_b):
+    """
+    Great-circle distances in nautical miles between every point of a
+    (rows) and every point of b (columns). Same formula as haversine_nm.
+    """
+    phi1 = np.radians(np.asarray(lat_a, dtype=float))[:, None]
+    phi2 = np.radians(np.asarray(lat_b, dtype=float))[None, :]
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.asarray(lon_b, dtype=float))[None, :] - np.radians(np.asarray(lon_a, dtype=float))[:, None]
+
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    a = np.clip(a, 0, 1)
+
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c * NM_PER_KM
+
+
+def unit_vectors(coords):
+    """(lat, lon) rows -> 3-D unit vectors; chord length grows with great-circle distance."""
+
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+class SphereKDTree:
+    """
+    KD-tree over airport coordinates, stored as unit vectors so a
+    great-circle radius becomes a chord radius. Points are split at the
+    median of their widest axis down to leaves of `leaf_size`; a radius
+    query checks every leaf's bounding box at once and measures only the
+    points of the leaves the radius reaches.
+    """
+
+    def __init__(self, coords, leaf_size=16):
+
+        points = unit_vectors(np.asarray(coords, dtype=float).reshape(-1, 2))
+        order = np.arange(len(points))
+        leaves = []
+
+        pending = [(0, len(points))] if len(points) else []
+        while pending:
+            start, stop = pending.pop()
+
+            if stop - start <= leaf_size:
+                leaves.append((start, stop))
+                continue
+
+            part = order[start:stop]
+            axis = int(np.argmax(np.ptp(points[part], axis=0)))
+            mid = (start + stop) // 2
+            order[start:stop] = part[np.argpartition(points[part, axis], mid - start)]
+
+            pending.append((mid, stop))
+            pending.append((start, mid))
+
+        self.order = order
+        self.points = points[order]
+
+        self.starts = np.array([start for start, _ in leaves], dtype=np.int64)
+        self.sizes = np.array([stop - start for start, stop in leaves], dtype=np.int64)
+        self.low = np.array([self.points[start:stop].min(axis=0) for start, stop in leaves]).reshape(-1, 3)
+        self.high = np.array([self.points[start:stop].max(axis=0) for start, stop in leaves]).reshape(-1, 3)
+
+    def query_radius(self, coords, radius_nm):
+        """Indices (into `coords` given at build time) within radius_nm of a (lat, lon) point."""
+
+        if radius_nm < 0 or not len(self.starts):
+            return np.empty(0, dtype=np.int64)
+
+        q = unit_vectors(np.array([coords], dtype=float))[0]
+
+        # Chord of the radius, with slack so callers' exact checks decide the boundary
+        angle = min(radius_nm / EARTH_RADIUS_NM, math.pi)
+        r2 = (2 * math.sin(angle / 2) * (1 + 1e-9) + 1e-12) ** 2
+
+        gap = np.maximum(self.low - q, 0) + np.maximum(q - self.high, 0)
+        hit = np.flatnonzero((gap ** 2).sum(axis=1) <= r2)
+
+        sizes = self.sizes[hit]
+        slots = np.arange(sizes.sum()) + np.repeat(self.starts[hit] - np.cumsum(sizes) + sizes, sizes)
+
+        inside = ((self.points[slots] - q) ** 2).sum(axis=1) <= r2
+
+        return self.order[slots[inside]]
+
+
+class DistanceMatrix:
+    """
+    N x N nautical-mile matrix over every known airport, addressed by
+    integer airport IDs (or by location key through `ids`).
+
+    Scalar lookups read a row converted to a plain list on first use, so
+    an N x N matrix (e.g. memory-mapped from a snapshot) is never copied
+    as a whole.
+    """
+
+    def __init__(self, airports):
+
+        self.keys = []
+        self.ids = {}
+
+        for key in airports:
+            if key not in self.ids:
+                self.ids[key] = len(self.keys)
+                self.keys.append(key)
+
+        self.coords = np.array([airports[key]["coords"] for key in self.keys], dtype=float).reshape(-1, 2)
+        self.matrix = haversine_matrix_nm(
+            self.coords[:, 0], self.coords[:, 1],
+            self.coords[:, 0], self.coords[:, 1]
+        )
+
+        # Rows as plain lists, which make scalar lookups in the simulators cheap
+        self._rows = {}
+
+        # Spatial indexes per airport subset, see nearest_within()
+        self._trees = {}
+
+    @classmethod
+    def from_arrays(cls, keys, coords, matrix):
+        """Matrix over precomputed arrays (e.g. a memory-mapped snapshot), copied only once updated."""
+
+        self = cls.__new__(cls)
+        self.keys = list(keys)
+        self.ids = {key: i for i, key in enumerate(self.keys)}
+        self.coords = np.array(coords, dtype=float).reshape(-1, 2)
+        self.matrix = matrix
+        self._rows = {}
+        self._trees = {}
+
+        return self
+
+    def __len__(self):
+        return len(self.keys)
+
+    def id(self, key):
+        return self.ids[key]
+
+    def _row(self, i):
+        row = self._rows.get(i)
+        if row is None:
+            # setdefault keeps one list per row when threads race here
+            row = self._rows.setdefault(i, self.matrix[i].tolist())
+        return row
+
+    def distance_nm(self, origin_key, dest_key):
+        return self._row(self.ids[origin_key])[self.ids[dest_key]]
+
+    def distance_by_id(self, origin_id, dest_id):
+        return self._row(origin_id)[dest_id]
+
+    def row(self, key):
+        return self.matrix[self.ids[key]]
+
+    def nearest_within(self, origin_key, radius_nm, keys):
+        """
+        (distance_nm, key) of the airports in `keys` within radius_nm of
+        origin_key, yielded nearest first (ties keep `keys` order). A
+        KD-tree over each distinct `keys` set is built once and reused.
+        """
+        keys = tuple(keys)
+        origin = self.ids[origin_key]
+
+        # A handful of airports is cheaper to scan than to query
+        if len(keys) <= SCAN_MAX:
+            row = self._row(origin)
+            limit = radius_nm * (1 + 1e-9) + 1e-9
+
+            found = sorted((row[self.ids[key]], i) for i, key in enumerate(keys))
+            for distance_nm, i in found:
+                if distance_nm > limit:
+                    break
+                yield distance_nm, keys[i]
+            return
+
+        index = self._trees.get(keys)
+        if index is None:
+            columns = np.array([self.ids[key] for key in keys], dtype=np.int64)
+            index = self._trees[keys] = (SphereKDTree(self.coords[columns]), columns)
+
+        tree, columns = index
+
+        hits = tree.query_radius(self.coords[origin], radius_nm)
+        found = self.matrix[origin, columns[hits]]
+
+        for i in np.lexsort((hits, found)).tolist():
+            yield float(found[i]), keys[hits[i]]
+
+    def update_coords(self, key, coords):
+        """Moves one airport (adding it if new) and recomputes only its row and column."""
+
+        if not self.matrix.flags.writeable:
+            self.matrix = self.matrix.copy()
+
+        self._trees.clear()
+
+        if key not in self.ids:
+            self.ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.coords = np.vstack([self.coords, [coords]])
+            self.matrix = np.pad(self.matrix, ((0, 1), (0, 1)))
+        else:
+            self.coords[self.ids[key]] = coords
+
+        i = self.ids[key]
+        row = haversine_matrix_nm(
+            self.coords[i:i + 1, 0], self.coords[i:i + 1, 1],
+            self.coords[:, 0], self.coords[:, 1]
+        )[0]
+
+        self.matrix[i, :] = row
+        self.matrix[:, i] = row
+
+        # Every row's column i changed; rows are converted again on demand
+        self._rows.clear()
+
+
+def build_distance_matrix(location_data, alternate_data):
+    """Distance matrix over parsed location_params + alternate_airports data."""
+
+    airports = dict(location_data["locations"])
+    for key, alt in alternate_data["alternates"].items():
+        airports.setdefault(key, alt)
+
+    return DistanceMatrix(airports)
+
+def load_distance_matrix(location_path="location_params.json", alternate_path="alternate_airports.json"):
+    """Distance matrix over location_params.json plus alternate_airports.json."""
+
+    with open(location_path) as f:
+        location_data = json.load(f)
+
+    with open(alternate_path) as f:
+        alternate_data = json.load(f)
+
+    return build_distance_matrix(location_data, alternate_data)
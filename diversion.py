@@ -0,0 +1,77 @@
+from hard_feasibility_checks import leg_arrays
+from flight_physics import compute_leg_fuel
+
+# Nearest reachable alternates gated per batch; the first batch with a pass ends the search
+GATE_CHUNK = 8
+
+
+def reach_radius_nm(ac, usable_fuel):
+    """Farthest distance a leg can cover on usable_fuel (cruise burn alone bounds it)."""
+
+    if usable_fuel < 0:
+        return -1.0
+    if ac.fuel_per_nm <= 0 or ac.climb_fuel_rate < 0:
+        return float("inf")
+
+    return usable_fuel / ac.fuel_per_nm
+
+def find_best_alternate(ac, evaluator, alternate_data, distances, current_origin_key,
+                        current_origin, fuel_remaining, reserve_fuel):
+    """
+    Nearest alternate reachable on fuel_remaining - reserve_fuel that passes
+    the hard gate for landing there with no payload, or None.
+
+    Only alternates inside the fuel reach radius are read (spatial index
+    on the distance matrix), nearest first, and gating stops at the first
+    chunk holding a pass.
+    """
+    alternates = alternate_data["alternates"]
+    usable_fuel = fuel_remaining - reserve_fuel
+
+    candidates = distances.nearest_within(
+        current_origin_key, reach_radius_nm(ac, usable_fuel), alternates
+    )
+
+    chunk = []
+    for distance_nm, key in candidates:
+
+        alt = alternates[key]
+        fuel_needed, _, _, _ = compute_leg_fuel(ac, current_origin, alt, distance_nm)
+
+        if fuel_needed > usable_fuel:
+            continue
+
+        chunk.append((key, alt, distance_nm, fuel_needed))
+        if len(chunk) == GATE_CHUNK:
+            option = _first_passing(ac, evaluator, current_origin, fuel_remaining, chunk)
+            if option:
+                return option
+            chunk = []
+
+    if chunk:
+        return _first_passing(ac, evaluator, current_origin, fuel_remaining, chunk)
+
+    return None
+
+def _first_passing(ac, evaluator, current_origin, fuel_remaining, chunk):
+
+    passed = evaluator.evaluate_batch(ac, leg_arrays([
+        {
+            "origin": current_origin,
+            "destination": alt,
+            "distance_nm": distance_nm,
+            "payload_kg": 0,  # assume delivery complete
+            "fuel_onboard_kg": fuel_remaining - fuel_needed
+        }
+        for _, alt, distance_nm, fuel_needed in chunk
+    ]))["passed"]
+
+    for (key, _, distance_nm, fuel_needed), ok in zip(chunk, passed):
+        if ok:
+            return {
+                "alternate": key,
+                "distance_nm": round(distance_nm, 2),
+                "fuel_required": round(fuel_needed, 2)
+            }
+
+    return None
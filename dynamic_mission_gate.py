@@ -1,188 +1,75 @@
 import json
 import math
-from hard_feasibility_checks import FixedWingHardGate, RotaryWingHardGate
-from hard_feasibility_checks import haversine_nm
+from hard_feasibility_checks import FixedWingHardGate, RotaryWingHardGate, HardGateCache
+from flight_physics import compute_leg_fuel, leg_time_hr
+from diversion import find_best_alternate
+from reachability import ReachabilityGraphs, refuel_capable
+from aircraft_profiles import build_aircraft
+from mission_inputs import load_inputs
+
+
+def departure_fuel(hop, aircraft, graphs, start_fuel_kg):
+    """
+    Fuel on board leaving a reachability hop: a full load where the airport
+    refuels, otherwise start_fuel_kg (only the route's first hop can leave
+    an airport without fuel).
+    """
+    return aircraft["fuel_kg"] if refuel_capable(graphs.airport(hop["from"])) else start_fuel_kg
+
+def fly_refuel_route(route, aircraft, graphs, leg_results, start_fuel_kg):
+    """
+    Appends the refuel stops of a reachability route (every leg but the
+    last) to leg_results; returns (fuel, time, distance) flown and the
+    last stop's key. start_fuel_kg is the fuel on board at the route's
+    first airport.
+    """
+    fuel_used = time_hr = distance_nm = 0
+
+    for hop in route["legs"][:-1]:
+        fuel_used += hop["fuel_kg"]
+        time_hr += hop["time_hr"]
+        distance_nm += hop["distance_nm"]
 
-with open("aircraft_parameters.json") as f:
-    aircraft_data = json.load(f)
-
-with open("location_params.json") as f:
-    location_data = json.load(f)
-
-with open("payloads.json") as f:
-    mission_data = json.load(f)
-
-with open("alternate_airports.json") as f:
-    alternate_data = json.load(f)
-
-
-def build_aircraft(ac_name, ac_type):
-
-    cat = next(c for c in aircraft_data if c.lower() == ac_type.lower())
-    model = next(m for m in aircraft_data[cat] if m.lower() == ac_name.lower())
-    params = aircraft_data[cat][model]
-
-    def get_val(key, default=0):
-        return params.get(key, {}).get("value", default)
-
-    def parse_power(val):
-        if isinstance(val, str) and "x" in val.lower():
-            a, b = val.lower().split("x")
-            return float(a) * float(b)
-        try:
-            return float(val)
-        except:
-            return 0
-
-    return {
-        "type": "fixed" if "fixed" in ac_type.lower() else "rotary",
-        "empty": get_val("Empty Weight (OEW)") or get_val("Empty Weight"),
-        "mtow": get_val("Max Takeoff Weight (MTOW)") or get_val("MTOW"),
-        "mlw": get_val("Max Landing Weight") or get_val("MTOW"),
-        "takeoff_base": get_val("Takeoff Distance"),
-        "landing_base": get_val("Landing Distance"),
-        "roc": get_val("Rate of Climb") or get_val("ROC"),
-        "roc_loss": get_val("ROC loss per 1000 ft") / 100,
-        "cruise": get_val("Cruise Speed") or get_val("Cruised Speed"),
-        "fuel_flow": get_val("Cruise") or get_val("Phase Cruise"),
-        "climb_fuel_rate": get_val("Phase Climb") or get_val("Cruise"),
-        "reserve_min": get_val("Reserve Policy") or get_val("Phase Reserve") or 30,
-        "engine_power": parse_power(get_val("Max Continuous Power")),
-        "hover_ceiling_oge": get_val("Hover Ceiling OGE"),
-        "to_da_sensitivity": get_val("Takeoff Increase per 1000 ft DA") / 100,
-        "min_climb_margin": 0.01,
-        "min_power_margin": 0.05,
-        "min_visibility": 5,
-        "max_crosswind": get_val("Max Crosswind") or 20,
-        "cg_min": 20,
-        "cg_max": 30,
-        "cg_current": 25
-    }
-
-def compute_leg_fuel(ac, origin, dest, distance_nm):
-
-    cruise_speed = ac["cruise"]
-    cruise_rate = ac["fuel_flow"]
-    climb_rate = ac["climb_fuel_rate"]
-
-    delta_alt = dest["elevation_ft"] - origin["elevation_ft"]
-    roc = ac["roc"]
-
-    # ---- Climb ----
-    if delta_alt > 0 and roc > 0:
-        climb_time_hr = (delta_alt / roc) / 60
-        fuel_climb = climb_rate * climb_time_hr
-    else:
-        fuel_climb = 0
-
-    # ---- Cruise ----
-    cruise_time_hr = distance_nm / cruise_speed if cruise_speed > 0 else 0
-    fuel_cruise = cruise_rate * cruise_time_hr
-
-    # ---- Descent ----
-    descent_time_hr = abs(delta_alt / roc) / 60 if roc > 0 else 0
-    fuel_descent = cruise_rate * 0.5 * descent_time_hr
-
-    total = fuel_climb + fuel_cruise + fuel_descent
-
-    return total, fuel_climb, fuel_cruise, fuel_descent
-
-
-def find_best_alternate(ac, evaluator, current_origin_key, current_origin,
-                        fuel_remaining, reserve_fuel):
-
-    best_option = None
-    best_distance = float("inf")
-
-    for key, alt in alternate_data["alternates"].items():
-
-        distance_nm = haversine_nm(
-            current_origin["coords"][0],
-            current_origin["coords"][1],
-            alt["coords"][0],
-            alt["coords"][1]
-        )
-
-        fuel_needed, _, _, _ = compute_leg_fuel(ac, current_origin, alt, distance_nm)
-
-        usable_fuel = fuel_remaining - reserve_fuel
-
-        if fuel_needed > usable_fuel:
-            continue
-
-            alt = find_best_alternate(
-                ac,
-                evaluator,
-                current_origin_key,
-                current_origin,
-                fuel_remaining,
-                reserve_fuel
-            )
-
-            if alt is not None:
-                mission_status = "DIVERTED"
-                leg_results.append({
-                    "diverted_to": alt["alternate"],
-                    "distance_nm": alt["distance_nm"],
-                    "fuel_used": alt["fuel_required"]
-                })
-                fuel_remaining -= alt["fuel_required"]
-                break
-            else:
-                mission_status = "FAIL_NO_ALTERNATE"
-                leg_results.append({
-                    "mission_abort": True,
-                    "reason": "No reachable alternate"
-                })
-                break
-
-
-        # Build leg for hard gate landing check
-        leg = {
-            "origin": current_origin,
-            "destination": alt,
-            "distance_nm": distance_nm,
-            "payload_kg": 0,  # assume delivery complete
-            "fuel_onboard_kg": fuel_remaining - fuel_needed
-        }
-
-        hard_result = evaluator.evaluate(ac, leg)
-
-        if hard_result["hard_gate_overall_status"] == "FAIL":
-            continue
-
-        if distance_nm < best_distance:
-            best_distance = distance_nm
-            best_option = {
-                "alternate": key,
-                "distance_nm": round(distance_nm, 2),
-                "fuel_required": round(fuel_needed, 2)
+        leg_results.append({
+            "from": hop["from"],
+            "to": hop["to"],
+            "fuel_used": round(hop["fuel_kg"], 2),
+            "fuel_remaining": round(departure_fuel(hop, aircraft, graphs, start_fuel_kg) - hop["fuel_kg"], 2),
+            "refuel_stop": True,
+            "tactical": {
+                "threat_level": graphs.airport(hop["to"]).get("security_threat", "Low"),
+                "hotspot_active": graphs.airport(hop["to"]).get("is_hotspot", False)
             }
+        })
 
-    return best_option
-
-
-final_output = {
-    "mission_id": mission_data["mission_id"],
-    "dynamic_mission_result": {}
-}
+    return fuel_used, time_hr, distance_nm, route["legs"][-1]["from"]
 
-origin_key = mission_data["origin"].lower()
-origin = location_data["locations"][origin_key]
+def run_aircraft_mission(aircraft, location_data, mission_data, alternate_data, distances, evaluator=None,
+                         graphs=None):
+    """
+    Dynamic mission run with refueling at each refuel-capable stop for one
+    fleet aircraft. Legs beyond the fuel on board are routed through
+    refuel stops on the aircraft's reachability graph, and diversions may
+    take several hops when no alternate is reachable directly.
+    """
 
-deliveries = mission_data["deliveries"]
+    origin_key = mission_data["origin"].lower()
+    origin = location_data["locations"][origin_key]
 
-for aircraft in mission_data["assigned_fleet"]:
+    deliveries = mission_data["deliveries"]
 
     ac_name = aircraft["aircraft_name"]
     ac_type = aircraft["type"]
     ac = build_aircraft(ac_name, ac_type)
 
-    evaluator = FixedWingHardGate() if ac["type"] == "fixed" else RotaryWingHardGate()
+    if evaluator is None:
+        evaluator = HardGateCache(FixedWingHardGate() if ac.type == "fixed" else RotaryWingHardGate())
+    if graphs is None:
+        graphs = ReachabilityGraphs(location_data, alternate_data, distances)
 
     payload_remaining = mission_data["total_payload_kg"]
     fuel_remaining = aircraft["fuel_kg"]
-    reserve_fuel = ac["fuel_flow"] * (ac["reserve_min"] / 60)
+    reserve_fuel = ac.reserve_fuel
 
     current_origin_key = origin_key
     current_origin = origin
@@ -200,18 +87,33 @@ for aircraft in mission_data["assigned_fleet"]:
         dest_key = delivery["destination"].lower()
         dest = location_data["locations"][dest_key]
 
-        distance_nm = haversine_nm(
-            current_origin["coords"][0],
-            current_origin["coords"][1],
-            dest["coords"][0],
-            dest["coords"][1]
-        )
+        distance_nm = distances.distance_nm(current_origin_key, dest_key)
+        fuel_needed = compute_leg_fuel(ac, current_origin, dest, distance_nm)[0]
+
+        # Out of range on the fuel aboard: fly to the last refuel stop of
+        # the cheapest route there and take the final leg from it
+        if fuel_needed > fuel_remaining - reserve_fuel:
+            route = graphs.get(ac, evaluator, aircraft["fuel_kg"], payload_remaining).route(
+                current_origin_key, dest_key, start_fuel_kg=fuel_remaining
+            )
+
+            if route and len(route["legs"]) > 1:
+                stop_fuel, stop_time, stop_distance, current_origin_key = fly_refuel_route(
+                    route, aircraft, graphs, leg_results, fuel_remaining
+                )
+                total_fuel_used += stop_fuel
+                total_time_hr += stop_time
+                total_distance_nm += stop_distance
+
+                current_origin = graphs.airport(current_origin_key)
+                fuel_remaining = aircraft["fuel_kg"]
+                distance_nm = distances.distance_nm(current_origin_key, dest_key)
 
         # Time Calc
         delta_alt = dest["elevation_ft"] - current_origin["elevation_ft"]
-        climb_time = (delta_alt / ac["roc"]) / 60 if delta_alt > 0 and ac["roc"] > 0 else 0
-        cruise_time = distance_nm / ac["cruise"] if ac["cruise"] > 0 else 0
-        descent_time = abs(delta_alt / ac["roc"]) / 60 if ac["roc"] > 0 else 0
+        climb_time = (delta_alt / ac.roc) / 60 if delta_alt > 0 and ac.roc > 0 else 0
+        cruise_time = distance_nm / ac.cruise if ac.cruise > 0 else 0
+        descent_time = abs(delta_alt / ac.roc) / 60 if ac.roc > 0 else 0
         leg_time = climb_time + cruise_time + descent_time
 
         fuel_needed, fc, fru, fd = compute_leg_fuel(ac, current_origin, dest, distance_nm)
@@ -227,19 +129,56 @@ for aircraft in mission_data["assigned_fleet"]:
             alt_option = find_best_alternate(
                 ac,
                 evaluator,
+                alternate_data,
+                distances,
                 current_origin_key,
                 current_origin,
                 fuel_remaining,
                 reserve_fuel
             )
 
+            # No alternate in range: reach one through refuel stops
+            diversion = None
+            if not alt_option:
+                # The undelivered cargo is still on board
+                diversion = graphs.get(ac, evaluator, aircraft["fuel_kg"], payload_remaining).nearest(
+                    current_origin_key, alternate_data["alternates"], start_fuel_kg=fuel_remaining
+                )
+
             if alt_option:
                 leg_results.append({
                     "diverted_to": alt_option["alternate"],
                     "reason": "Insufficient fuel for planned leg"
                 })
+                alt_distance_nm = distances.distance_nm(current_origin_key, alt_option["alternate"])
+                alt = graphs.airport(alt_option["alternate"])
+
                 fuel_remaining -= alt_option["fuel_required"]
                 total_fuel_used += alt_option["fuel_required"] # Add alt fuel
+                total_time_hr += leg_time_hr(ac, current_origin, alt, alt_distance_nm)
+                total_distance_nm += alt_distance_nm
+
+                # The return to base departs from the alternate
+                current_origin_key, current_origin = alt_option["alternate"], alt
+                if refuel_capable(alt):
+                    fuel_remaining = aircraft["fuel_kg"]
+                break
+            elif diversion:
+                leg_results.append({
+                    "diverted_to": diversion["path"][-1],
+                    "via": diversion["path"][1:-1],
+                    "reason": "Insufficient fuel for planned leg"
+                })
+                last_hop = diversion["legs"][-1]
+                fuel_remaining = departure_fuel(last_hop, aircraft, graphs, fuel_remaining) - last_hop["fuel_kg"]
+                total_fuel_used += diversion["fuel_kg"]
+                total_time_hr += diversion["time_hr"]
+                total_distance_nm += diversion["distance_nm"]
+
+                current_origin_key = diversion["path"][-1]
+                current_origin = graphs.airport(current_origin_key)
+                if refuel_capable(current_origin):
+                    fuel_remaining = aircraft["fuel_kg"]
                 break
             else:
                 leg_results.append({
@@ -265,7 +204,7 @@ for aircraft in mission_data["assigned_fleet"]:
             "fuel_onboard_kg": fuel_remaining
         }
 
-        hard_result = evaluator.evaluate(ac, leg)
+        hard_result = evaluator.evaluate_status(ac, leg)
 
         if hard_result["hard_gate_overall_status"] == "FAIL":
             mission_status = "FAIL_HARD_GATE"
@@ -288,19 +227,35 @@ for aircraft in mission_data["assigned_fleet"]:
 
         current_origin = dest
         current_origin_key = dest_key
-        
-        # REFUELING AT ELEMENT (Universal Refueling Assumption)
+
+        # REFUELING AT ELEMENT (Universal Refueling Assumption unless the
+        # airport record says "refuel": false)
         # Refuel back to initial dispatch load
-        fuel_remaining = aircraft["fuel_kg"] 
+        if refuel_capable(dest):
+            fuel_remaining = aircraft["fuel_kg"]
 
     # Return to base
-    distance_nm = haversine_nm(
-        current_origin["coords"][0],
-        current_origin["coords"][1],
-        origin["coords"][0],
-        origin["coords"][1]
-    )
-    
+    distance_nm = distances.distance_nm(current_origin_key, origin_key)
+    fuel_rtb = compute_leg_fuel(ac, current_origin, origin, distance_nm)[0]
+
+    # Beyond range: return through refuel stops
+    if fuel_rtb > fuel_remaining - reserve_fuel:
+        route = graphs.get(ac, evaluator, aircraft["fuel_kg"], 0).route(
+            current_origin_key, origin_key, start_fuel_kg=fuel_remaining
+        )
+
+        if route and len(route["legs"]) > 1:
+            stop_fuel, stop_time, stop_distance, current_origin_key = fly_refuel_route(
+                route, aircraft, graphs, leg_results, fuel_remaining
+            )
+            total_fuel_used += stop_fuel
+            total_time_hr += stop_time
+            total_distance_nm += stop_distance
+
+            current_origin = graphs.airport(current_origin_key)
+            fuel_remaining = aircraft["fuel_kg"]
+            distance_nm = distances.distance_nm(current_origin_key, origin_key)
+
     # We create a virtual leg output for Refueling if needed? 
     # For now, just implicit.
 
@@ -311,18 +266,18 @@ for aircraft in mission_data["assigned_fleet"]:
 
     else:
         fuel_remaining -= fuel_rtb
-        
+
         # Add stats for RTB
         total_fuel_used += fuel_rtb
         total_distance_nm += distance_nm
-        
+
         delta_alt = origin["elevation_ft"] - current_origin["elevation_ft"]
-        climb_time = (delta_alt / ac["roc"]) / 60 if delta_alt > 0 and ac["roc"] > 0 else 0
-        cruise_time = distance_nm / ac["cruise"] if ac["cruise"] > 0 else 0
-        descent_time = abs(delta_alt / ac["roc"]) / 60 if ac["roc"] > 0 else 0
+        climb_time = (delta_alt / ac.roc) / 60 if delta_alt > 0 and ac.roc > 0 else 0
+        cruise_time = distance_nm / ac.cruise if ac.cruise > 0 else 0
+        descent_time = abs(delta_alt / ac.roc) / 60 if ac.roc > 0 else 0
         total_time_hr += (climb_time + cruise_time + descent_time)
 
-    final_output["dynamic_mission_result"][ac_name] = {
+    return {
         "mission_status": mission_status,
         "final_fuel_remaining": round(fuel_remaining, 2),
         "total_fuel_used_kg": round(total_fuel_used, 2),
@@ -332,8 +287,37 @@ for aircraft in mission_data["assigned_fleet"]:
         "legs": leg_results
     }
 
+def run_dynamic_mission(location_data, mission_data, alternate_data, distances):
+    """Dynamic mission run with refueling at each stop for every fleet aircraft."""
+
+    final_output = {
+        "mission_id": mission_data["mission_id"],
+        "dynamic_mission_result": {}
+    }
+
+    graphs = ReachabilityGraphs(location_data, alternate_data, distances)
+
+    for aircraft in mission_data["assigned_fleet"]:
+        final_output["dynamic_mission_result"][aircraft["aircraft_name"]] = run_aircraft_mission(
+            aircraft, location_data, mission_data, alternate_data, distances, graphs=graphs
+        )
+
+    return final_output
+
+def main():
+
+    inputs = load_inputs()
+    final_output = run_dynamic_mission(
+        inputs["location_data"],
+        inputs["mission_data"],
+        inputs["alternate_data"],
+        inputs["distances"]
+    )
+
+    with open("dynamic_mission_output.json", "w") as f:
+        json.dump(final_output, f, indent=2)
 
-with open("dynamic_mission_output.json", "w") as f:
-    json.dump(final_output, f, indent=2)
+    print("Dynamic Mission Gate (REALISTIC) completed.")
 
-print("Dynamic Mission Gate (REALISTIC) completed.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import functools
+import math
+
+import numpy as np
+
+
+def density_altitude(elev_ft, oat_c, qnh_hpa):
+    pressure_alt = elev_ft + (1013 - qnh_hpa) * 30
+    isa_temp = 15 - (0.0065 * elev_ft * 0.3048)
+    da = pressure_alt + 120 * (oat_c - isa_temp)
+    return da
+
+def isa_density_ratio(da_ft):
+    sigma_raw = 1 - (da_ft / 145442)
+    if sigma_raw <= 0:
+        return 0.05
+    return max(0.05, sigma_raw ** 4.255)
+
+@functools.lru_cache(maxsize=4096)
+def airport_atmosphere(elev_ft, oat_c, qnh_hpa):
+    """
+    (density altitude, isa_density_ratio) of one airport weather snapshot.
+    Memoized: every leg into the airport reads the same values, so the
+    ** 4.255 power is only taken once per snapshot.
+    """
+    da = density_altitude(elev_ft, oat_c, qnh_hpa)
+    return da, isa_density_ratio(da)
+
+def climb_gradient(roc_fpm, tas_kt):
+    return roc_fpm / (tas_kt * 101.27)
+
+def fuel_required(distance_nm, cruise_kt, fuel_flow_kgph, reserve_min):
+    if cruise_kt == 0:
+        return float("inf"), 0, 0
+    trip_time_hr = distance_nm / cruise_kt
+    trip_fuel = trip_time_hr * fuel_flow_kgph
+    reserve_fuel = fuel_flow_kgph * (reserve_min / 60)
+    total = trip_fuel + reserve_fuel
+    return total, trip_fuel, reserve_fuel
+
+def pow_array(base, exponent, exact=True):
+    """
+    Elementwise base ** exponent through the C library pow() the scalar
+    code uses. np.power's SIMD loops can round differently in the last
+    bit, which is enough to flip a gate check sitting on its threshold.
+    Negative bases give NaN, as with np.power.
+
+    The exact path calls pow() once per distinct value. With exact=False
+    it is plain np.power, for callers that sample mostly unique values
+    and do not need bit parity with the scalar gates.
+    """
+    base = np.asarray(base, dtype=float)
+    if not exact:
+        with np.errstate(invalid="ignore"):
+            return np.power(base, exponent)
+
+    values, inverse = np.unique(base, return_inverse=True)
+    powered = np.array([math.pow(v, exponent) if v >= 0 else math.nan for v in values.tolist()], dtype=float)
+    return powered[inverse].reshape(base.shape)
+
+def isa_density_ratio_array(da_ft, exact=True):
+    sigma_raw = 1 - (da_ft / 145442)
+    sigma = pow_array(np.clip(sigma_raw, 0, None), 4.255, exact)
+    return np.where(sigma_raw > 0, np.maximum(0.05, sigma), 0.05)
+
+def haversine_nm(lat1, lon1, lat2, lon2):
+    R_km = 6371
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+
+    a = math.sin(dphi/2)**2 + \
+        math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
+
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    distance_km = R_km * c
+    return distance_km * 0.539957
+
+def compute_leg_fuel(ac, origin, dest, distance_nm):
+
+    cruise_speed = ac.cruise
+    cruise_rate = ac.fuel_flow
+    climb_rate = ac.climb_fuel_rate
+    roc = ac.roc
+
+    delta_alt = dest["elevation_ft"] - origin["elevation_ft"]
+
+    # Climb
+    if delta_alt > 0 and roc > 0:
+        climb_time_hr = (delta_alt / roc) / 60
+        fuel_climb = climb_rate * climb_time_hr
+    else:
+        fuel_climb = 0
+
+    # Cruise
+    cruise_time_hr = distance_nm / cruise_speed if cruise_speed > 0 else 0
+    fuel_cruise = cruise_rate * cruise_time_hr
+
+    # Descent
+    descent_time_hr = abs(delta_alt / roc) / 60 if roc > 0 else 0
+    fuel_descent = cruise_rate * 0.5 * descent_time_hr
+
+    total = fuel_climb + fuel_cruise + fuel_descent
+
+    return total, fuel_climb, fuel_cruise, fuel_descent
+
+def leg_time_hr(ac, origin, dest, distance_nm):
+
+    delta_alt = dest["elevation_ft"] - origin["elevation_ft"]
+
+    climb = (delta_alt / ac.roc) / 60 if delta_alt > 0 and ac.roc > 0 else 0
+    cruise = distance_nm / ac.cruise if ac.cruise > 0 else 0
+    descent = abs(delta_alt / ac.roc) / 60 if ac.roc > 0 else 0
+
+    return climb + cruise + descent
+
+def compute_leg_fuel_array(ac, origin_elevation_ft, dest_elevation_ft, distance_nm):
+    """compute_leg_fuel() total over arrays of legs."""
+
+    delta_alt = np.asarray(dest_elevation_ft, dtype=float) - origin_elevation_ft
+    distance_nm = np.asarray(distance_nm, dtype=float)
+
+    if ac.roc > 0:
+        fuel_climb = np.where(delta_alt > 0, ac.climb_fuel_rate * ((delta_alt / ac.roc) / 60), 0)
+        descent_time_hr = np.abs(delta_alt / ac.roc) / 60
+    else:
+        fuel_climb = np.zeros_like(delta_alt)
+        descent_time_hr = np.zeros_like(delta_alt)
+
+    cruise_time_hr = distance_nm / ac.cruise if ac.cruise > 0 else np.zeros_like(distance_nm)
+
+    return fuel_climb + ac.fuel_flow * cruise_time_hr + ac.fuel_flow * 0.5 * descent_time_hr
+
+def leg_time_hr_array(ac, origin_elevation_ft, dest_elevation_ft, distance_nm):
+    """leg_time_hr() over arrays of legs."""
+
+    delta_alt = np.asarray(dest_elevation_ft, dtype=float) - origin_elevation_ft
+    distance_nm = np.asarray(distance_nm, dtype=float)
+
+    if ac.roc > 0:
+        climb = np.where(delta_alt > 0, (delta_alt / ac.roc) / 60, 0)
+        descent = np.abs(delta_alt / ac.roc) / 60
+    else:
+        climb = descent = np.zeros_like(delta_alt)
+
+    cruise = distance_nm / ac.cruise if ac.cruise > 0 else np.zeros_like(distance_nm)
+
+    return climb + cruise + descent
+
+def min_departure_fuel_array(ac, leg_fuel, required, distance_nm, max_nudges=16):
+    """
+    Least departure fuel per leg that covers `required` (the planners' leg
+    + alternate + reserve check) and still arrives with fuel_required()
+    for the leg distance on board (the hard gate's fuel compliance), as
+    the scalar code rounds departure - leg. Starts from the closed form
+    and settles the last bits one ulp at a time.
+    """
+    leg_fuel = np.asarray(leg_fuel, dtype=float)
+    required = np.asarray(required, dtype=float)
+
+    fuel_total, _, _ = fuel_required(np.asarray(distance_nm, dtype=float), ac.cruise, ac.fuel_flow, ac.reserve_min)
+
+    def fits(fuel):
+        with np.errstate(invalid="ignore"):
+            return (required <= fuel) & ((fuel - leg_fuel) - fuel_total >= 0)
+
+    departure = np.maximum(required, leg_fuel + fuel_total)
+
+    # Down while one ulp less still fits, then up until it does
+    for down in (True, False):
+        for _ in range(max_nudges):
+            step = np.nextafter(departure, -np.inf if down else np.inf)
+            move = fits(step) if down else ~fits(departure)
+            if not move.any():
+                break
+            departure = np.where(move, step, departure)
+
+    return departure
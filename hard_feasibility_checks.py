@@ -1,55 +1,110 @@
 import json
-import math
-
-with open("aircraft_parameters.json") as f:
-    aircraft_data = json.load(f)
-
-with open("location_params.json") as f:
-    location_data = json.load(f)
-
-with open("payloads.json") as f:
-    mission_data = json.load(f)
-
-def density_altitude(elev_ft, oat_c, qnh_hpa):
-    pressure_alt = elev_ft + (1013 - qnh_hpa) * 30
-    isa_temp = 15 - (0.0065 * elev_ft * 0.3048)
-    da = pressure_alt + 120 * (oat_c - isa_temp)
-    return da
-
-def isa_density_ratio(da_ft):
-    sigma_raw = 1 - (da_ft / 145442)
-    if sigma_raw <= 0:
-        return 0.05
-    return max(0.05, sigma_raw ** 4.255)
-
-def climb_gradient(roc_fpm, tas_kt):
-    return roc_fpm / (tas_kt * 101.27)
-
-def fuel_required(distance_nm, cruise_kt, fuel_flow_kgph, reserve_min):
-    if cruise_kt == 0:
-        return float("inf"), 0, 0
-    trip_time_hr = distance_nm / cruise_kt
-    trip_fuel = trip_time_hr * fuel_flow_kgph
-    reserve_fuel = fuel_flow_kgph * (reserve_min / 60)
-    total = trip_fuel + reserve_fuel
-    return total, trip_fuel, reserve_fuel
-
-def haversine_nm(lat1, lon1, lat2, lon2):
-    R_km = 6371
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-
-    a = math.sin(dphi/2)**2 + \
-        math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
-
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance_km = R_km * c
-    return distance_km * 0.539957
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from flight_physics import airport_atmosphere, density_altitude, isa_density_ratio_array, climb_gradient, fuel_required, pow_array
+from aircraft_profiles import build_aircraft
+from mission_inputs import load_inputs
+from performance_tables import load_charts
+
+# Struct-of-arrays leg fields consumed by evaluate_batch
+LEG_FIELDS = (
+    "origin_elevation_ft",
+    "elevation_ft",
+    "oat_c",
+    "qnh_hpa",
+    "wind_speed_mps",
+    "visibility_km",
+    "runway_length",
+    "payload_kg",
+    "fuel_onboard_kg",
+    "distance_nm"
+)
+
+def leg_arrays(legs):
+    """Converts a list of evaluate() leg dicts into evaluate_batch arrays."""
+
+    columns = {field: [] for field in LEG_FIELDS}
+
+    for leg in legs:
+        dest = leg["destination"]
+        weather = dest["weather"]
+
+        columns["origin_elevation_ft"].append(leg["origin"]["elevation_ft"])
+        columns["elevation_ft"].append(dest["elevation_ft"])
+        columns["oat_c"].append(weather["oat_c"])
+        columns["qnh_hpa"].append(weather["qnh_hpa"])
+        columns["wind_speed_mps"].append(weather["wind_speed_mps"])
+        columns["visibility_km"].append(weather["visibility_km"])
+        columns["runway_length"].append(dest["runway_length"])
+        columns["payload_kg"].append(leg["payload_kg"])
+        columns["fuel_onboard_kg"].append(leg["fuel_onboard_kg"])
+        columns["distance_nm"].append(leg["distance_nm"])
+
+    return {field: np.array(values, dtype=float) for field, values in columns.items()}
+
+def _broadcast_legs(legs):
+    arrays = np.broadcast_arrays(*[np.asarray(legs[field], dtype=float) for field in LEG_FIELDS])
+    return dict(zip(LEG_FIELDS, arrays))
+
+def _status_result(failed, margins):
+    return {
+        "hard_gate_overall_status": "FAIL" if failed else "PASS",
+        "failed_check": failed[0] if failed else None,
+        "margins": margins
+    }
+
+def _status_mask(checks, passed):
+    status = np.zeros(np.shape(passed[checks[0]]), dtype=np.uint8)
+    for bit, check in enumerate(checks):
+        status |= np.where(passed[check], 0, 1 << bit).astype(np.uint8)
+    return status
+
 
 class FixedWingHardGate:
 
+    def __init__(self, charts=None):
+        # Performance charts (performance_tables.py) replace the analytic
+        # takeoff / landing / climb model for the aircraft they cover
+        self.charts = load_charts() if charts is None else charts
+
+    def performance(self, ac, da, Wg):
+        """
+        Required takeoff and landing distance (m) and corrected rate of
+        climb (fpm) at density altitude da and gross weight Wg, from the
+        aircraft's performance chart or else the lambda_w model.
+        """
+        chart = self.charts.chart(ac)
+        if chart is not None:
+            return self.charts.lookup(ac, chart, da, Wg)
+
+        lambda_w = Wg / ac.mtow if ac.mtow else 0
+        da_factor = (da / 1000) * ac.to_da_sensitivity
+
+        return {
+            "takeoff_distance_m": ac.takeoff_base * (lambda_w ** 2) * (1 + da_factor),
+            "landing_distance_m": ac.landing_base * lambda_w * (1 + da_factor),
+            "rate_of_climb_fpm": ac.roc * (1 - ac.roc_loss * (da / 1000))
+        }
+
+    def performance_batch(self, ac, da, Wg, exact=True):
+        """Vectorized performance()."""
+
+        chart = self.charts.chart(ac)
+        if chart is not None:
+            return chart.lookup(da, Wg)
+
+        lambda_w = Wg / ac.mtow if ac.mtow else np.zeros_like(Wg)
+        da_factor = (da / 1000) * ac.to_da_sensitivity
+
+        return {
+            "takeoff_distance_m": ac.takeoff_base * pow_array(lambda_w, 2, exact) * (1 + da_factor),
+            "landing_distance_m": ac.landing_base * lambda_w * (1 + da_factor),
+            "rate_of_climb_fpm": ac.roc * (1 - ac.roc_loss * (da / 1000))
+        }
+
     def evaluate(self, ac, leg):
 
         result = {}
@@ -59,37 +114,38 @@ class FixedWingHardGate:
 
         wind_speed_kt = weather["wind_speed_mps"] * 1.94384
 
-        da = density_altitude(
+        da, _ = airport_atmosphere(
             dest["elevation_ft"],
             weather["oat_c"],
             weather["qnh_hpa"]
         )
 
-        Wg = ac["empty"] + leg["payload_kg"] + leg["fuel_onboard_kg"]
-        lambda_w = Wg / ac["mtow"] if ac["mtow"] else 0
+        Wg = ac.empty + leg["payload_kg"] + leg["fuel_onboard_kg"]
+        lambda_w = Wg / ac.mtow if ac.mtow else 0
+        performance = self.performance(ac, da, Wg)
 
         # ================= MASS =================
         mass_pass = (
-            Wg <= ac["mtow"] and
-            Wg <= ac["mlw"] and
-            ac["cg_min"] <= ac["cg_current"] <= ac["cg_max"]
+            Wg <= ac.mtow and
+            Wg <= ac.mlw and
+            ac.cg_min <= ac.cg_current <= ac.cg_max
         )
 
         result["mass_compliance"] = {
             "status": "PASS" if mass_pass else "FAIL",
             "details": {
                 "gross_weight": round(Wg, 2),
-                "mtow": ac["mtow"],
-                "mlw": ac["mlw"],
+                "mtow": ac.mtow,
+                "mlw": ac.mlw,
                 "lambda_w": round(lambda_w, 3),
-                "cg_current": ac["cg_current"],
-                "cg_limits": [ac["cg_min"], ac["cg_max"]]
+                "cg_current": ac.cg_current,
+                "cg_limits": [ac.cg_min, ac.cg_max]
             }
         }
 
         # ================= TAKEOFF =================
-        da_factor = (da / 1000) * ac["to_da_sensitivity"]
-        required_to = ac["takeoff_base"] * (lambda_w ** 2) * (1 + da_factor)
+        da_factor = (da / 1000) * ac.to_da_sensitivity
+        required_to = performance["takeoff_distance_m"]
         runway_margin = dest["runway_length"] - required_to
 
         result["takeoff_performance"] = {
@@ -97,7 +153,7 @@ class FixedWingHardGate:
             "details": {
                 "density_altitude_ft": round(da, 2),
                 "lambda_w": round(lambda_w, 3),
-                "base_takeoff_m": ac["takeoff_base"],
+                "base_takeoff_m": ac.takeoff_base,
                 "da_factor": round(da_factor, 3),
                 "required_takeoff_m": round(required_to, 2),
                 "runway_length_m": dest["runway_length"],
@@ -106,7 +162,7 @@ class FixedWingHardGate:
         }
 
         # ================= LANDING =================
-        required_ldg = ac["landing_base"] * lambda_w * (1 + da_factor)
+        required_ldg = performance["landing_distance_m"]
         landing_margin = dest["runway_length"] - required_ldg
 
         result["runway_feasibility"] = {
@@ -119,16 +175,15 @@ class FixedWingHardGate:
         }
 
         
-        roc_loss_factor = ac["roc_loss"] * (da / 1000)
-        roc_corrected = ac["roc"] * (1 - roc_loss_factor)
+        roc_corrected = performance["rate_of_climb_fpm"]
 
         delta_alt = dest["elevation_ft"] - leg["origin"]["elevation_ft"]
         G_req = delta_alt / (leg["distance_nm"] * 6076) if leg["distance_nm"] else 0
-        G_avail = climb_gradient(roc_corrected, ac["cruise"])
+        G_avail = climb_gradient(roc_corrected, ac.cruise)
         climb_margin = G_avail - G_req
 
         result["climb_margin"] = {
-            "status": "PASS" if climb_margin >= ac["min_climb_margin"] else "FAIL",
+            "status": "PASS" if climb_margin >= ac.min_climb_margin else "FAIL",
             "details": {
                 "roc_corrected_fpm": round(roc_corrected, 2),
                 "delta_altitude_ft": delta_alt,
@@ -141,9 +196,9 @@ class FixedWingHardGate:
         
         fuel_total, trip_fuel, reserve_fuel = fuel_required(
             leg["distance_nm"],
-            ac["cruise"],
-            ac["fuel_flow"],
-            ac["reserve_min"]
+            ac.cruise,
+            ac.fuel_flow,
+            ac.reserve_min
         )
 
         fuel_margin = leg["fuel_onboard_kg"] - fuel_total
@@ -161,17 +216,17 @@ class FixedWingHardGate:
 
         
         weather_pass = (
-            weather["visibility_km"] >= ac["min_visibility"] and
-            wind_speed_kt <= ac["max_crosswind"]
+            weather["visibility_km"] >= ac.min_visibility and
+            wind_speed_kt <= ac.max_crosswind
         )
 
         result["visual_weather_rules"] = {
             "status": "PASS" if weather_pass else "FAIL",
             "details": {
                 "visibility_km": weather["visibility_km"],
-                "min_visibility_required": ac["min_visibility"],
+                "min_visibility_required": ac.min_visibility,
                 "wind_speed_kt": round(wind_speed_kt, 2),
-                "max_crosswind_kt": ac["max_crosswind"]
+                "max_crosswind_kt": ac.max_crosswind
             }
         }
 
@@ -182,9 +237,226 @@ class FixedWingHardGate:
 
         return result
 
+    def evaluate_status(self, ac, leg, short_circuit=True):
+        """
+        Lean evaluate(): overall status, first failing check and raw
+        (unrounded) margins, without the traceable details. With
+        short_circuit the remaining checks are skipped after the first
+        failure, so their margins are missing.
+        """
+        dest = leg["destination"]
+        weather = dest["weather"]
+
+        failed = []
+        margins = {}
+
+        # ================= MASS =================
+        Wg = ac.empty + leg["payload_kg"] + leg["fuel_onboard_kg"]
+        margins["mass_margin_kg"] = min(ac.mtow, ac.mlw) - Wg
+
+        if not (
+            Wg <= ac.mtow and
+            Wg <= ac.mlw and
+            ac.cg_min <= ac.cg_current <= ac.cg_max
+        ):
+            failed.append("mass_compliance")
+            if short_circuit:
+                return _status_result(failed, margins)
+
+        # ================= TAKEOFF / LANDING =================
+        da, _ = airport_atmosphere(dest["elevation_ft"], weather["oat_c"], weather["qnh_hpa"])
+        performance = self.performance(ac, da, Wg)
+
+        margins["runway_margin_m"] = dest["runway_length"] - performance["takeoff_distance_m"]
+        if not margins["runway_margin_m"] >= 0:
+            failed.append("takeoff_performance")
+            if short_circuit:
+                return _status_result(failed, margins)
+
+        margins["landing_margin_m"] = dest["runway_length"] - performance["landing_distance_m"]
+        if not margins["landing_margin_m"] >= 0:
+            failed.append("runway_feasibility")
+            if short_circuit:
+                return _status_result(failed, margins)
+
+        # ================= CLIMB =================
+        delta_alt = dest["elevation_ft"] - leg["origin"]["elevation_ft"]
+        G_req = delta_alt / (leg["distance_nm"] * 6076) if leg["distance_nm"] else 0
+
+        margins["climb_margin"] = climb_gradient(performance["rate_of_climb_fpm"], ac.cruise) - G_req
+        if not margins["climb_margin"] >= ac.min_climb_margin:
+            failed.append("climb_margin")
+            if short_circuit:
+                return _status_result(failed, margins)
+
+        # ================= FUEL =================
+        fuel_total, _, _ = fuel_required(leg["distance_nm"], ac.cruise, ac.fuel_flow, ac.reserve_min)
+
+        margins["fuel_margin_kg"] = leg["fuel_onboard_kg"] - fuel_total
+        if not margins["fuel_margin_kg"] >= 0:
+            failed.append("fuel_compliance")
+            if short_circuit:
+                return _status_result(failed, margins)
+
+        # ================= WEATHER =================
+        wind_speed_kt = weather["wind_speed_mps"] * 1.94384
+
+        if not (
+            weather["visibility_km"] >= ac.min_visibility and
+            wind_speed_kt <= ac.max_crosswind
+        ):
+            failed.append("visual_weather_rules")
+
+        return _status_result(failed, margins)
+
+    # Bit i of the evaluate_batch status is set when CHECKS[i] fails
+    CHECKS = (
+        "mass_compliance",
+        "takeoff_performance",
+        "runway_feasibility",
+        "climb_margin",
+        "fuel_compliance",
+        "visual_weather_rules"
+    )
+
+    def evaluate_batch(self, ac, legs, exact=True):
+        """
+        Vectorized evaluate() over struct-of-arrays legs (see LEG_FIELDS).
+        Returns {"status": uint8 failure bitmask, "passed": bool array,
+        "margins": raw margin arrays}; status matches evaluate() per leg.
+        exact=False takes powers with np.power (see pow_array), which is
+        faster on mostly unique samples but may differ from evaluate() in
+        the last bit.
+        """
+        legs = _broadcast_legs(legs)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+
+            wind_speed_kt = legs["wind_speed_mps"] * 1.94384
+            da = density_altitude(legs["elevation_ft"], legs["oat_c"], legs["qnh_hpa"])
+
+            Wg = ac.empty + legs["payload_kg"] + legs["fuel_onboard_kg"]
+
+            cg_pass = ac.cg_min <= ac.cg_current <= ac.cg_max
+
+            performance = self.performance_batch(ac, da, Wg, exact)
+            required_to = performance["takeoff_distance_m"]
+            required_ldg = performance["landing_distance_m"]
+
+            roc_corrected = performance["rate_of_climb_fpm"]
+            delta_alt = legs["elevation_ft"] - legs["origin_elevation_ft"]
+            G_req = np.divide(
+                delta_alt, legs["distance_nm"] * 6076,
+                out=np.zeros_like(delta_alt), where=legs["distance_nm"] != 0
+            )
+            G_avail = climb_gradient(roc_corrected, ac.cruise)
+
+            fuel_total, _, _ = fuel_required(
+                legs["distance_nm"], ac.cruise, ac.fuel_flow, ac.reserve_min
+            )
+
+            margins = {
+                "mass_margin_kg": min(ac.mtow, ac.mlw) - Wg,
+                "runway_margin_m": legs["runway_length"] - required_to,
+                "landing_margin_m": legs["runway_length"] - required_ldg,
+                "climb_margin": G_avail - G_req,
+                "fuel_margin_kg": legs["fuel_onboard_kg"] - fuel_total,
+                "visibility_margin_km": legs["visibility_km"] - ac.min_visibility,
+                "crosswind_margin_kt": ac.max_crosswind - wind_speed_kt
+            }
+
+        passed = {
+            "mass_compliance": (Wg <= ac.mtow) & (Wg <= ac.mlw) & cg_pass,
+            "takeoff_performance": margins["runway_margin_m"] >= 0,
+            "runway_feasibility": margins["landing_margin_m"] >= 0,
+            "climb_margin": margins["climb_margin"] >= ac.min_climb_margin,
+            "fuel_compliance": margins["fuel_margin_kg"] >= 0,
+            "visual_weather_rules": (
+                (legs["visibility_km"] >= ac.min_visibility) &
+                (wind_speed_kt <= ac.max_crosswind)
+            )
+        }
+
+        status = _status_mask(self.CHECKS, passed)
+
+        return {"status": status, "passed": status == 0, "margins": margins}
+
+    def max_gross_weight_batch(self, ac, legs):
+        """
+        Heaviest gross weight per leg that the weight-dependent checks
+        (mass, the lambda_w ** 2 takeoff model, landing) allow, solved in
+        closed form; payload_kg and fuel_onboard_kg are not read. Only
+        exact up to rounding: see payload_envelope for the bisection
+        against evaluate_batch. With a performance chart only the mass
+        limit is closed-form, and the bisection finds the rest.
+        """
+        legs = _broadcast_legs(legs)
+
+        if self.charts.chart(ac) is not None:
+            return np.full(np.shape(legs["runway_length"]), float(min(ac.mtow, ac.mlw)))
+
+        da = density_altitude(legs["elevation_ft"], legs["oat_c"], legs["qnh_hpa"])
+        da_factor = (da / 1000) * ac.to_da_sensitivity
+        runway = legs["runway_length"]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+
+            # runway >= takeoff_base * lambda_w ** 2 * (1 + da_factor)
+            k_to = ac.takeoff_base * (1 + da_factor)
+            lambda_to = np.where(k_to > 0, np.sqrt(runway / k_to), np.inf)
+
+            # runway >= landing_base * lambda_w * (1 + da_factor)
+            k_ldg = ac.landing_base * (1 + da_factor)
+            lambda_ldg = np.where(k_ldg > 0, runway / k_ldg, np.inf)
+
+        # A negative runway length fails both checks at any weight
+        lambda_max = np.where(runway >= 0, np.minimum(lambda_to, lambda_ldg), -np.inf)
+
+        return np.minimum(min(ac.mtow, ac.mlw), ac.mtow * lambda_max)
+
 
 class RotaryWingHardGate:
 
+    def __init__(self, charts=None):
+        # Performance charts (performance_tables.py) replace the analytic
+        # power / OGE ceiling model for the aircraft they cover
+        self.charts = load_charts() if charts is None else charts
+
+    def performance(self, ac, da, sigma, Wg):
+        """
+        Power margin ratio and OGE hover weight ceiling (kg) at density
+        altitude da (density ratio sigma) and gross weight Wg, from the
+        aircraft's performance chart or else the lambda_w ** 1.5 model.
+        """
+        chart = self.charts.chart(ac)
+        if chart is not None:
+            return self.charts.lookup(ac, chart, da, Wg)
+
+        lambda_w = Wg / ac.mtow if ac.mtow else 0
+        P_avail = ac.engine_power * sigma
+        P_req = ac.engine_power * (lambda_w ** 1.5)
+
+        return {
+            "power_margin_ratio": (P_avail - P_req) / P_avail if P_avail > 0 else -1,
+            "oge_max_weight_kg": ac.mtow * sigma
+        }
+
+    def performance_batch(self, ac, da, sigma, Wg, exact=True):
+        """Vectorized performance()."""
+
+        chart = self.charts.chart(ac)
+        if chart is not None:
+            return chart.lookup(da, Wg)
+
+        lambda_w = Wg / ac.mtow if ac.mtow else np.zeros_like(Wg)
+        P_avail = ac.engine_power * sigma
+        P_req = ac.engine_power * pow_array(lambda_w, 1.5, exact)
+
+        return {
+            "power_margin_ratio": np.where(P_avail > 0, (P_avail - P_req) / P_avail, -1.0),
+            "oge_max_weight_kg": ac.mtow * sigma
+        }
+
     def evaluate(self, ac, leg):
 
         result = {}
@@ -194,52 +466,50 @@ class RotaryWingHardGate:
 
         wind_speed_kt = weather["wind_speed_mps"] * 1.94384
 
-        da = density_altitude(
+        da, sigma = airport_atmosphere(
             dest["elevation_ft"],
             weather["oat_c"],
             weather["qnh_hpa"]
         )
 
-        sigma = isa_density_ratio(da)
-
-        Wg = ac["empty"] + leg["payload_kg"] + leg["fuel_onboard_kg"]
-        lambda_w = Wg / ac["mtow"] if ac["mtow"] else 0
+        Wg = ac.empty + leg["payload_kg"] + leg["fuel_onboard_kg"]
+        lambda_w = Wg / ac.mtow if ac.mtow else 0
+        performance = self.performance(ac, da, sigma, Wg)
+        charted = self.charts.chart(ac) is not None
 
         mass_pass = (
-            Wg <= ac["mtow"] and
-            ac["cg_min"] <= ac["cg_current"] <= ac["cg_max"]
+            Wg <= ac.mtow and
+            ac.cg_min <= ac.cg_current <= ac.cg_max
         )
 
         result["mass_compliance"] = {
             "status": "PASS" if mass_pass else "FAIL",
             "details": {
                 "gross_weight": round(Wg, 2),
-                "mtow": ac["mtow"],
+                "mtow": ac.mtow,
                 "lambda_w": round(lambda_w, 3)
             }
         }
 
-        P_avail = ac["engine_power"] * sigma
-        P_req = ac["engine_power"] * (lambda_w ** 1.5)
+        # Charts give the margin directly, not the power figures
+        P_avail = ac.engine_power * sigma
+        P_req = ac.engine_power * (lambda_w ** 1.5)
 
-        power_margin = (
-            (P_avail - P_req) / P_avail
-            if P_avail > 0 else -1
-        )
+        power_margin = performance["power_margin_ratio"]
 
         result["power_check"] = {
-            "status": "PASS" if power_margin >= ac["min_power_margin"] else "FAIL",
+            "status": "PASS" if power_margin >= ac.min_power_margin else "FAIL",
             "details": {
                 "density_altitude_ft": round(da, 2),
                 "sigma": round(sigma, 3),
-                "engine_power": ac["engine_power"],
-                "power_available": round(P_avail, 2),
-                "power_required": round(P_req, 2),
+                "engine_power": ac.engine_power,
+                "power_available": None if charted else round(P_avail, 2),
+                "power_required": None if charted else round(P_req, 2),
                 "power_margin_ratio": round(power_margin, 3)
             }
         }
 
-        Wmax_oge = ac["mtow"] * sigma
+        Wmax_oge = performance["oge_max_weight_kg"]
         oge_margin = (Wmax_oge - Wg) / Wmax_oge
 
         result["oge_feasibility"] = {
@@ -253,9 +523,9 @@ class RotaryWingHardGate:
 
         fuel_total, trip_fuel, reserve_fuel = fuel_required(
             leg["distance_nm"],
-            ac["cruise"],
-            ac["fuel_flow"],
-            ac["reserve_min"]
+            ac.cruise,
+            ac.fuel_flow,
+            ac.reserve_min
         )
 
         fuel_margin = leg["fuel_onboard_kg"] - fuel_total
@@ -272,8 +542,8 @@ class RotaryWingHardGate:
         }
 
         weather_pass = (
-            weather["visibility_km"] >= ac["min_visibility"] and
-            wind_speed_kt <= ac["max_crosswind"]
+            weather["visibility_km"] >= ac.min_visibility and
+            wind_speed_kt <= ac.max_crosswind
         )
 
         result["visual_weather_rules"] = {
@@ -291,86 +561,360 @@ class RotaryWingHardGate:
 
         return result
 
-results = {}
-
-origin_key = mission_data["origin"].lower()
-origin = location_data["locations"][origin_key]
-dest_keys = set(d["destination"].lower() for d in mission_data["deliveries"])
-
-for aircraft in mission_data["assigned_fleet"]:
-
-    ac_name = aircraft["aircraft_name"]
-    ac_type = aircraft["type"]
-
-    cat = next(c for c in aircraft_data if c.lower() == ac_type.lower())
-    model = next(m for m in aircraft_data[cat] if m.lower() == ac_name.lower())
-    params = aircraft_data[cat][model]
-
-    def get_val(key, default=0):
-        return params.get(key, {}).get("value", default)
-
-    def parse_power(val):
-        if isinstance(val, str) and "x" in val.lower():
-            a, b = val.lower().split("x")
-            return float(a) * float(b)
-        try:
-            return float(val)
-        except:
-            return 0
-
-    ac = {
-        "type": "fixed" if "fixed" in ac_type.lower() else "rotary",
-        "empty": get_val("Empty Weight (OEW)") or get_val("Empty Weight"),
-        "mtow": get_val("Max Takeoff Weight (MTOW)") or get_val("MTOW"),
-        "mlw": get_val("Max Landing Weight") or get_val("MTOW"),
-        "takeoff_base": get_val("Takeoff Distance"),
-        "landing_base": get_val("Landing Distance"),
-        "roc": get_val("Rate of Climb") or get_val("ROC"),
-        "roc_loss": get_val("ROC loss per 1000 ft") / 100,
-        "cruise": get_val("Cruise Speed") or get_val("Cruised Speed"),
-        "fuel_flow": get_val("Cruise") or get_val("Phase Cruise"),
-        "reserve_min": get_val("Reserve Policy") or get_val("Phase Reserve") or 30,
-        "engine_power": parse_power(get_val("Max Continuous Power")),
-        "hover_ceiling_oge": get_val("Hover Ceiling OGE"),
-        "to_da_sensitivity": get_val("Takeoff Increase per 1000 ft DA") / 100,
-        "min_climb_margin": 0.01,
-        "min_power_margin": 0.05,
-        "min_visibility": 5,
-        "max_crosswind": get_val("Max Crosswind") or 20,
-        "cg_min": 20,
-        "cg_max": 30,
-        "cg_current": 25
-    }
+    def evaluate_status(self, ac, leg, short_circuit=True):
+        """
+        Lean evaluate(): overall status, first failing check and raw
+        (unrounded) margins, without the traceable details. With
+        short_circuit the remaining checks are skipped after the first
+        failure, so their margins are missing.
+        """
+        dest = leg["destination"]
+        weather = dest["weather"]
+
+        failed = []
+        margins = {}
+
+        # ================= MASS =================
+        Wg = ac.empty + leg["payload_kg"] + leg["fuel_onboard_kg"]
+        margins["mass_margin_kg"] = ac.mtow - Wg
+
+        if not (
+            Wg <= ac.mtow and
+            ac.cg_min <= ac.cg_current <= ac.cg_max
+        ):
+            failed.append("mass_compliance")
+            if short_circuit:
+                return _status_result(failed, margins)
+
+        # ================= POWER =================
+        da, sigma = airport_atmosphere(dest["elevation_ft"], weather["oat_c"], weather["qnh_hpa"])
+        performance = self.performance(ac, da, sigma, Wg)
+
+        margins["power_margin_ratio"] = performance["power_margin_ratio"]
+        if not margins["power_margin_ratio"] >= ac.min_power_margin:
+            failed.append("power_check")
+            if short_circuit:
+                return _status_result(failed, margins)
+
+        # ================= OGE =================
+        Wmax_oge = performance["oge_max_weight_kg"]
+
+        margins["oge_margin_ratio"] = (Wmax_oge - Wg) / Wmax_oge
+        if not margins["oge_margin_ratio"] >= 0:
+            failed.append("oge_feasibility")
+            if short_circuit:
+                return _status_result(failed, margins)
+
+        # ================= FUEL =================
+        fuel_total, _, _ = fuel_required(leg["distance_nm"], ac.cruise, ac.fuel_flow, ac.reserve_min)
+
+        margins["fuel_margin_kg"] = leg["fuel_onboard_kg"] - fuel_total
+        if not margins["fuel_margin_kg"] >= 0:
+            failed.append("fuel_compliance")
+            if short_circuit:
+                return _status_result(failed, margins)
+
+        # ================= WEATHER =================
+        wind_speed_kt = weather["wind_speed_mps"] * 1.94384
+
+        if not (
+            weather["visibility_km"] >= ac.min_visibility and
+            wind_speed_kt <= ac.max_crosswind
+        ):
+            failed.append("visual_weather_rules")
+
+        return _status_result(failed, margins)
+
+    # Bit i of the evaluate_batch status is set when CHECKS[i] fails
+    CHECKS = (
+        "mass_compliance",
+        "power_check",
+        "oge_feasibility",
+        "fuel_compliance",
+        "visual_weather_rules"
+    )
+
+    def evaluate_batch(self, ac, legs, exact=True):
+        """
+        Vectorized evaluate() over struct-of-arrays legs (see LEG_FIELDS).
+        Returns {"status": uint8 failure bitmask, "passed": bool array,
+        "margins": raw margin arrays}; status matches evaluate() per leg.
+        exact=False takes powers with np.power (see pow_array), which is
+        faster on mostly unique samples but may differ from evaluate() in
+        the last bit.
+        """
+        legs = _broadcast_legs(legs)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+
+            wind_speed_kt = legs["wind_speed_mps"] * 1.94384
+            da = density_altitude(legs["elevation_ft"], legs["oat_c"], legs["qnh_hpa"])
+            sigma = isa_density_ratio_array(da, exact)
+
+            Wg = ac.empty + legs["payload_kg"] + legs["fuel_onboard_kg"]
+
+            cg_pass = ac.cg_min <= ac.cg_current <= ac.cg_max
+
+            performance = self.performance_batch(ac, da, sigma, Wg, exact)
+            power_margin = performance["power_margin_ratio"]
+
+            Wmax_oge = performance["oge_max_weight_kg"]
+
+            fuel_total, _, _ = fuel_required(
+                legs["distance_nm"], ac.cruise, ac.fuel_flow, ac.reserve_min
+            )
+
+            margins = {
+                "mass_margin_kg": ac.mtow - Wg,
+                "power_margin_ratio": power_margin,
+                "oge_margin_ratio": (Wmax_oge - Wg) / Wmax_oge,
+                "fuel_margin_kg": legs["fuel_onboard_kg"] - fuel_total,
+                "visibility_margin_km": legs["visibility_km"] - ac.min_visibility,
+                "crosswind_margin_kt": ac.max_crosswind - wind_speed_kt
+            }
+
+        passed = {
+            "mass_compliance": (Wg <= ac.mtow) & cg_pass,
+            "power_check": margins["power_margin_ratio"] >= ac.min_power_margin,
+            "oge_feasibility": margins["oge_margin_ratio"] >= 0,
+            "fuel_compliance": margins["fuel_margin_kg"] >= 0,
+            "visual_weather_rules": (
+                (legs["visibility_km"] >= ac.min_visibility) &
+                (wind_speed_kt <= ac.max_crosswind)
+            )
+        }
+
+        status = _status_mask(self.CHECKS, passed)
+
+        return {"status": status, "passed": status == 0, "margins": margins}
+
+    def max_gross_weight_batch(self, ac, legs):
+        """
+        Heaviest gross weight per leg that the weight-dependent checks
+        (mass, power margin, OGE ceiling) allow, solved in closed form;
+        payload_kg and fuel_onboard_kg are not read. Only exact up to
+        rounding: see payload_envelope for the bisection against
+        evaluate_batch. With a performance chart the power limit is left
+        to the bisection.
+        """
+        legs = _broadcast_legs(legs)
+
+        da = density_altitude(legs["elevation_ft"], legs["oat_c"], legs["qnh_hpa"])
+        sigma = isa_density_ratio_array(da)
+
+        chart = self.charts.chart(ac)
+        if chart is not None:
+            return np.minimum(ac.mtow, chart.lookup(da, 0.0)["oge_max_weight_kg"])
+
+        # (sigma - lambda_w ** 1.5) / sigma >= min_power_margin
+        power_limit = sigma * (1 - ac.min_power_margin)
+        lambda_power = np.where(power_limit >= 0, pow_array(np.maximum(power_limit, 0), 2 / 3), -np.inf)
+
+        # No available power leaves the margin at -1
+        if ac.engine_power <= 0:
+            lambda_power = np.full_like(sigma, np.inf if ac.min_power_margin <= -1 else -np.inf)
+
+        # Wg <= mtow * sigma
+        W_oge = ac.mtow * sigma
+
+        return np.minimum(np.minimum(ac.mtow, ac.mtow * lambda_power), W_oge)
+
+class HardGateCache:
+    """
+    Bounded LRU cache in front of a FixedWingHardGate/RotaryWingHardGate.
+
+    evaluate() and evaluate_status() are pure functions of the aircraft
+    profile, the origin elevation, the destination (elevation, runway,
+    weather snapshot), the leg distance and the two weights, so all of
+    them form the cache key; both kinds of result are cached side by side.
+    Payload and fuel are quantized to `weight_step_kg`; the default only
+    absorbs floating-point noise from summing legs in different orders.
+
+    Because the aircraft and weather values are part of the key, a changed
+    profile or weather report can never be served a stale result. Entries
+    for an airport's previous weather are left to age out of the LRU, so
+    contexts at different weather times can share one cache.
+
+    Only the scalar evaluations are cached. The planners read their legs
+    from the mission's LegFeasibilityTensor, which is filled by a single
+    evaluate_batch() call; batches are already vectorized, go straight to
+    the gate and are only counted (batches/batch_legs in stats()), so a
+    planning run shows up there rather than as hits and misses.
+
+    Cached results are shared between callers and must be treated as
+    read-only. The bookkeeping is locked, so one cache can serve several
+    planning threads.
+    """
+
+    def __init__(self, evaluator, maxsize=65536, weight_step_kg=1e-6):
+        self.evaluator = evaluator
+        self.maxsize = maxsize
+        self.weight_step_kg = weight_step_kg
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.batches = 0
+        self.batch_legs = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _airport_snapshot(self, airport):
+        return (
+            airport.get("icao") or airport.get("name"),
+            airport["elevation_ft"],
+            airport["runway_length"],
+            tuple(airport["weather"].items())
+        )
+
+    def key(self, ac, leg):
+        step = self.weight_step_kg
+        return (
+            ac.key,
+            leg["origin"]["elevation_ft"],
+            self._airport_snapshot(leg["destination"]),
+            leg["distance_nm"],
+            round(leg["payload_kg"] / step),
+            round(leg["fuel_onboard_kg"] / step)
+        )
+
+    def _lookup(self, key, compute):
+
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            self._entries[key] = result
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
 
-    aircraft_result = {}
+        return result
 
-    for dest_key in dest_keys:
-        dest = location_data["locations"][dest_key]
+    def evaluate(self, ac, leg):
+        return self._lookup(
+            self.key(ac, leg) + ("details",),
+            lambda: self.evaluator.evaluate(ac, leg)
+        )
 
-        distance_nm = haversine_nm(
-            origin["coords"][0], origin["coords"][1],
-            dest["coords"][0], dest["coords"][1]
+    def evaluate_status(self, ac, leg, short_circuit=True):
+        return self._lookup(
+            self.key(ac, leg) + ("status", short_circuit),
+            lambda: self.evaluator.evaluate_status(ac, leg, short_circuit)
         )
 
-        leg = {
-            "origin": origin,
-            "destination": dest,
-            "distance_nm": distance_nm,
-            "payload_kg": mission_data["total_payload_kg"],
-            "fuel_onboard_kg": aircraft["fuel_kg"]
+    def evaluate_batch(self, ac, legs, exact=True):
+        """Batches are already vectorized and bypass the cache; they are only counted."""
+
+        result = self.evaluator.evaluate_batch(ac, legs, exact)
+
+        with self._lock:
+            self.batches += 1
+            self.batch_legs += result["passed"].size
+
+        return result
+
+    def max_gross_weight_batch(self, ac, legs):
+        return self.evaluator.max_gross_weight_batch(ac, legs)
+
+    def invalidate(self, predicate=None):
+        """Drops every entry (or those whose key matches predicate)."""
+
+        with self._lock:
+            if predicate is None:
+                stale = list(self._entries)
+            else:
+                stale = [key for key in self._entries if predicate(key)]
+
+            for key in stale:
+                del self._entries[key]
+
+            self.invalidations += len(stale)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            "entries": len(self._entries),
+            "invalidations": self.invalidations,
+            "batches": self.batches,
+            "batch_legs": self.batch_legs
         }
 
-        evaluator = FixedWingHardGate() if ac["type"] == "fixed" else RotaryWingHardGate()
-        aircraft_result[dest_key] = evaluator.evaluate(ac, leg)
+def evaluate_hard_gate_leg(ac, aircraft, origin, dest, distance_nm, mission_data, evaluator=None):
+    """
+    Traceable hard-gate result for one aircraft flying origin -> dest with
+    the full payload, from `evaluator` (a fresh gate of the aircraft's kind
+    by default).
+    """
+
+    leg = {
+        "origin": origin,
+        "destination": dest,
+        "distance_nm": distance_nm,
+        "payload_kg": mission_data["total_payload_kg"],
+        "fuel_onboard_kg": aircraft["fuel_kg"]
+    }
+
+    if evaluator is None:
+        evaluator = FixedWingHardGate() if ac.type == "fixed" else RotaryWingHardGate()
+    return evaluator.evaluate(ac, leg)
+
+def evaluate_fleet(location_data, mission_data, distances):
+    """Traceable hard-gate results for every fleet aircraft on every delivery leg from origin."""
+
+    results = {}
+
+    origin_key = mission_data["origin"].lower()
+    origin = location_data["locations"][origin_key]
+    dest_keys = set(d["destination"].lower() for d in mission_data["deliveries"])
+
+    # One gate per kind for the whole fleet, both on the same charts
+    charts = load_charts()
+    evaluators = {"fixed": FixedWingHardGate(charts), "rotary": RotaryWingHardGate(charts)}
+
+    for aircraft in mission_data["assigned_fleet"]:
+
+        ac_name = aircraft["aircraft_name"]
+        ac_type = aircraft["type"]
+
+        ac = build_aircraft(ac_name, ac_type)
+
+        aircraft_result = {}
+
+        for dest_key in dest_keys:
+            aircraft_result[dest_key] = evaluate_hard_gate_leg(
+                ac, aircraft, origin,
+                location_data["locations"][dest_key],
+                distances.distance_nm(origin_key, dest_key),
+                mission_data,
+                evaluators[ac.type]
+            )
+
+        results[ac_name] = aircraft_result
+
+    return {
+        "mission_id": mission_data["mission_id"],
+        "hard_gate_summary": results
+    }
+
+def main():
 
-    results[ac_name] = aircraft_result
+    inputs = load_inputs()
+    output = evaluate_fleet(inputs["location_data"], inputs["mission_data"], inputs["distances"])
 
-output = {
-    "mission_id": mission_data["mission_id"],
-    "hard_gate_summary": results
-}
+    with open("hard_gate_output.json", "w") as f:
+        json.dump(output, f, indent=2)
 
-with open("hard_gate_output.json", "w") as f:
-    json.dump(output, f, indent=2)
+    print("Hard Gate evaluation (TRACEABLE) completed.")
 
-print("Hard Gate evaluation (TRACEABLE) completed.")
+if __name__ == "__main__":
+    main()
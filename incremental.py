@@ -0,0 +1,322 @@
+import time
+from collections import defaultdict
+
+from mission_inputs import load_inputs
+from aircraft_profiles import build_aircraft, load_catalog
+from hard_feasibility_checks import evaluate_hard_gate_leg
+from dynamic_mission_gate import run_aircraft_mission
+from run_full_simulation import simulate_aircraft
+from safety_margin_analysis import analyze_aircraft_margins
+from objective_threshold import evaluate_objective
+from objective_engine import score_aircraft
+from planning_context import PlanningContext, new_evaluators
+from reachability import ReachabilityGraphs
+import mission_planning_engine
+
+# Recompute order; a cell only reads cells of earlier stages
+STAGE_ORDER = (
+    "hard_gate",
+    "dynamic_mission",
+    "full_simulation",
+    "safety_margin",
+    "objective_threshold",
+    "objective_engine",
+    "route_planning"
+)
+
+# Per-aircraft stage -> stages reading its result for the same aircraft
+DOWNSTREAM = {
+    "hard_gate": ("safety_margin",),
+    "dynamic_mission": ("objective_engine",),
+    "safety_margin": ("objective_threshold", "objective_engine")
+}
+
+# Output key holding the per-aircraft results of each stage
+SUMMARY_KEYS = {
+    "hard_gate": "hard_gate_summary",
+    "dynamic_mission": "dynamic_mission_result",
+    "full_simulation": "aircraft_simulation",
+    "safety_margin": "safety_margin_analysis",
+    "objective_threshold": "objective_threshold_evaluation",
+    "objective_engine": "objective_scores",
+    "route_planning": "route_planning"
+}
+
+
+class IncrementalPipeline:
+    """
+    Pipeline results kept up to date cell by cell.
+
+    A cell is one hard-gate leg (aircraft, destination) or one aircraft's
+    result in a later stage. Each cell records the inputs it read as
+    tokens: ("location", key) for an airport's weather/runway/coords,
+    ("aircraft", name) for a catalog profile or dispatch fuel, and
+    ("payload",) for the delivery weights. An update marks the cells
+    behind the changed tokens dirty, adds the per-aircraft cells
+    downstream of them, and recomputes only those. Results keep the shape
+    of pipeline.run_pipeline() (plus "route_planning" and
+    "planning_report" when `plan` is set), so they match a full rerun on
+    the updated inputs.
+
+    Hard-gate caches and reachability graphs are kept across updates, so
+    even recomputed cells re-evaluate only legs touching the changed
+    airport.
+    """
+
+    def __init__(self, inputs=None, plan=False, search="bnb", top_k=3):
+        self.inputs = inputs if inputs is not None else load_inputs()
+        self.plan = plan
+        self.search = search
+        self.top_k = top_k
+
+        self.evaluators = new_evaluators()
+        self.graphs = ReachabilityGraphs(
+            self.inputs["location_data"], self.inputs["alternate_data"], self.inputs["distances"]
+        )
+
+        self.results = {"inputs": self.inputs}
+        self.cells_recomputed = 0
+
+        self.rebuild()
+
+    # ---- Setup ----
+
+    def rebuild(self):
+        """Recomputes every cell (e.g. after destinations or the scenario change)."""
+
+        mission_data = self.inputs["mission_data"]
+
+        self.catalog = load_catalog()
+        self.fleet = {a["aircraft_name"]: (i, a) for i, a in enumerate(mission_data["assigned_fleet"])}
+        self._aircraft_states = {name: self._aircraft_state(a) for name, (_, a) in self.fleet.items()}
+
+        self._dependents = defaultdict(set)
+        self._tokens = {}
+
+        self.origin_key = mission_data["origin"].lower()
+        dest_keys = set(d["destination"].lower() for d in mission_data["deliveries"])
+
+        stages = [s for s in STAGE_ORDER if self.plan or s != "route_planning"]
+        for stage in stages:
+            self.results[stage] = {"mission_id": mission_data["mission_id"], SUMMARY_KEYS[stage]: {}}
+        for name in self.fleet:
+            self.results["hard_gate"]["hard_gate_summary"][name] = {}
+
+        cells = [("hard_gate", name, dest_key) for name in self.fleet for dest_key in dest_keys]
+        cells += [(stage, name) for stage in stages[1:] for name in self.fleet]
+
+        return self._recompute(cells)
+
+    def _aircraft_state(self, aircraft):
+        ac = build_aircraft(aircraft["aircraft_name"], aircraft["type"], self.catalog)
+        return ac.key, self.catalog.params(aircraft["aircraft_name"]), aircraft["fuel_kg"]
+
+    # ---- Updates ----
+
+    def update_location(self, key, weather=None, **fields):
+        """
+        Applies a weather report (partial dict, e.g. {"oat_c": 28}) and/or
+        airport fields (elevation_ft, runway_length, coords, ...) to one
+        airport and recomputes what depends on it. Returns the recomputed
+        cells.
+        """
+        found = False
+
+        for airports in (self.inputs["location_data"]["locations"], self.inputs["alternate_data"]["alternates"]):
+            airport = airports.get(key)
+            if airport is None:
+                continue
+
+            found = True
+            if weather:
+                airport["weather"] = dict(airport["weather"], **weather)
+            airport.update(fields)
+
+        if not found:
+            raise KeyError(f"Unknown airport: {key}")
+
+        if "coords" in fields:
+            self.inputs["distances"].update_coords(key, fields["coords"])
+
+        return self._refresh([("location", key)])
+
+    def update_payload(self, deliveries=None, total_payload_kg=None):
+        """
+        Changes delivery weights and/or the total payload. Changing the set
+        of destinations reshapes the hard-gate summary, so that falls back
+        to a rebuild.
+        """
+        mission_data = self.inputs["mission_data"]
+
+        if deliveries is not None:
+            before = [d["destination"].lower() for d in mission_data["deliveries"]]
+            mission_data["deliveries"] = deliveries
+            if [d["destination"].lower() for d in deliveries] != before:
+                return self.rebuild()
+
+        if total_payload_kg is not None:
+            mission_data["total_payload_kg"] = total_payload_kg
+
+        return self._refresh([("payload",)])
+
+    def update_dispatch_fuel(self, aircraft_name, fuel_kg):
+        """Changes one fleet aircraft's dispatch fuel load."""
+
+        self.fleet[aircraft_name][1]["fuel_kg"] = fuel_kg
+        self._aircraft_states[aircraft_name] = self._aircraft_state(self.fleet[aircraft_name][1])
+
+        return self._refresh([("aircraft", aircraft_name)])
+
+    def reload_aircraft(self):
+        """Re-reads aircraft_parameters.json and recomputes aircraft whose profile changed."""
+
+        self.catalog = load_catalog()
+
+        changed = []
+        for name, (_, aircraft) in self.fleet.items():
+            state = self._aircraft_state(aircraft)
+            if state != self._aircraft_states[name]:
+                self._aircraft_states[name] = state
+                changed.append(("aircraft", name))
+
+        return self._refresh(changed)
+
+    # ---- Dependency tracking ----
+
+    def _refresh(self, tokens):
+
+        dirty = set()
+        for token in tokens:
+            dirty |= self._dependents.get(token, set())
+
+        return self._recompute(dirty)
+
+    def _recompute(self, cells):
+
+        # Insertion-ordered, so a rebuild fills the outputs in fleet order
+        pending = dict.fromkeys(cells)
+        frontier = list(pending)
+
+        while frontier:
+            stage, name = frontier.pop()[:2]
+            for down in DOWNSTREAM.get(stage, ()):
+                if (down, name) not in pending:
+                    pending[down, name] = None
+                    frontier.append((down, name))
+
+        ordered = sorted(
+            (cell for cell in pending if self.plan or cell[0] != "route_planning"),
+            key=lambda cell: STAGE_ORDER.index(cell[0])
+        )
+
+        start = time.perf_counter()
+
+        # Merged deliveries and scenario settings depend on the payload, so
+        # the planning context is rebuilt for every update (sharing the caches)
+        self.context = PlanningContext(self.inputs, evaluators=self.evaluators)
+
+        for cell in ordered:
+            value, tokens = self._compute(cell)
+
+            stage, name = cell[:2]
+            summary = self.results[stage][SUMMARY_KEYS[stage]]
+            if stage == "hard_gate":
+                summary[name][cell[2]] = value
+            else:
+                summary[name] = value
+
+            for token in self._tokens.get(cell, ()):
+                self._dependents[token].discard(cell)
+            for token in tokens:
+                self._dependents[token].add(cell)
+            self._tokens[cell] = tokens
+
+        if self.plan and any(cell[0] == "route_planning" for cell in ordered):
+            self.results["planning_report"] = mission_planning_engine.build_planning_report(self.context, self.results["route_planning"])
+
+        self.cells_recomputed += len(ordered)
+        self.last_update_s = time.perf_counter() - start
+
+        return ordered
+
+    def _compute(self, cell):
+        """(value, input tokens read) for one cell."""
+
+        stage, name = cell[:2]
+        fleet_index, aircraft = self.fleet[name]
+
+        location_data = self.inputs["location_data"]
+        mission_data = self.inputs["mission_data"]
+        alternate_data = self.inputs["alternate_data"]
+        distances = self.inputs["distances"]
+
+        origin_key = self.origin_key
+        delivery_keys = [d["destination"].lower() for d in mission_data["deliveries"]]
+
+        aircraft_token = ("aircraft", name)
+        route_tokens = [("location", key) for key in [origin_key] + delivery_keys]
+        route_tokens += [aircraft_token, ("payload",)]
+
+        ac = build_aircraft(aircraft["aircraft_name"], aircraft["type"], self.catalog)
+        evaluator = self.evaluators[ac.type]
+
+        if stage == "hard_gate":
+            dest_key = cell[2]
+            value = evaluate_hard_gate_leg(
+                ac, aircraft,
+                location_data["locations"][origin_key],
+                location_data["locations"][dest_key],
+                distances.distance_nm(origin_key, dest_key),
+                mission_data,
+                evaluator
+            )
+            return value, [("location", origin_key), ("location", dest_key), aircraft_token, ("payload",)]
+
+        if stage in ("dynamic_mission", "full_simulation"):
+            if stage == "dynamic_mission":
+                value = run_aircraft_mission(
+                    aircraft, location_data, mission_data, alternate_data, distances, evaluator, self.graphs
+                )
+            else:
+                value = simulate_aircraft(aircraft, location_data, mission_data, alternate_data, distances, evaluator)
+
+            # Alternates are only consulted once a leg runs short of fuel;
+            # refuel routes may pass through any airport
+            if (
+                value["mission_status"] in ("FAIL_FUEL_BEFORE_DEST", "DIVERTED", "FAIL_NO_ALTERNATE", "FAIL_RETURN_BASE")
+                or any(leg.get("refuel_stop") for leg in value["legs"])
+            ):
+                route_tokens += [("location", key) for key in location_data["locations"]]
+                route_tokens += [("location", key) for key in alternate_data["alternates"]]
+
+            return value, route_tokens
+
+        if stage == "safety_margin":
+            aircraft_result = self.results["hard_gate"]["hard_gate_summary"][name]
+            value = analyze_aircraft_margins(name, aircraft_result, location_data, origin_key, distances, self.catalog)
+            return value, [("location", key) for key in [origin_key] + list(aircraft_result)] + [aircraft_token]
+
+        if stage == "objective_threshold":
+            value = evaluate_objective(
+                name,
+                self.results["hard_gate"]["hard_gate_summary"][name],
+                mission_data,
+                self.results["safety_margin"]
+            )
+            return value, []
+
+        if stage == "objective_engine":
+            value = score_aircraft(
+                self.results["dynamic_mission"]["dynamic_mission_result"][name],
+                self.results["safety_margin"]["safety_margin_analysis"].get(name, {}),
+                mission_data,
+                self.context.weights,
+                self.context.scenario_id
+            )
+            return value, [("payload",)]
+
+        value = mission_planning_engine.plan_aircraft(self.context, fleet_index, self.search, self.top_k)
+        for dest_key in delivery_keys:
+            route_tokens += [("location", key) for key in alternate_data.get(dest_key, [])]
+
+        return value, route_tokens
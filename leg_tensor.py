@@ -0,0 +1,224 @@
+import numpy as np
+
+from flight_physics import compute_leg_fuel, leg_time_hr, min_departure_fuel_array
+
+# Missions with more distinct payload levels are evaluated leg by leg instead
+MAX_PAYLOAD_LEVELS = 1024
+
+# Payloads within this step share a level (absorbs noise from summing deliveries in different orders)
+PAYLOAD_STEP_KG = 1e-6
+
+# Leg margins the route search scores on (see mission_planning_engine.extract_min_margin)
+MARGIN_KEYS = ("climb_margin", "oge_margin_ratio")
+
+
+def payload_levels(total_payload_kg, weights, limit=MAX_PAYLOAD_LEVELS):
+    """
+    Every payload still on board after delivering some subset of
+    `weights` (ascending), or None when there are more than `limit`.
+    """
+    delivered = {0}
+
+    for weight in weights:
+        delivered |= {s + weight for s in delivered}
+        if len(delivered) > limit:
+            return None
+
+    return sorted(total_payload_kg - s for s in delivered)
+
+
+class LegFeasibilityTensor:
+    """
+    Hard-gate outcome of every leg a route search over one mission can fly
+    with one aircraft, indexed [from, to, payload level, fuel level]:
+
+      from    origin, then each delivery stop (ctx.deliveries order)
+      to      each delivery stop
+      payload every payload left after some subset of deliveries
+      fuel    the departure fuel loads asked for (the dispatch load when
+              every stop refuels); with minimum_fuel each level is a cap
+              and a leg departs with the least legal fuel under it
+
+    All cells are evaluated up front in one evaluate_batch call. Pass/fail
+    bits are kept bit-packed (np.packbits): `fuel` per [from, to, fuel]
+    says the leg plus the first alternate of its destination and the
+    reserve fit in the departure fuel, `gate` per cell says the hard gate
+    passed with no check skipped. `margin` holds the smallest of the
+    MARGIN_KEYS margins per cell (NaN when the gate reports none), and the
+    per-pair arrays hold leg distance, fuel, time, required fuel (leg,
+    first alternate and reserve) and departure fuel, so a route search
+    reads any leg in O(1).
+
+    `margin` is kept in float64 rather than float32: the planners compare
+    it against the policy threshold and score routes on it exactly as
+    simulate_leg() does on the scalar path, and a rounded copy would flip
+    legs on the threshold and change route scores wherever a route mixes
+    tensor and scalar legs.
+
+    `complete` is False when the mission has more than
+    MAX_PAYLOAD_LEVELS payload levels; the tensor is then empty and
+    cell() always returns None.
+
+    Scope: one tensor covers the airports of one mission (its origin and
+    delivery stops), not the whole airport network, and one aircraft
+    profile. The fuel axis takes any number of levels, but the planners
+    build it with the single load they fly (PlanningContext.leg_tensor),
+    so legs at other fuel loads are gated one by one.
+    """
+
+    def __init__(self, ctx, ac, evaluator, fuel_levels, minimum_fuel=False):
+
+        locations = ctx.location_data["locations"]
+        stop_keys = [d["destination"] for d in ctx.deliveries]
+        source_keys = [ctx.origin_key] + stop_keys
+
+        self.sources = {key: i for i, key in reversed(list(enumerate(source_keys)))}
+        self.targets = {key: j for j, key in reversed(list(enumerate(stop_keys)))}
+
+        levels = payload_levels(ctx.total_payload_kg, [d["weight_kg"] for d in ctx.deliveries])
+        self.complete = levels is not None
+        self.payloads = np.array(levels or [], dtype=float)
+        self.fuels = np.array(fuel_levels, dtype=float)
+
+        self._payload_index = {round(p / PAYLOAD_STEP_KG): i for i, p in enumerate(self.payloads.tolist())}
+
+        n_from, n_to = len(source_keys), len(stop_keys)
+        self.shape = (n_from, n_to, len(self.payloads), len(self.fuels))
+
+        # ---- Per-pair leg physics (scalar, as the planners compute it) ----
+        self.distance_nm = np.zeros((n_from, n_to))
+        self.fuel_kg = np.zeros((n_from, n_to))
+        self.time_hr = np.zeros((n_from, n_to))
+        self.required_kg = np.zeros((n_from, n_to))
+
+        alternate_fuel = []
+        for dest_key in stop_keys:
+            dest = locations[dest_key]
+            alternates = ctx.alternate_data.get(dest_key, [])
+            if alternates:
+                alt_key = alternates[0]
+                alt_distance = ctx.distances.distance_nm(dest_key, alt_key)
+                alternate_fuel.append(compute_leg_fuel(ac, dest, locations[alt_key], alt_distance)[0])
+            else:
+                alternate_fuel.append(0)
+
+        for i, src_key in enumerate(source_keys):
+            src = locations[src_key]
+            for j, dest_key in enumerate(stop_keys):
+                dest = locations[dest_key]
+                distance_nm = ctx.distances.distance_nm(src_key, dest_key)
+                fuel_needed = compute_leg_fuel(ac, src, dest, distance_nm)[0]
+
+                self.distance_nm[i, j] = distance_nm
+                self.fuel_kg[i, j] = fuel_needed
+                self.time_hr[i, j] = leg_time_hr(ac, src, dest, distance_nm)
+                self.required_kg[i, j] = fuel_needed + alternate_fuel[j] + ac.reserve_fuel
+
+        # Departure fuel per [from, to, fuel]: the level itself, or the least
+        # legal load (flight_physics.min_departure_fuel_array) when it fits under the level
+        self.departure_fuel_kg = np.broadcast_to(self.fuels, (n_from, n_to, len(self.fuels))).copy()
+        if minimum_fuel:
+            least = min_departure_fuel_array(ac, self.fuel_kg, self.required_kg, self.distance_nm)[:, :, None]
+            self.departure_fuel_kg = np.where(least <= self.fuels, least, self.departure_fuel_kg)
+
+        self._fuel_index = None if minimum_fuel else {f: i for i, f in enumerate(self.fuels.tolist())}
+
+        fuel_ok = self.required_kg[:, :, None] <= self.departure_fuel_kg
+        self._fuel_bits = np.packbits(fuel_ok, axis=None)
+
+        # ---- Hard gate over every cell in one batch ----
+        shape = self.shape
+        size = int(np.prod(shape))
+
+        if size:
+            origins = [locations[key] for key in source_keys]
+            dests = [locations[key] for key in stop_keys]
+
+            def per_to(values):
+                return np.broadcast_to(np.array(values, dtype=float)[None, :, None, None], shape)
+
+            legs = {
+                "origin_elevation_ft": np.broadcast_to(
+                    np.array([a["elevation_ft"] for a in origins], dtype=float)[:, None, None, None], shape
+                ),
+                "elevation_ft": per_to([d["elevation_ft"] for d in dests]),
+                "runway_length": per_to([d["runway_length"] for d in dests]),
+                "oat_c": per_to([d["weather"]["oat_c"] for d in dests]),
+                "qnh_hpa": per_to([d["weather"]["qnh_hpa"] for d in dests]),
+                "wind_speed_mps": per_to([d["weather"]["wind_speed_mps"] for d in dests]),
+                "visibility_km": per_to([d["weather"]["visibility_km"] for d in dests]),
+                "payload_kg": np.broadcast_to(self.payloads[None, None, :, None], shape),
+                "fuel_onboard_kg": np.broadcast_to(
+                    (self.departure_fuel_kg - self.fuel_kg[:, :, None])[:, :, None, :], shape
+                ),
+                "distance_nm": np.broadcast_to(self.distance_nm[:, :, None, None], shape)
+            }
+            result = evaluator.evaluate_batch(ac, {field: values.ravel() for field, values in legs.items()})
+
+            margins = [result["margins"][key] for key in MARGIN_KEYS if key in result["margins"]]
+            margin = np.minimum.reduce(margins) if margins else np.full(size, np.nan)
+
+            self._gate_bits = np.packbits(result["passed"])
+            self.margin = margin.reshape(shape)
+        else:
+            self._gate_bits = np.zeros(0, dtype=np.uint8)
+            self.margin = np.zeros(shape)
+
+    # ---- Lookups ----
+
+    def cell(self, from_key, to_key, payload_kg, fuel_kg):
+        """(from, to, payload, fuel) indexes of a leg, or None if the tensor does not cover it."""
+
+        i = self.sources.get(from_key)
+        j = self.targets.get(to_key)
+        p = self._payload_index.get(round(payload_kg / PAYLOAD_STEP_KG))
+
+        if i is None or j is None or p is None:
+            return None
+
+        if self._fuel_index is not None:
+            f = self._fuel_index.get(fuel_kg)
+        else:
+            matches = np.flatnonzero(self.departure_fuel_kg[i, j] == fuel_kg)
+            f = int(matches[0]) if len(matches) else None
+
+        if f is None:
+            return None
+
+        return i, j, p, f
+
+    def departure_fuel(self, from_key, to_key, level=0):
+        """Fuel a leg departs with at fuel level `level`."""
+        return float(self.departure_fuel_kg[self.sources[from_key], self.targets[to_key], level])
+
+    def fuel_ok(self, cell):
+        i, j, _, f = cell
+        bit = (i * self.shape[1] + j) * self.shape[3] + f
+        return bool(self._fuel_bits[bit >> 3] >> (7 - (bit & 7)) & 1)
+
+    def gate_ok(self, cell):
+        bit = int(np.ravel_multi_index(cell, self.shape))
+        return bool(self._gate_bits[bit >> 3] >> (7 - (bit & 7)) & 1)
+
+    def passing(self, min_margin=None):
+        """
+        Boolean [from, to, payload, fuel] array of legs that fit the fuel,
+        pass the gate and (if given) keep `margin` at or above min_margin.
+        """
+        size = int(np.prod(self.shape))
+
+        n_pairs_fuel = self.shape[0] * self.shape[1] * self.shape[3]
+        fuel_ok = np.unpackbits(self._fuel_bits, count=n_pairs_fuel).reshape(
+            self.shape[0], self.shape[1], self.shape[3]
+        ).astype(bool)
+
+        ok = np.unpackbits(self._gate_bits, count=size).reshape(self.shape).astype(bool)
+        ok &= fuel_ok[:, :, None, :]
+
+        if min_margin is not None:
+            ok &= np.isnan(self.margin) | (self.margin >= min_margin)
+
+        return ok
+
+    def nbytes(self):
+        return self._fuel_bits.nbytes + self._gate_bits.nbytes + self.margin.nbytes + self.departure_fuel_kg.nbytes
@@ -0,0 +1,85 @@
+import json
+
+import numpy as np
+
+from dataset_snapshot import LazyRecords, StringTable, load_snapshot
+from distance_matrix import DistanceMatrix, build_distance_matrix
+
+
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+def compile_airport_snapshot(location_path, alternate_path):
+    """
+    (meta, arrays, strings) for location_params.json + alternate_airports.json:
+    each airport as a JSON record in the string table, plus the distance
+    matrix with its airport keys and coordinates.
+    """
+    location_data = load_json(location_path)
+    alternate_data = load_json(alternate_path)
+    distances = build_distance_matrix(location_data, alternate_data)
+
+    strings = StringTable()
+
+    def records(airports):
+        rows = [[strings.add(key), strings.add(json.dumps(airport))] for key, airport in airports.items()]
+        return np.array(rows, dtype=np.int32).reshape(-1, 2)
+
+    # The rest of each file, with the airport table left as a placeholder
+    meta = {
+        "location_data": strings.add(json.dumps(dict(location_data, locations=None))),
+        "alternate_data": strings.add(json.dumps(dict(alternate_data, alternates=None)))
+    }
+    arrays = {
+        "locations": records(location_data["locations"]),
+        "alternates": records(alternate_data["alternates"]),
+        "airport_keys": np.array([strings.add(key) for key in distances.keys], dtype=np.int32),
+        "coords": distances.coords,
+        "distances": distances.matrix
+    }
+
+    return meta, arrays, strings
+
+def load_airports(location_path="location_params.json", alternate_path="alternate_airports.json"):
+    """
+    (location_data, alternate_data, distances) from the airports' binary
+    snapshot. Airport dicts are decoded on first access and the distance
+    matrix is memory-mapped, so start-up does not grow with the network.
+    """
+    snapshot = load_snapshot("airports", [location_path, alternate_path], compile_airport_snapshot)
+
+    def airports(name):
+        return LazyRecords(snapshot, {snapshot.string(key): record for key, record in snapshot.array(name).tolist()})
+
+    location_data = snapshot.record(snapshot.meta["location_data"])
+    location_data["locations"] = airports("locations")
+
+    alternate_data = snapshot.record(snapshot.meta["alternate_data"])
+    alternate_data["alternates"] = airports("alternates")
+
+    distances = DistanceMatrix.from_arrays(
+        [snapshot.string(key) for key in snapshot.array("airport_keys").tolist()],
+        snapshot.array("coords"),
+        snapshot.array("distances")
+    )
+
+    return location_data, alternate_data, distances
+
+def load_inputs(location_path="location_params.json",
+                mission_path="payloads.json",
+                alternate_path="alternate_airports.json"):
+    """
+    Parses the shared mission inputs once. The simulators and planners take
+    this dict instead of reading the files themselves. With mission_path=None
+    only the airport data is loaded (e.g. for a service that receives its
+    missions separately).
+    """
+    location_data, alternate_data, distances = load_airports(location_path, alternate_path)
+
+    return {
+        "location_data": location_data,
+        "mission_data": load_json(mission_path) if mission_path else None,
+        "alternate_data": alternate_data,
+        "distances": distances
+    }
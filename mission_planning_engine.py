@@ -1,20 +1,16 @@
+import argparse
 import json
 import itertools
 import math
-from run_full_simulation import compute_leg_fuel, build_aircraft
-from hard_feasibility_checks import FixedWingHardGate, RotaryWingHardGate, haversine_nm
+from concurrent.futures import ProcessPoolExecutor
+from flight_physics import compute_leg_fuel, leg_time_hr
+from mission_inputs import load_inputs
+from airport_store import load_store_inputs
+from planning_context import PlanningContext, fork_context
+from plan_cache import DEFAULT_CACHE_PATH, PlanCache, plan_key
+from aircraft_profiles import build_aircraft
+from route_search import SubsetRouteSearch, TopK, iter_permutation_range, permutation_from_rank, permutation_shards
 
-with open("location_params.json") as f:
-    location_data = json.load(f)
-
-with open("payloads.json") as f:
-    mission_data = json.load(f)
-
-with open("alternate_airports.json") as f:
-    alternate_data = json.load(f)
-
-
-from scenario_config import get_scenario_config
 
 def delivery_score(delivered, planned):
     return min(1, delivered / planned) if planned > 0 else 0
@@ -31,51 +27,25 @@ def environmental_score(avg_risk):
 def safety_score(min_margin):
     return max(0, min_margin) if min_margin is not None else 0
 
-def aggregate_score(scores, mission_data):
-    config = get_scenario_config(mission_data)
-    weights = config["weights"]
+def aggregate_score(scores, weights):
     return sum(weights[k] * scores[k] for k in scores)
 
 
-def extract_min_margin(result):
+def extract_min_margin(margins):
+    """Smallest raw climb/OGE margin of a leg (evaluate_status margins)."""
 
-    min_margin = float("inf")
-
-    for section in result.values():
-
-        if not isinstance(section, dict):
-            continue
+    values = [margins[key] for key in ("climb_margin", "oge_margin_ratio") if key in margins]
 
-        # direct margin
-        if "margin" in section:
-            margin = section["margin"]
-            if isinstance(margin, (int, float)):
-                if margin < min_margin:
-                    min_margin = margin
+    return min(values) if values else None
 
-        # nested details
-        if "details" in section:
-            details = section["details"]
-
-            for key in [
-                "climb_margin",
-                "oge_margin_ratio"
-            ]:
-                if key in details:
-                    margin = details[key]
-                    if margin < min_margin:
-                        min_margin = margin
-
-    return None if min_margin == float("inf") else min_margin
-
-def compute_environmental_risk(ac, route_sequence, origin):
+def compute_environmental_risk(ctx, ac, route_sequence, origin):
 
     total_risk = 0
     current = origin
 
     for delivery in route_sequence:
 
-        dest = location_data["locations"][delivery["destination"]]
+        dest = ctx.location_data["locations"][delivery["destination"]]
         weather = dest["weather"]
 
         da = (
@@ -86,7 +56,7 @@ def compute_environmental_risk(ac, route_sequence, origin):
 
         R_da = da / ac.get("service_ceiling", 20000)
         wind_kt = weather["wind_speed_mps"] * 1.94384
-        R_wind = wind_kt / ac["max_crosswind"] if ac["max_crosswind"] > 0 else 0
+        R_wind = wind_kt / ac.max_crosswind if ac.max_crosswind > 0 else 0
         R_terrain = dest["elevation_ft"] / 10000
 
         total_risk += 0.4 * R_da + 0.4 * R_wind + 0.2 * R_terrain
@@ -95,192 +65,694 @@ def compute_environmental_risk(ac, route_sequence, origin):
     return total_risk / len(route_sequence) if route_sequence else 0
 
 
-def simulate_route(ac, evaluator, origin_key, route_sequence, initial_fuel, total_payload):
+def required_margin(ctx, ac):
+    """Policy threshold on a leg's margin (Unified Scenario Architecture)."""
 
-    origin = location_data["locations"][origin_key]
-    fuel_remaining = initial_fuel
-    payload_remaining = total_payload
-    reserve_fuel = ac["fuel_flow"] * (ac["reserve_min"] / 60)
+    # Determine which threshold to check based on aircraft type/metric
+    thresholds = ctx.thresholds
+    return thresholds.get("runway_min", 0) if ac.type == "fixed" else thresholds.get("power_min", 0)
 
-    current_origin = origin
+def leg_status(ctx, ac, leg_margin, gate_passed):
 
-    total_fuel_used = 0
-    total_time_hr = 0
-    total_distance = 0
-    payload_delivered = 0
-    min_margin = None
+    # ---- POLICY THRESHOLD CHECK (Unified Scenario Architecture) ----
+    if leg_margin is not None and leg_margin < required_margin(ctx, ac):
+        return "FAIL_POLICY_THRESHOLD"
 
-    mission_status = "PASS"
+    # ---- PHYSICAL FAIL CHECK ----
+    if not gate_passed:
+        return "FAIL_HARD_GATE"
 
-    for delivery in route_sequence:
+    return "PASS"
 
-        dest_key = delivery["destination"]
-        dest = location_data["locations"][dest_key]
+# assigned_fleet[*].fuel_load: "dispatch" departs every leg with fuel_kg, "minimum" uplifts
+# only the least legal fuel for each leg (never more than fuel_kg)
+FUEL_LOADS = ("dispatch", "minimum")
 
-        distance_nm = haversine_nm(
-            current_origin["coords"][0],
-            current_origin["coords"][1],
-            dest["coords"][0],
-            dest["coords"][1]
-        )
+def fuel_load(aircraft):
+    return aircraft.get("fuel_load", "dispatch")
 
-        fuel_needed, _, _, _ = compute_leg_fuel(ac, current_origin, dest, distance_nm)
+def with_fuel_load(mission_data, policy):
+    """Copy of a mission with every fleet entry's fuel_load set to `policy`."""
+    return dict(mission_data, assigned_fleet=[dict(a, fuel_load=policy) for a in mission_data["assigned_fleet"]])
 
-        # Alternate fuel
-        alternates = alternate_data.get(dest_key, [])
-        fuel_alt = 0
+def aircraft_legs(ctx, ac, evaluator, aircraft):
+    """The mission's leg tensor for a fleet entry under its fuel_load."""
+    return ctx.leg_tensor(ac, evaluator, aircraft["fuel_kg"], fuel_load(aircraft) == "minimum")
 
-        if alternates:
-            alt_key = alternates[0]
-            alt = location_data["locations"][alt_key]
-            alt_distance = haversine_nm(
-                dest["coords"][0],
-                dest["coords"][1],
-                alt["coords"][0],
-                alt["coords"][1]
-            )
-            fuel_alt, _, _, _ = compute_leg_fuel(ac, dest, alt, alt_distance)
+def tensor_leg(ctx, ac, tensor, current_key, dest_key, fuel_remaining, payload_remaining):
+    """simulate_leg() outcome read from a leg tensor, or None if it does not cover the leg."""
 
-        required_total = fuel_needed + fuel_alt + reserve_fuel
+    cell = tensor.cell(current_key, dest_key, payload_remaining, fuel_remaining)
+    if cell is None:
+        return None
 
-        if required_total > fuel_remaining:
-            mission_status = "FAIL_FUEL"
-            break
+    if not tensor.fuel_ok(cell):
+        return {"status": "FAIL_FUEL"}
 
-        fuel_remaining -= fuel_needed
-        total_fuel_used += fuel_needed
-        total_distance += distance_nm
+    leg_margin = float(tensor.margin[cell])
+    if math.isnan(leg_margin):
+        leg_margin = None
 
-        # Time calculation
-        delta_alt = dest["elevation_ft"] - current_origin["elevation_ft"]
+    i, j = cell[:2]
+    return {
+        "status": leg_status(ctx, ac, leg_margin, tensor.gate_ok(cell)),
+        "fuel_used": float(tensor.fuel_kg[i, j]),
+        "distance_nm": float(tensor.distance_nm[i, j]),
+        "time_hr": float(tensor.time_hr[i, j]),
+        "margin": leg_margin
+    }
 
-        climb = (delta_alt / ac["roc"]) / 60 if delta_alt > 0 and ac["roc"] > 0 else 0
-        cruise = distance_nm / ac["cruise"] if ac["cruise"] > 0 else 0
-        descent = abs(delta_alt / ac["roc"]) / 60 if ac["roc"] > 0 else 0
+def simulate_leg(ctx, ac, evaluator, current_key, dest_key, fuel_remaining, payload_remaining, reserve_fuel,
+                 detailed=False, tensor=None):
 
-        total_time_hr += climb + cruise + descent
+    if tensor is not None and not detailed:
+        outcome = tensor_leg(ctx, ac, tensor, current_key, dest_key, fuel_remaining, payload_remaining)
+        if outcome is not None:
+            return outcome
 
-        # Hard Gate Evaluation
-        leg = {
-            "origin": current_origin,
-            "destination": dest,
-            "distance_nm": distance_nm,
-            "payload_kg": payload_remaining,
-            "fuel_onboard_kg": fuel_remaining
-        }
+    current_origin = ctx.location_data["locations"][current_key]
+    dest = ctx.location_data["locations"][dest_key]
 
-        result = evaluator.evaluate(ac, leg)
+    distance_nm = ctx.distances.distance_nm(current_key, dest_key)
 
-        # ---- EXTRACT MARGIN BEFORE FAIL CHECK ----
-        leg_margin = extract_min_margin(result)
+    fuel_needed, _, _, _ = compute_leg_fuel(ac, current_origin, dest, distance_nm)
 
-        if leg_margin is not None:
-            if min_margin is None or leg_margin < min_margin:
-                min_margin = leg_margin
-        
-        # ---- POLICY THRESHOLD CHECK (Unified Scenario Architecture) ----
-        config = get_scenario_config(mission_data)
-        thresholds = config["thresholds"]
-        
-        # Determine which threshold to check based on aircraft type/metric
-        required_margin = thresholds.get("runway_min", 0) if ac["type"] == "fixed" else thresholds.get("power_min", 0)
-        
-        if leg_margin is not None and leg_margin < required_margin:
-            mission_status = "FAIL_POLICY_THRESHOLD"
-            break
+    # Alternate fuel
+    alternates = ctx.alternate_data.get(dest_key, [])
+    fuel_alt = 0
+
+    if alternates:
+        alt_key = alternates[0]
+        alt = ctx.location_data["locations"][alt_key]
+        alt_distance = ctx.distances.distance_nm(dest_key, alt_key)
+        fuel_alt, _, _, _ = compute_leg_fuel(ac, dest, alt, alt_distance)
+
+    required_total = fuel_needed + fuel_alt + reserve_fuel
+
+    if required_total > fuel_remaining:
+        return {"status": "FAIL_FUEL"}
+
+    fuel_remaining -= fuel_needed
+
+    # Hard Gate Evaluation
+    leg = {
+        "origin": current_origin,
+        "destination": dest,
+        "distance_nm": distance_nm,
+        "payload_kg": payload_remaining,
+        "fuel_onboard_kg": fuel_remaining
+    }
+
+    # The policy check needs the margin even when a gate fails, so no short-circuit
+    result = evaluator.evaluate_status(ac, leg, short_circuit=False)
+
+    # ---- EXTRACT MARGIN BEFORE FAIL CHECK ----
+    leg_margin = extract_min_margin(result["margins"])
+
+    outcome = {
+        "status": leg_status(ctx, ac, leg_margin, result["hard_gate_overall_status"] == "PASS"),
+        "fuel_used": fuel_needed,
+        "distance_nm": distance_nm,
+        "time_hr": leg_time_hr(ac, current_origin, dest, distance_nm),
+        "margin": leg_margin
+    }
+
+    if detailed:
+        outcome["hard_gate"] = evaluator.evaluate(ac, leg)
+
+    return outcome
+
+def advance_route(sim, leg, weight_kg):
+    """
+    Applies one simulated leg to the running (unrounded) route totals.
+    Shared by simulate_route and the route search so both accumulate
+    identically.
+    """
+    if leg["status"] == "FAIL_FUEL":
+        return dict(sim, status="FAIL_FUEL")
+
+    min_margin = sim["min_margin"]
+    if leg["margin"] is not None:
+        if min_margin is None or leg["margin"] < min_margin:
+            min_margin = leg["margin"]
+
+    passed = leg["status"] == "PASS"
+
+    return {
+        "status": leg["status"],
+        "fuel_used": sim["fuel_used"] + leg["fuel_used"],
+        "time_hr": sim["time_hr"] + leg["time_hr"],
+        "distance_nm": sim["distance_nm"] + leg["distance_nm"],
+        "payload_delivered": sim["payload_delivered"] + (weight_kg if passed else 0),
+        "min_margin": min_margin
+    }
+
+def start_route():
+    return {
+        "status": "PASS",
+        "fuel_used": 0,
+        "time_hr": 0,
+        "distance_nm": 0,
+        "payload_delivered": 0,
+        "min_margin": None
+    }
+
+def finalize_route(sim):
+    return {
+        "mission_status": sim["status"],
+        "fuel_used": sim["fuel_used"],
+        "time_hr": sim["time_hr"],
+        "distance_nm": sim["distance_nm"],
+        "payload_delivered": sim["payload_delivered"],
+        "min_margin": sim["min_margin"]
+    }
+
+def simulate_route(ctx, ac, evaluator, origin_key, route_sequence, initial_fuel, total_payload, trace=None, tensor=None):
+    """
+    Simulates one ordering on exact floats. When a `trace` list is given,
+    the full hard-gate detail of every simulated leg is appended to it.
+    With a leg `tensor` (see aircraft_legs), each leg departs with the
+    tensor's departure fuel instead of initial_fuel and is read from it.
+    """
+    reserve_fuel = ac.reserve_fuel
 
-        # ---- PHYSICAL FAIL CHECK ----
-        if result["hard_gate_overall_status"] == "FAIL":
-            mission_status = "FAIL_HARD_GATE"
+    current_key = origin_key
+    payload_remaining = total_payload
+    sim = start_route()
+
+    for delivery in route_sequence:
+
+        dest_key = delivery["destination"]
+
+        # REFUELING (Universal Assumption): every leg departs with initial_fuel
+        fuel_load = tensor.departure_fuel(current_key, dest_key) if tensor is not None else initial_fuel
+
+        leg = simulate_leg(
+            ctx, ac, evaluator, current_key, dest_key,
+            fuel_load, payload_remaining, reserve_fuel,
+            detailed=trace is not None, tensor=tensor
+        )
+        sim = advance_route(sim, leg, delivery["weight_kg"])
+
+        if trace is not None and "hard_gate" in leg:
+            trace.append({
+                "from": current_key,
+                "to": dest_key,
+                "leg_status": leg["status"],
+                "hard_gate": leg["hard_gate"]
+            })
+
+        if sim["status"] != "PASS":
             break
 
         payload_remaining -= delivery["weight_kg"]
-        payload_delivered += delivery["weight_kg"]
+        current_key = dest_key
 
-        current_origin = dest
-        
-        # REFUELING (Universal Assumption)
-        fuel_remaining = initial_fuel
+    return finalize_route(sim)
+
+def score_route(ctx, ac, route, sim):
+
+    if sim["mission_status"] != "PASS":
+        return None, 0
+
+    avg_risk = compute_environmental_risk(
+        ctx,
+        ac,
+        route,
+        ctx.origin
+    )
+
+    scores = {
+        "delivery": delivery_score(sim["payload_delivered"], ctx.total_payload_kg),
+        "temporal": temporal_score(sim["time_hr"]),
+        "fuel_efficiency": fuel_efficiency_score(sim["fuel_used"], sim["payload_delivered"]),
+        "environmental": environmental_score(avg_risk),
+        "safety": safety_score(sim["min_margin"])
+    }
+
+    return scores, aggregate_score(scores, ctx.weights)
+
+def route_record(ctx, ac, route, sim):
+    """Output record; the search works on exact floats and rounding happens only here."""
+
+    scores, final_score = score_route(ctx, ac, route, sim)
 
     return {
-        "mission_status": mission_status,
-        "fuel_used": round(total_fuel_used, 2),
-        "time_hr": round(total_time_hr, 3),
-        "distance_nm": round(total_distance, 2),
-        "payload_delivered": payload_delivered,
-        "min_margin": min_margin
+        "route_sequence": [d["destination"] for d in route],
+        "simulation": dict(
+            sim,
+            fuel_used=round(sim["fuel_used"], 2),
+            time_hr=round(sim["time_hr"], 3),
+            distance_nm=round(sim["distance_nm"], 2),
+            min_margin=round(sim["min_margin"], 4) if sim["min_margin"] is not None else None
+        ),
+        "score_breakdown": scores,
+        "final_score": round(final_score, 4)
     }
 
-final_output = {
-    "mission_id": mission_data["mission_id"],
-    "route_planning": {}
-}
+def route_rank(ctx, ac, route, sim):
+    """Exact ranking key: passing routes first, then by unrounded score."""
 
-origin_key = mission_data["origin"].lower()
+    _, final_score = score_route(ctx, ac, route, sim)
 
-# Merge duplicate destinations
-merged = {}
-for d in mission_data["deliveries"]:
-    key = d["destination"].lower()
-    merged[key] = merged.get(key, 0) + d["weight_kg"]
+    return (sim["mission_status"] != "PASS", -final_score)
 
-deliveries = [{"destination": k, "weight_kg": v} for k, v in merged.items()]
-all_routes = list(itertools.permutations(deliveries))
+def trace_route(ctx, ac, evaluator, aircraft, route):
+    """Re-simulates a chosen route to materialize its per-leg hard-gate details."""
 
-for aircraft in mission_data["assigned_fleet"]:
+    trace = []
+    simulate_route(
+        ctx,
+        ac,
+        evaluator,
+        ctx.origin_key,
+        route,
+        aircraft["fuel_kg"],
+        ctx.total_payload_kg,
+        trace=trace,
+        tensor=aircraft_legs(ctx, ac, evaluator, aircraft)
+    )
+    return trace
 
-    ac = build_aircraft(aircraft["aircraft_name"], aircraft["type"])
-    evaluator = FixedWingHardGate() if "fixed" in aircraft["type"].lower() else RotaryWingHardGate()
+def fuel_plan_record(ctx, ac, evaluator, aircraft, route):
+    """
+    Departure fuel of every leg of a route flown with the "minimum"
+    fuel_load, and the margin it gains over departing each leg with the
+    full dispatch fuel. Loads are rounded up, so they stay legal.
+    """
+    tensor = aircraft_legs(ctx, ac, evaluator, aircraft)
 
-    routes = []
+    keys = [ctx.origin_key] + [d["destination"] for d in route]
+    loads = [tensor.departure_fuel(a, b) for a, b in zip(keys, keys[1:])]
 
-    for route in all_routes:
+    sim = simulate_route(ctx, ac, evaluator, ctx.origin_key, route, aircraft["fuel_kg"], ctx.total_payload_kg, tensor=tensor)
+    dispatch = simulate_route(ctx, ac, evaluator, ctx.origin_key, route, aircraft["fuel_kg"], ctx.total_payload_kg)
+
+    margin_gain = None
+    if sim["min_margin"] is not None and dispatch["min_margin"] is not None:
+        margin_gain = round(sim["min_margin"] - dispatch["min_margin"], 4)
+
+    return {
+        "departure_fuel_kg": [math.ceil(load * 100) / 100 for load in loads],
+        "max_departure_fuel_kg": math.ceil(max(loads) * 100) / 100 if loads else 0,
+        "dispatch_fuel_kg": aircraft["fuel_kg"],
+        "dispatch_mission_status": dispatch["mission_status"],
+        "dispatch_min_margin": round(dispatch["min_margin"], 4) if dispatch["min_margin"] is not None else None,
+        "margin_gain": margin_gain
+    }
+
+def iter_route_candidates(ctx, ac, evaluator, aircraft, permutations):
+    """
+    Lazily simulates orderings, yielding (rank key, route, sim). The
+    permutation index breaks score ties, as the old stable sort did.
+    """
+    tensor = aircraft_legs(ctx, ac, evaluator, aircraft)
+
+    for rank_index, route in permutations:
 
         sim = simulate_route(
+            ctx,
             ac,
             evaluator,
-            origin_key,
+            ctx.origin_key,
             route,
             aircraft["fuel_kg"],
-            mission_data["total_payload_kg"]
+            ctx.total_payload_kg,
+            tensor=tensor
         )
 
-        if sim["mission_status"] == "PASS":
+        yield route_rank(ctx, ac, route, sim) + (rank_index,), route, sim
+
+def select_top_k(candidates, top_k):
+    best = TopK(top_k)
+    for key, route, sim in candidates:
+        best.push(key, (route, sim))
+    return best.items()
+
+def exhaustive_routes(ctx, ac, evaluator, aircraft, top_k):
+
+    candidates = iter_route_candidates(
+        ctx, ac, evaluator, aircraft,
+        enumerate(itertools.permutations(ctx.deliveries))
+    )
+
+    return [route_record(ctx, ac, route, sim) for route, sim in select_top_k(candidates, top_k)]
+
+def viable_routes(ctx, ac, tensor):
+    """
+    viable(mask, last) pruning callback for SubsetRouteSearch, from the
+    leg tensor: every open stop needs a passing leg (at some payload)
+    from the last stop or another open stop, else no ordering of the rest
+    can pass. None when the tensor does not cover the mission.
+    """
+    if not tensor.complete:
+        return None
 
-            avg_risk = compute_environmental_risk(
-                ac,
-                route,
-                location_data["locations"][origin_key]
+    passing = tensor.passing(required_margin(ctx, ac)).any(axis=(2, 3))
+
+    # Bit 0 is the origin, bit s + 1 the delivery stop s
+    enter = [sum(1 << i for i in passing[:, stop].nonzero()[0].tolist()) for stop in range(len(ctx.deliveries))]
+    full = (1 << len(ctx.deliveries)) - 1
+
+    known = {}
+
+    def viable(mask, last):
+        result = known.get((mask, last))
+        if result is None:
+            open_stops = full & ~mask
+            sources = (open_stops << 1) | (1 << (last + 1))
+
+            result = all(
+                enter[stop] & sources & ~(1 << (stop + 1))
+                for stop in range(len(enter))
+                if open_stops & (1 << stop)
             )
+            known[mask, last] = result
 
-            scores = {
-                "delivery": delivery_score(sim["payload_delivered"], mission_data["total_payload_kg"]),
-                "temporal": temporal_score(sim["time_hr"]),
-                "fuel_efficiency": fuel_efficiency_score(sim["fuel_used"], sim["payload_delivered"]),
-                "environmental": environmental_score(avg_risk),
-                "safety": safety_score(sim["min_margin"])
-            }
-
-            final_score = aggregate_score(scores, mission_data)
-
-        else:
-            scores = None
-            final_score = 0
-
-        routes.append({
-            "route_sequence": [d["destination"] for d in route],
-            "simulation": sim,
-            "score_breakdown": scores,
-            "final_score": round(final_score, 4)
-        })
+        return result
+
+    return viable
+
+def route_metrics(sim, weights):
+    """
+    Lower-is-better totals that fully decide the score of a route once its
+    visited set and position are fixed. Components with zero weight are
+    left out, and margins are clamped like safety_score clamps them.
+    """
+    metrics = []
+
+    if weights.get("fuel_efficiency", 0):
+        metrics.append(sim["fuel_used"])
+    if weights.get("temporal", 0):
+        metrics.append(sim["time_hr"])
+    if weights.get("safety", 0):
+        metrics.append(-safety_score(sim["min_margin"]))
+
+    return tuple(metrics)
+
+# Complete routes per requested route the dp scores up front to seed its bound
+DP_SEED_ROUTES = 4
+
+def route_callbacks(ctx, ac, evaluator, tensor):
+    """leg(label, stop) and advance(label, stop, outcome) for SubsetRouteSearch."""
+
+    reserve_fuel = ac.reserve_fuel
+    stop_keys = [d["destination"] for d in ctx.deliveries]
 
-    routes.sort(
-        key=lambda x: (
-            x["simulation"]["mission_status"] != "PASS",
-            -x["final_score"]
+    def leg(label, stop):
+        current_key = stop_keys[label["sequence"][-1]] if label["sequence"] else ctx.origin_key
+        payload_remaining = ctx.total_payload_kg
+        for i in label["sequence"]:
+            payload_remaining -= ctx.deliveries[i]["weight_kg"]
+
+        # REFUELING (Universal Assumption): every leg departs with its fuel_load
+        return simulate_leg(
+            ctx, ac, evaluator, current_key, stop_keys[stop],
+            tensor.departure_fuel(current_key, stop_keys[stop]), payload_remaining, reserve_fuel,
+            tensor=tensor
+        )
+
+    def advance(label, stop, outcome):
+        return advance_route(label, outcome, ctx.deliveries[stop]["weight_kg"])
+
+    return leg, advance
+
+def route_bounds(ctx, ac):
+    """
+    (optimistic_score, final_score, nearest_first) callbacks for
+    SubsetRouteSearch: an upper bound on the score of any passing
+    completion of a partial route, the score of a complete one, and a
+    nearest-first visiting order.
+    """
+    origin = ctx.origin
+    stop_keys = [d["destination"] for d in ctx.deliveries]
+
+    # Fuel and time of a leg depend only on its endpoints
+    leg_fuel = {}
+    leg_time = {}
+    for i, src_key in enumerate([ctx.origin_key] + stop_keys):
+        for j, dest_key in enumerate(stop_keys):
+            if i == j + 1:
+                continue
+            src = ctx.location_data["locations"][src_key]
+            dest = ctx.location_data["locations"][dest_key]
+            distance_nm = ctx.distances.distance_nm(src_key, dest_key)
+            leg_fuel[i - 1, j], _, _, _ = compute_leg_fuel(ac, src, dest, distance_nm)
+            leg_time[i - 1, j] = leg_time_hr(ac, src, dest, distance_nm)
+
+    min_fuel_in = [min(v for (_, j), v in leg_fuel.items() if j == stop) for stop in range(len(stop_keys))]
+    min_time_in = [min(v for (_, j), v in leg_time.items() if j == stop) for stop in range(len(stop_keys))]
+
+    # Delivery and environmental scores are the same for every passing ordering
+    delivered = sum(d["weight_kg"] for d in ctx.deliveries)
+    fixed_scores = {
+        "delivery": delivery_score(delivered, ctx.total_payload_kg),
+        "environmental": environmental_score(compute_environmental_risk(ctx, ac, ctx.deliveries, origin))
+    }
+
+    weights = ctx.weights
+    monotone = all(w >= 0 for w in weights.values())
+
+    # The bound sums leg totals in a different order than the route does
+    slack = 1e-9
+
+    # Cheapest way into every open stop, per visited set
+    open_legs = {}
+
+    def optimistic_score(label):
+        if not monotone or label["min_margin"] is None:
+            return float("inf")
+
+        visited = frozenset(label["sequence"])
+        rest = open_legs.get(visited)
+        if rest is None:
+            remaining = [stop for stop in range(len(stop_keys)) if stop not in visited]
+            rest = open_legs[visited] = (sum(min_time_in[r] for r in remaining), sum(min_fuel_in[r] for r in remaining))
+
+        scores = dict(
+            fixed_scores,
+            temporal=temporal_score(label["time_hr"] + rest[0]),
+            fuel_efficiency=fuel_efficiency_score(label["fuel_used"] + rest[1], delivered),
+            safety=safety_score(label["min_margin"])
         )
+        return aggregate_score(scores, ctx.weights) + slack
+
+    def final_score(label):
+        route = [ctx.deliveries[i] for i in label["sequence"]]
+        return score_route(ctx, ac, route, finalize_route(label))[1]
+
+    def nearest_first(label, open_stops):
+        last = label["sequence"][-1] if label["sequence"] else -1
+        return sorted(open_stops, key=lambda stop: leg_time[last, stop])
+
+    return optimistic_score, final_score, nearest_first
+
+def warm_incumbents(ctx, aircraft):
+    """Stop sequences of the aircraft's warm-start routes that cover this mission's deliveries."""
+
+    index = {d["destination"]: i for i, d in enumerate(ctx.deliveries)}
+    return [
+        tuple(index[key] for key in route)
+        for route in ctx.warm_start.get(aircraft["aircraft_name"], [])
+        if sorted(route) == sorted(index)
+    ]
+
+def dp_routes(ctx, ac, evaluator, aircraft, top_k):
+
+    tensor = aircraft_legs(ctx, ac, evaluator, aircraft)
+    leg, advance = route_callbacks(ctx, ac, evaluator, tensor)
+    optimistic_score, final_score, nearest_first = route_bounds(ctx, ac)
+
+    # Dominance assumes every objective weight rewards lower fuel/time and higher margin
+    weights = ctx.weights
+    monotone = all(w >= 0 for w in weights.values())
+
+    def metrics(label):
+        return route_metrics(label, weights)
+
+    search = SubsetRouteSearch(
+        len(ctx.deliveries),
+        start_route(),
+        leg,
+        advance,
+        metrics=metrics if monotone else None,
+        viable=viable_routes(ctx, ac, tensor)
+    )
+
+    # The best k of the first few passing routes of a nearest-first dive
+    # set the score a partial route must still be able to reach
+    seeds = search.branch_and_bound(
+        top_k, optimistic_score, final_score, nearest_first, warm_incumbents(ctx, aircraft),
+        limit=DP_SEED_ROUTES * top_k
+    )
+    threshold = final_score(seeds[-1]) if top_k and len(seeds) == top_k else None
+
+    best = TopK(top_k)
+    for label in search.best_labels(top_k, optimistic_score, threshold):
+        route = [ctx.deliveries[i] for i in label["sequence"]]
+        sim = finalize_route(label)
+        best.push(route_rank(ctx, ac, route, sim) + (label["sequence"],), route_record(ctx, ac, route, sim))
+
+    routes = best.items()
+
+    for sequence, label in search.failed_routes(top_k - len(routes)):
+        route = [ctx.deliveries[i] for i in sequence]
+        routes.append(route_record(ctx, ac, route, finalize_route(label)))
+
+    return routes
+
+def load_warm_start(path):
+    """
+    Route sequences per aircraft from a previous
+    simulation_mission_planning_output.json (its top_candidates).
+    """
+    with open(path) as f:
+        previous = json.load(f)
+
+    warm_start = {}
+    for candidate in previous.get("top_candidates", []):
+        route = [d["destination"].lower() for d in candidate["route"]]
+        warm_start.setdefault(candidate["aircraft_name"], []).append(route)
+
+    return warm_start
+
+def bnb_routes(ctx, ac, evaluator, aircraft, top_k):
+
+    tensor = aircraft_legs(ctx, ac, evaluator, aircraft)
+    leg, advance = route_callbacks(ctx, ac, evaluator, tensor)
+    optimistic_score, final_score, nearest_first = route_bounds(ctx, ac)
+
+    search = SubsetRouteSearch(
+        len(ctx.deliveries), start_route(), leg, advance, viable=viable_routes(ctx, ac, tensor)
+    )
+    labels = search.branch_and_bound(
+        top_k, optimistic_score, final_score, nearest_first, warm_incumbents(ctx, aircraft)
+    )
+
+    routes = []
+    for label in labels:
+        route = [ctx.deliveries[i] for i in label["sequence"]]
+        routes.append(route_record(ctx, ac, route, finalize_route(label)))
+
+    for sequence, label in search.failed_routes(top_k - len(routes)):
+        route = [ctx.deliveries[i] for i in sequence]
+        routes.append(route_record(ctx, ac, route, finalize_route(label)))
+
+    return routes
+
+def fleet_member(ctx, fleet_index):
+
+    aircraft = ctx.fleet[fleet_index]
+    ac = build_aircraft(aircraft["aircraft_name"], aircraft["type"])
+
+    return aircraft, ac, ctx.evaluator(aircraft)
+
+def plan_aircraft(ctx, fleet_index, search, top_k):
+    """Top-k route records for one fleet aircraft."""
+
+    aircraft, ac, evaluator = fleet_member(ctx, fleet_index)
+
+    search_routes = {"dp": dp_routes, "bnb": bnb_routes, "exhaustive": exhaustive_routes}[search]
+    return search_routes(ctx, ac, evaluator, aircraft, top_k)
+
+# Context of the pool a worker process belongs to (set by its initializer)
+_worker_context = None
+
+def _init_worker(ctx):
+    global _worker_context
+    _worker_context = ctx
+
+def _worker_plan_aircraft(fleet_index, search, top_k):
+    return plan_aircraft(_worker_context, fleet_index, search, top_k)
+
+def exhaustive_shard(fleet_index, start, stop, top_k):
+    """Top-k (rank key, sim) over permutation ranks [start, stop) for one aircraft."""
+
+    ctx = _worker_context
+    aircraft, ac, evaluator = fleet_member(ctx, fleet_index)
+
+    permutations = (
+        (rank, tuple(ctx.deliveries[i] for i in sequence))
+        for rank, sequence in iter_permutation_range(len(ctx.deliveries), start, stop)
+    )
+    candidates = iter_route_candidates(ctx, ac, evaluator, aircraft, permutations)
+
+    best = TopK(top_k)
+    for key, _, sim in candidates:
+        best.push(key, (key, sim))
+    return best.items()
+
+def plan_fleet_parallel(ctx, jobs, search, top_k):
+
+    fleet = range(len(ctx.fleet))
+
+    # Workers inherit the context (inputs and caches) unpickled, so the pool must fork
+    pool = ProcessPoolExecutor(
+        jobs,
+        mp_context=fork_context(),
+        initializer=_init_worker,
+        initargs=(ctx,)
     )
-    final_output["route_planning"][aircraft["aircraft_name"]] = routes[:3]
+
+    with pool:
+
+        if search != "exhaustive":
+            futures = {i: pool.submit(_worker_plan_aircraft, i, search, top_k) for i in fleet}
+            return {i: futures[i].result() for i in fleet}
+
+        shards = permutation_shards(len(ctx.deliveries), jobs * 4)
+        futures = {
+            i: [pool.submit(exhaustive_shard, i, start, stop, top_k) for start, stop in shards]
+            for i in fleet
+        }
+
+        results = {}
+        for i in fleet:
+            _, ac, _ = fleet_member(ctx, i)
+
+            # Rank keys end in the permutation rank, so the merge is deterministic
+            best = TopK(top_k)
+            for future in futures[i]:
+                for key, sim in future.result():
+                    best.push(key, (key, sim))
+
+            results[i] = []
+            for key, sim in best.items():
+                route = [ctx.deliveries[j] for j in permutation_from_rank(len(ctx.deliveries), key[-1])]
+                results[i].append(route_record(ctx, ac, route, sim))
+
+        return results
+
+def plan_routes(ctx, search="bnb", top_k=3, jobs=1, trace=False):
+    """Ranked routes per aircraft for the mission of a PlanningContext."""
+
+    final_output = {
+        "mission_id": ctx.mission_data["mission_id"],
+        "route_planning": {}
+    }
+
+    if jobs > 1:
+        fleet_routes = plan_fleet_parallel(ctx, jobs, search, top_k)
+    else:
+        fleet_routes = {
+            i: plan_aircraft(ctx, i, search, top_k)
+            for i in range(len(ctx.fleet))
+        }
+
+    for i, aircraft in enumerate(ctx.fleet):
+
+        if trace or fuel_load(aircraft) == "minimum":
+            _, ac, evaluator = fleet_member(ctx, i)
+            for record in fleet_routes[i]:
+                route = [next(d for d in ctx.deliveries if d["destination"] == key) for key in record["route_sequence"]]
+                if fuel_load(aircraft) == "minimum":
+                    record["fuel_plan"] = fuel_plan_record(ctx, ac, evaluator, aircraft, route)
+                if trace:
+                    record["hard_gate_trace"] = trace_route(ctx, ac, evaluator, aircraft, route)
+
+        final_output["route_planning"][aircraft["aircraft_name"]] = fleet_routes[i]
+
+    return final_output
 
 def generate_fleet_strategy(mission_data, fleet_results):
     total_payload_needed = mission_data["total_payload_kg"]
@@ -356,7 +828,7 @@ def generate_global_summary(fleet_results, selected_strategy):
 # Output Construction
 # ... (Previous code remains) ...
 
-def generate_detailed_analysis(fleet_results, location_data):
+def generate_detailed_analysis(ctx, fleet_results):
     analysis_list = []
     
     for ac_name, routes in fleet_results.items():
@@ -391,7 +863,7 @@ def generate_detailed_analysis(fleet_results, location_data):
         # Let's mock the detailed structure matching the best route's data we have.
         
         for i, dest_name in enumerate(best_route["route_sequence"]):
-            origin_name = mission_data["origin"] if i == 0 else best_route["route_sequence"][i-1]
+            origin_name = ctx.mission_data["origin"] if i == 0 else best_route["route_sequence"][i-1]
             
             # Mocking leg specific analysis based on global stats provided
             pilot_heads_up.append({
@@ -416,7 +888,7 @@ def generate_detailed_analysis(fleet_results, location_data):
             "departure_time_recommendations": [
                 {
                     "leg_index": 0,
-                    "origin": mission_data["origin"],
+                    "origin": ctx.mission_data["origin"],
                     "destination": best_route["route_sequence"][0],
                     "recommended_window_local": {"start_hhmm": "06:00", "end_hhmm": "09:00"},
                     "recommendation_text": "Disarankan berangkat pagi untuk menghindari high density altitude.",
@@ -452,37 +924,117 @@ def format_top_candidates(fleet_results):
                 "score": r["score_breakdown"],
                 "combined_score": r["final_score"]
             })
+            if "fuel_plan" in r:
+                candidates[-1]["fuel_plan"] = r["fuel_plan"]
     return candidates
 
-# Output Construction
-fleet_results = final_output["route_planning"] # Re-use existing results
-selected_strategy = generate_fleet_strategy(mission_data, fleet_results)
-global_summary = generate_global_summary(fleet_results, selected_strategy)
-
-agent_analysis_data = generate_detailed_analysis(fleet_results, location_data)
-top_candidates_data = format_top_candidates(fleet_results)
-
-final_formatted_output = {
-    "mission_data": mission_data["mission_id"],
-    "agent_analysis": agent_analysis_data,
-    "top_candidates": top_candidates_data,
-    "input_params": {
-         "mission_data": mission_data,
-         "aircraft_data": "See aircraft_parameters.json", 
-         "location_data": "See location_params.json"
-    },
+def build_planning_report(ctx, final_output):
+    """Fleet strategy, analysis and top candidates around plan_routes() output."""
+
+    fleet_results = final_output["route_planning"] # Re-use existing results
+    selected_strategy = generate_fleet_strategy(ctx.mission_data, fleet_results)
+    global_summary = generate_global_summary(fleet_results, selected_strategy)
+
+    agent_analysis_data = generate_detailed_analysis(ctx, fleet_results)
+    top_candidates_data = format_top_candidates(fleet_results)
+
+    final_formatted_output = {
+        "mission_data": ctx.mission_data["mission_id"],
+        "agent_analysis": agent_analysis_data,
+        "top_candidates": top_candidates_data,
+        "input_params": {
+             "mission_data": ctx.mission_data,
+             "aircraft_data": "See aircraft_parameters.json", 
+             "location_data": "See location_params.json"
+        },
     
-    # Keeping these for backward compat/debug, but can remove if strict schema needed
-    "summary_global": global_summary, 
-    "executive_summary": {
-        "supporting_factors": ["Cuaca mendukung" if global_summary["operational_status"] == "GO" else "T/A"],
-        "attention_factors": ["High DA Airports"],
-        "key_mitigations": ["Refueling Availability verified"]
-    },
-    "aircraft_allocation": [selected_strategy]
-}
-
-with open("simulation_mission_planning_output.json", "w") as f:
-    json.dump(final_formatted_output, f, indent=2)
-
-print("Unified Mission Planning Engine (Scenario & Fleet Strategy) completed.")
+        # Keeping these for backward compat/debug, but can remove if strict schema needed
+        "summary_global": global_summary, 
+        "executive_summary": {
+            "supporting_factors": ["Cuaca mendukung" if global_summary["operational_status"] == "GO" else "T/A"],
+            "attention_factors": ["High DA Airports"],
+            "key_mitigations": ["Refueling Availability verified"]
+        },
+        "aircraft_allocation": [selected_strategy]
+    }
+
+    return final_formatted_output
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Unified Mission Planning Engine")
+    parser.add_argument(
+        "--search",
+        choices=["dp", "bnb", "exhaustive"],
+        default="bnb",
+        help="bnb: branch-and-bound on optimistic scores (default); dp: subset dynamic programming over orderings; exhaustive: simulate every permutation"
+    )
+    parser.add_argument(
+        "--warm-start",
+        metavar="PATH",
+        help="previous simulation_mission_planning_output.json whose routes seed the bnb/dp incumbent"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=3,
+        help="number of ranked routes kept per aircraft (default: 3)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes; exhaustive search is sharded by aircraft and permutation-rank range, dp/bnb by aircraft"
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="attach the full hard-gate detail of every leg to the routes in the output"
+    )
+    parser.add_argument(
+        "--fuel-load",
+        choices=FUEL_LOADS,
+        help="override every fleet entry's fuel_load: dispatch departs each leg with fuel_kg; minimum with the least legal fuel up to it"
+    )
+    parser.add_argument(
+        "--store",
+        metavar="DB",
+        help="read airports and weather from an airport_store.py SQLite store instead of the JSON files"
+    )
+    parser.add_argument(
+        "--at",
+        metavar="TIME",
+        help="with --store: use the weather valid at this ISO 8601 time (default: latest)"
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+        help=f"reuse outputs from a SQLite plan cache keyed by the effective inputs (default: {DEFAULT_CACHE_PATH})"
+    )
+    args = parser.parse_args()
+
+    inputs = load_store_inputs(args.store, at=args.at) if args.store else load_inputs()
+
+    mission_data = with_fuel_load(inputs["mission_data"], args.fuel_load) if args.fuel_load else None
+
+    ctx = PlanningContext(inputs, mission_data, warm_start=load_warm_start(args.warm_start) if args.warm_start else None)
+
+    cache = PlanCache(args.cache) if args.cache else None
+    key = plan_key(ctx, args.search, args.top_k, args.trace) if cache else None
+
+    final_formatted_output = cache.get(key) if cache else None
+    if final_formatted_output is None:
+        final_output = plan_routes(ctx, args.search, args.top_k, args.jobs, args.trace)
+        final_formatted_output = build_planning_report(ctx, final_output)
+        if cache:
+            cache.put(key, final_formatted_output)
+
+    with open("simulation_mission_planning_output.json", "w") as f:
+        json.dump(final_formatted_output, f, indent=2)
+
+    print("Unified Mission Planning Engine (Scenario & Fleet Strategy) completed.")
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,12 @@
+import argparse
 import json
 import itertools
 import math
-from run_full_simulation import compute_leg_fuel, build_aircraft
-from hard_feasibility_checks import FixedWingHardGate, RotaryWingHardGate, haversine_nm
-
-with open("location_params.json") as f:
-    location_data = json.load(f)
-
-with open("payloads.json") as f:
-    mission_data = json.load(f)
-
-with open("alternate_airports.json") as f:
-    alternate_data = json.load(f)
+from flight_physics import compute_leg_fuel
+from mission_inputs import load_inputs
+from planning_context import PlanningContext
+from aircraft_profiles import build_aircraft
+from route_search import TopK
 
 OBJECTIVE_WEIGHTS = {
     "delivery": 0.30,
@@ -39,48 +34,25 @@ def safety_score(min_margin):
 def aggregate_score(scores):
     return sum(OBJECTIVE_WEIGHTS[k] * scores[k] for k in scores)
 
-def extract_min_margin(result):
-
-    min_margin = float("inf")
-
-    for key, section in result.items():
-
-        if not isinstance(section, dict):
-            continue
-
-        if "details" not in section:
-            continue
-
-        details = section["details"]
-
-        # runway margin
-        if "runway_margin_m" in details:
-            margin = details["runway_margin_m"]
-        elif "climb_margin" in details:
-            margin = details["climb_margin"]
-        elif "fuel_margin_kg" in details:
-            margin = details["fuel_margin_kg"]
-        elif "oge_margin_ratio" in details:
-            margin = details["oge_margin_ratio"]
-        else:
-            continue
+def extract_min_margin(margins):
+    """Smallest raw runway/climb/fuel/OGE margin of a leg (evaluate_status margins)."""
 
-        if margin < min_margin:
-            min_margin = margin
+    values = [
+        margins[key]
+        for key in ("runway_margin_m", "climb_margin", "fuel_margin_kg", "oge_margin_ratio")
+        if key in margins
+    ]
 
-    if min_margin == float("inf"):
-        return None
+    return min(values) if values else None
 
-    return min_margin
-
-def compute_environmental_risk(ac, origin, route_sequence):
+def compute_environmental_risk(ctx, ac, origin, route_sequence):
 
     total_risk = 0
     current = origin
 
     for delivery in route_sequence:
 
-        dest = location_data["locations"][delivery["destination"]]
+        dest = ctx.location_data["locations"][delivery["destination"]]
         weather = dest["weather"]
 
         da = (
@@ -91,7 +63,7 @@ def compute_environmental_risk(ac, origin, route_sequence):
 
         R_da = da / ac.get("service_ceiling", 20000)
         wind_kt = weather["wind_speed_mps"] * 1.94384
-        R_wind = wind_kt / ac["max_crosswind"] if ac["max_crosswind"] > 0 else 0
+        R_wind = wind_kt / ac.max_crosswind if ac.max_crosswind > 0 else 0
         R_terrain = dest["elevation_ft"] / 10000
 
         leg_risk = 0.4 * R_da + 0.4 * R_wind + 0.2 * R_terrain
@@ -101,188 +73,302 @@ def compute_environmental_risk(ac, origin, route_sequence):
 
     return total_risk / len(route_sequence) if route_sequence else 0
 
-def simulate_route(ac, evaluator, origin_key, route_sequence, initial_fuel, total_payload):
+def simulate_leg(ctx, ac, evaluator, current_key, dest_key, fuel_remaining, payload_remaining, reserve_fuel, detailed=False):
 
-    origin = location_data["locations"][origin_key]
-    fuel_remaining = initial_fuel
-    payload_remaining = total_payload
+    current_origin = ctx.location_data["locations"][current_key]
+    dest = ctx.location_data["locations"][dest_key]
 
-    reserve_fuel = ac["fuel_flow"] * (ac["reserve_min"] / 60)
+    distance_nm = ctx.distances.distance_nm(current_key, dest_key)
 
-    current_origin = origin
+    fuel_needed, _, _, _ = compute_leg_fuel(ac, current_origin, dest, distance_nm)
 
-    total_fuel_used = 0
-    total_time_hr = 0
-    total_distance = 0
-    payload_delivered = 0
-    min_margin = None
+    # ---- ALTERNATE CHECK ----
+    alternates = ctx.alternate_data.get(dest_key, [])
+    if alternates:
+        alt_key = alternates[0]
+        alt = ctx.location_data["locations"][alt_key]
+        alt_distance = ctx.distances.distance_nm(dest_key, alt_key)
+        fuel_alt, _, _, _ = compute_leg_fuel(ac, dest, alt, alt_distance)
+    else:
+        fuel_alt = 0
 
-    mission_status = "PASS"
+    required_total = fuel_needed + fuel_alt + reserve_fuel
 
-    for delivery in route_sequence:
+    if required_total > fuel_remaining:
+        return {"status": "FAIL_FUEL"}
 
-        dest_key = delivery["destination"]
-        dest = location_data["locations"][dest_key]
+    fuel_remaining -= fuel_needed
 
-        distance_nm = haversine_nm(
-            current_origin["coords"][0],
-            current_origin["coords"][1],
-            dest["coords"][0],
-            dest["coords"][1]
-        )
+    # ---- TIME ----
+    delta_alt = dest["elevation_ft"] - current_origin["elevation_ft"]
+    climb_time = (delta_alt / ac.roc) / 60 if delta_alt > 0 else 0
+    cruise_time = distance_nm / ac.cruise if ac.cruise > 0 else 0
+    descent_time = abs(delta_alt / ac.roc) / 60 if ac.roc > 0 else 0
 
-        fuel_needed, _, _, _ = compute_leg_fuel(ac, current_origin, dest, distance_nm)
-
-        # ---- ALTERNATE CHECK ----
-        alternates = alternate_data.get(dest_key, [])
-        if alternates:
-            alt_key = alternates[0]
-            alt = location_data["locations"][alt_key]
-            alt_distance = haversine_nm(
-                dest["coords"][0],
-                dest["coords"][1],
-                alt["coords"][0],
-                alt["coords"][1]
-            )
-            fuel_alt, _, _, _ = compute_leg_fuel(ac, dest, alt, alt_distance)
-        else:
-            fuel_alt = 0
-
-        required_total = fuel_needed + fuel_alt + reserve_fuel
-
-        if required_total > fuel_remaining:
-            mission_status = "FAIL_FUEL"
-            break
+    # ---- HARD GATE ----
+    leg = {
+        "origin": current_origin,
+        "destination": dest,
+        "distance_nm": distance_nm,
+        "payload_kg": payload_remaining,
+        "fuel_onboard_kg": fuel_remaining
+    }
 
-        fuel_remaining -= fuel_needed
-        total_fuel_used += fuel_needed
-        total_distance += distance_nm
-
-        # ---- TIME ----
-        delta_alt = dest["elevation_ft"] - current_origin["elevation_ft"]
-        climb_time = (delta_alt / ac["roc"]) / 60 if delta_alt > 0 else 0
-        cruise_time = distance_nm / ac["cruise"] if ac["cruise"] > 0 else 0
-        descent_time = abs(delta_alt / ac["roc"]) / 60 if ac["roc"] > 0 else 0
-        total_time_hr += climb_time + cruise_time + descent_time
-
-        # ---- HARD GATE ----
-        leg = {
-            "origin": current_origin,
-            "destination": dest,
-            "distance_nm": distance_nm,
-            "payload_kg": payload_remaining,
-            "fuel_onboard_kg": fuel_remaining
-        }
+    # Margins only count on passing legs, so the gate may stop at the first failure
+    result = evaluator.evaluate_status(ac, leg)
 
-        result = evaluator.evaluate(ac, leg)
+    outcome = {
+        "status": "FAIL_HARD_GATE" if result["hard_gate_overall_status"] == "FAIL" else "PASS",
+        "fuel_used": fuel_needed,
+        "distance_nm": distance_nm,
+        "time_hr": climb_time + cruise_time + descent_time,
+        "margin": extract_min_margin(result["margins"])
+    }
 
-        if result["hard_gate_overall_status"] == "FAIL":
-            mission_status = "FAIL_HARD_GATE"
-            break
+    if detailed:
+        outcome["hard_gate"] = evaluator.evaluate(ac, leg)
 
-        leg_margin = extract_min_margin(result)
+    return outcome
 
-        if leg_margin is not None:
-            if min_margin is None or leg_margin < min_margin:
-                min_margin = leg_margin
+def advance_route(sim, leg, weight_kg):
 
-        payload_remaining -= delivery["weight_kg"]
-        payload_delivered += delivery["weight_kg"]
+    if leg["status"] == "FAIL_FUEL":
+        return dict(sim, status="FAIL_FUEL")
 
-        current_origin = dest
+    advanced = dict(
+        sim,
+        status=leg["status"],
+        fuel_remaining=sim["fuel_remaining"] - leg["fuel_used"],
+        total_fuel_used=sim["total_fuel_used"] + leg["fuel_used"],
+        total_time_hr=sim["total_time_hr"] + leg["time_hr"],
+        total_distance_nm=sim["total_distance_nm"] + leg["distance_nm"]
+    )
 
+    if leg["status"] != "PASS":
+        return advanced
+
+    if leg["margin"] is not None:
+        if advanced["min_margin"] is None or leg["margin"] < advanced["min_margin"]:
+            advanced["min_margin"] = leg["margin"]
+
+    advanced["payload_remaining"] = sim["payload_remaining"] - weight_kg
+    advanced["payload_delivered"] = sim["payload_delivered"] + weight_kg
+
+    return advanced
+
+def start_route(initial_fuel, total_payload):
     return {
-        "mission_status": mission_status,
-        "total_fuel_used": round(total_fuel_used, 2),
-        "total_time_hr": round(total_time_hr, 3),
-        "total_distance_nm": round(total_distance, 2),
-        "payload_delivered": payload_delivered,
-        "min_margin": min_margin
+        "status": "PASS",
+        "fuel_remaining": initial_fuel,
+        "payload_remaining": total_payload,
+        "total_fuel_used": 0,
+        "total_time_hr": 0,
+        "total_distance_nm": 0,
+        "payload_delivered": 0,
+        "min_margin": None
     }
 
-final_output = {
-    "mission_id": mission_data["mission_id"],
-    "route_planning": {}
-}
+def finalize_route(sim):
+    return {
+        "mission_status": sim["status"],
+        "total_fuel_used": sim["total_fuel_used"],
+        "total_time_hr": sim["total_time_hr"],
+        "total_distance_nm": sim["total_distance_nm"],
+        "payload_delivered": sim["payload_delivered"],
+        "min_margin": sim["min_margin"]
+    }
 
-origin_key = mission_data["origin"].lower()
+def simulate_route(ctx, ac, evaluator, origin_key, route_sequence, initial_fuel, total_payload, trace=None):
+    """
+    Simulates one ordering on exact floats. When a `trace` list is given,
+    the full hard-gate detail of every simulated leg is appended to it.
+    """
+    reserve_fuel = ac.reserve_fuel
 
-# MERGE DUPLICATE DESTINATIONS
-merged = {}
-for d in mission_data["deliveries"]:
-    key = d["destination"].lower()
-    merged[key] = merged.get(key, 0) + d["weight_kg"]
+    current_key = origin_key
+    sim = start_route(initial_fuel, total_payload)
 
-deliveries = [{"destination": k, "weight_kg": v} for k, v in merged.items()]
-all_routes = list(itertools.permutations(deliveries))
+    for delivery in route_sequence:
 
-for aircraft in mission_data["assigned_fleet"]:
+        leg = simulate_leg(
+            ctx, ac, evaluator, current_key, delivery["destination"],
+            sim["fuel_remaining"], sim["payload_remaining"], reserve_fuel,
+            detailed=trace is not None
+        )
+        sim = advance_route(sim, leg, delivery["weight_kg"])
 
-    ac_name = aircraft["aircraft_name"]
-    ac_type = aircraft["type"]
+        if trace is not None and "hard_gate" in leg:
+            trace.append({
+                "from": current_key,
+                "to": delivery["destination"],
+                "leg_status": leg["status"],
+                "hard_gate": leg["hard_gate"]
+            })
 
-    ac = build_aircraft(ac_name, ac_type)
-    evaluator = FixedWingHardGate() if "fixed" in ac_type.lower() else RotaryWingHardGate()
+        if sim["status"] != "PASS":
+            break
+
+        current_key = delivery["destination"]
+
+    return finalize_route(sim)
+
+def score_route(ctx, ac, route, sim):
 
-    aircraft_routes = []
+    if sim["mission_status"] != "PASS":
+        return None, 0
+
+    avg_risk = compute_environmental_risk(
+        ctx,
+        ac,
+        ctx.origin,
+        route
+    )
+
+    scores = {
+        "delivery": delivery_score(sim["payload_delivered"], ctx.total_payload_kg),
+        "temporal": temporal_score(sim["total_time_hr"]),
+        "fuel_efficiency": fuel_efficiency_score(sim["total_fuel_used"], sim["payload_delivered"]),
+        "environmental": environmental_score(avg_risk),
+        "safety": safety_score(sim["min_margin"])
+    }
 
-    for route in all_routes:
+    return scores, aggregate_score(scores)
+
+def route_record(ctx, ac, route, sim):
+    """Output record; the search works on exact floats and rounding happens only here."""
+
+    scores, final_score = score_route(ctx, ac, route, sim)
+
+    breakdown = None
+    if scores is not None:
+        breakdown = {
+            "components": {k: round(v, 4) for k, v in scores.items()},
+            "weights": OBJECTIVE_WEIGHTS,
+            "final_score": round(final_score, 4)
+        }
+
+    return {
+        "route_sequence": [d["destination"] for d in route],
+        "mission_status": sim["mission_status"],
+        "fuel_used": round(sim["total_fuel_used"], 2),
+        "time_hr": round(sim["total_time_hr"], 3),
+        "distance_nm": round(sim["total_distance_nm"], 2),
+        "payload_delivered": sim["payload_delivered"],
+        "score_breakdown": breakdown
+    }
+
+def route_rank(ctx, ac, route, sim):
+    """Exact ranking key: passing routes first, then by unrounded score."""
+
+    _, final_score = score_route(ctx, ac, route, sim)
+
+    return (sim["mission_status"] != "PASS", -final_score)
+
+def trace_route(ctx, ac, evaluator, aircraft, route):
+    """Re-simulates a chosen route to materialize its per-leg hard-gate details."""
+
+    trace = []
+    simulate_route(
+        ctx,
+        ac,
+        evaluator,
+        ctx.origin_key,
+        route,
+        aircraft["fuel_kg"],
+        ctx.total_payload_kg,
+        trace=trace
+    )
+    return trace
+
+def iter_route_candidates(ctx, ac, evaluator, aircraft, permutations):
+    """
+    Lazily simulates orderings, yielding (rank key, route, sim). The
+    permutation index breaks score ties, as the old stable sort did.
+    """
+    for rank_index, route in permutations:
 
         sim = simulate_route(
+            ctx,
             ac,
             evaluator,
-            origin_key,
+            ctx.origin_key,
             route,
             aircraft["fuel_kg"],
-            mission_data["total_payload_kg"]
+            ctx.total_payload_kg
         )
 
-        if sim["mission_status"] != "PASS":
-            breakdown = None
-            final_score = 0
-        else:
-            avg_risk = compute_environmental_risk(
-                ac,
-                location_data["locations"][origin_key],
-                route
-            )
-
-            scores = {
-                "delivery": delivery_score(sim["payload_delivered"], mission_data["total_payload_kg"]),
-                "temporal": temporal_score(sim["total_time_hr"]),
-                "fuel_efficiency": fuel_efficiency_score(sim["total_fuel_used"], sim["payload_delivered"]),
-                "environmental": environmental_score(avg_risk),
-                "safety": safety_score(sim["min_margin"])
-            }
-
-            final_score = aggregate_score(scores)
-
-            breakdown = {
-                "components": {k: round(v, 4) for k, v in scores.items()},
-                "weights": OBJECTIVE_WEIGHTS,
-                "final_score": round(final_score, 4)
-            }
-
-        aircraft_routes.append({
-            "route_sequence": [d["destination"] for d in route],
-            "mission_status": sim["mission_status"],
-            "fuel_used": sim["total_fuel_used"],
-            "time_hr": sim["total_time_hr"],
-            "distance_nm": sim["total_distance_nm"],
-            "payload_delivered": sim["payload_delivered"],
-            "score_breakdown": breakdown
-        })
-
-    aircraft_routes.sort(
-        key=lambda x: (
-            x["mission_status"] != "PASS",
-            -(x["score_breakdown"]["final_score"] if x["score_breakdown"] else 0)
-        )
+        yield route_rank(ctx, ac, route, sim) + (rank_index,), route, sim
+
+def select_top_k(candidates, top_k):
+    best = TopK(top_k)
+    for key, route, sim in candidates:
+        best.push(key, (route, sim))
+    return best.items()
+
+def exhaustive_routes(ctx, ac, evaluator, aircraft, top_k):
+
+    candidates = iter_route_candidates(
+        ctx, ac, evaluator, aircraft,
+        enumerate(itertools.permutations(ctx.deliveries))
     )
 
-    final_output["route_planning"][ac_name] = aircraft_routes[:3]
+    return [route_record(ctx, ac, route, sim) for route, sim in select_top_k(candidates, top_k)]
+
+def plan_routes(ctx, top_k=3, trace=False):
+    """
+    Ranked routes per aircraft for the mission of a PlanningContext, from
+    every ordering. There is no refueling here, so the fuel on board after
+    a partial route differs between orderings and no two share a future:
+    subset DP (see mission_planning_engine) would simulate every prefix anyway.
+    """
+
+    final_output = {
+        "mission_id": ctx.mission_data["mission_id"],
+        "route_planning": {}
+    }
+
+    for aircraft in ctx.fleet:
+
+        ac_name = aircraft["aircraft_name"]
+        ac_type = aircraft["type"]
+
+        ac = build_aircraft(ac_name, ac_type)
+        evaluator = ctx.evaluator(aircraft)
+
+        routes = exhaustive_routes(ctx, ac, evaluator, aircraft, top_k)
+
+        if trace:
+            for record in routes:
+                route = [next(d for d in ctx.deliveries if d["destination"] == key) for key in record["route_sequence"]]
+                record["hard_gate_trace"] = trace_route(ctx, ac, evaluator, aircraft, route)
+
+        final_output["route_planning"][ac_name] = routes
+
+    return final_output
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Multi-route Mission Planning Agent")
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=3,
+        help="number of ranked routes kept per aircraft (default: 3)"
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="attach the full hard-gate detail of every leg to the routes in the output"
+    )
+    args = parser.parse_args()
+
+    ctx = PlanningContext(load_inputs())
+    final_output = plan_routes(ctx, args.top_k, args.trace)
+
+    with open("mission_planning_output.json", "w") as f:
+        json.dump(final_output, f, indent=2)
 
-with open("mission_planning_output.json", "w") as f:
-    json.dump(final_output, f, indent=2)
+    print("Multi-route Mission Planning Agent (FIXED VERSION) completed.")
 
-print("Multi-route Mission Planning Agent (FIXED VERSION) completed.")
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,8 @@
 import json
 import math
 
-with open("dynamic_mission_output.json") as f:
-    dynamic_data = json.load(f)
-
-with open("safety_margin_output.json") as f:
-    safety_data = json.load(f)
-
-with open("payloads.json") as f:
-    mission_data = json.load(f)
+from mission_inputs import load_json
+from scenario_config import get_scenario_config
 
 
 def compute_delivery_score(payload_delivered, payload_planned):
@@ -45,25 +39,13 @@ def compute_final_score(scores, weights):
 
     return total
 
-final_output = {
-    "mission_id": mission_data["mission_id"],
-    "objective_scores": {}
-}
-
-from scenario_config import get_scenario_config
-
-# Select weights based on scenario
-config = get_scenario_config(mission_data)
-scenario_id = mission_data.get("scenario_id", "Balanced")
-weights = config["weights"]
-
-for aircraft_name, mission_result in dynamic_data["dynamic_mission_result"].items():
+def score_aircraft(mission_result, safety_info, mission_data, weights, scenario_id):
+    """Objective components and weighted final score for one aircraft."""
 
     payload_delivered = mission_result.get("total_payload_delivered_kg", 0)
     total_fuel_used = mission_result.get("total_fuel_used_kg", 0)
     total_time_hr = mission_result.get("total_mission_time_hr", 0)
 
-    safety_info = safety_data["safety_margin_analysis"].get(aircraft_name, {})
     min_margin = None
     avg_risk = 0
 
@@ -103,7 +85,7 @@ for aircraft_name, mission_result in dynamic_data["dynamic_mission_result"].item
 
     final_score = compute_final_score(scores, weights)
 
-    final_output["objective_scores"][aircraft_name] = {
+    return {
         "scenario": scenario_id,
         "weights": weights,
         "components": {
@@ -116,7 +98,41 @@ for aircraft_name, mission_result in dynamic_data["dynamic_mission_result"].item
         "final_score": round(final_score, 4)
     }
 
-with open("objective_engine_output.json", "w") as f:
-    json.dump(final_output, f, indent=2)
+def score_objectives(dynamic_data, safety_data, mission_data):
+
+    final_output = {
+        "mission_id": mission_data["mission_id"],
+        "objective_scores": {}
+    }
+
+    # Select weights based on scenario
+    config = get_scenario_config(mission_data)
+    scenario_id = mission_data.get("scenario_id", "Balanced")
+    weights = config["weights"]
+
+    for aircraft_name, mission_result in dynamic_data["dynamic_mission_result"].items():
+        final_output["objective_scores"][aircraft_name] = score_aircraft(
+            mission_result,
+            safety_data["safety_margin_analysis"].get(aircraft_name, {}),
+            mission_data,
+            weights,
+            scenario_id
+        )
+
+    return final_output
+
+def main():
+
+    final_output = score_objectives(
+        load_json("dynamic_mission_output.json"),
+        load_json("safety_margin_output.json"),
+        load_json("payloads.json")
+    )
+
+    with open("objective_engine_output.json", "w") as f:
+        json.dump(final_output, f, indent=2)
+
+    print("Objective Engine Evaluation Completed.")
 
-print("Objective Engine Evaluation Completed.")
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,13 @@
 import json
 
-with open("hard_gate_output.json") as f:
-    hard_gate_data = json.load(f)
-
-with open("safety_margin_output.json") as f:
-    safety_data = json.load(f)
-
-with open("payloads.json") as f:
-    mission_data = json.load(f)
-
-
+from mission_inputs import load_json
 from scenario_config import get_scenario_config
 
-def evaluate_objective(aircraft_name, aircraft_data, mission_data):
+
+def evaluate_objective(aircraft_name, aircraft_data, mission_data, safety_data):
 
     config = get_scenario_config(mission_data)
+    scenario_id = mission_data.get("scenario_id", "Balanced")
     threshold = config["thresholds"]
 
     # Ambil minimum margin summary
@@ -56,26 +49,38 @@ def evaluate_objective(aircraft_name, aircraft_data, mission_data):
     }
 
 
-# Ambil scenario dari mission
-scenario_id = mission_data.get("scenario_id", "Balanced")
+def evaluate_thresholds(hard_gate_data, safety_data, mission_data):
 
-final_output = {
-    "mission_id": mission_data["mission_id"],
-    "objective_threshold_evaluation": {}
-}
+    final_output = {
+        "mission_id": mission_data["mission_id"],
+        "objective_threshold_evaluation": {}
+    }
 
-for aircraft_name, aircraft_result in hard_gate_data["hard_gate_summary"].items():
+    for aircraft_name, aircraft_result in hard_gate_data["hard_gate_summary"].items():
 
-    evaluation = evaluate_objective(
-        aircraft_name,
-        aircraft_result,
-        mission_data
-    )
+        evaluation = evaluate_objective(
+            aircraft_name,
+            aircraft_result,
+            mission_data,
+            safety_data
+        )
+
+        final_output["objective_threshold_evaluation"][aircraft_name] = evaluation
+
+    return final_output
 
-    final_output["objective_threshold_evaluation"][aircraft_name] = evaluation
+def main():
+
+    final_output = evaluate_thresholds(
+        load_json("hard_gate_output.json"),
+        load_json("safety_margin_output.json"),
+        load_json("payloads.json")
+    )
 
+    with open("objective_threshold_output.json", "w") as f:
+        json.dump(final_output, f, indent=2)
 
-with open("objective_threshold_output.json", "w") as f:
-    json.dump(final_output, f, indent=2)
+    print("Objective Threshold Evaluation completed.")
 
-print("Objective Threshold Evaluation completed.")
+if __name__ == "__main__":
+    main()
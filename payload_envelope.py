@@ -0,0 +1,244 @@
+import argparse
+import json
+import math
+
+import numpy as np
+
+from aircraft_profiles import build_aircraft
+from airport_store import load_store_inputs
+from flight_physics import compute_leg_fuel_array, min_departure_fuel_array
+from hard_feasibility_checks import FixedWingHardGate, RotaryWingHardGate
+from mission_inputs import load_inputs
+
+# Widest bracket tried around the closed-form weight limit, relative to the weight
+BRACKET_STEPS = 64
+
+
+def _leg_arrays(legs, **fields):
+    return dict(legs, **{field: np.asarray(values, dtype=float) for field, values in fields.items()})
+
+def _largest_passing(passes, lo, hi):
+    """
+    Largest float in [lo, hi] per element for which passes() holds, given
+    it holds at lo and not at hi (both non-negative). Bisects over the
+    IEEE bit patterns, which order non-negative floats, so the result is
+    exact to the last bit in at most 64 rounds.
+    """
+    lo_bits = lo.astype(float).view(np.int64)
+    hi_bits = hi.astype(float).view(np.int64)
+
+    while True:
+        open_ = hi_bits - lo_bits > 1
+        if not open_.any():
+            return lo_bits.view(float)
+
+        mid_bits = lo_bits + (hi_bits - lo_bits) // 2
+        ok = passes(mid_bits.view(float))
+
+        lo_bits = np.where(open_ & ok, mid_bits, lo_bits)
+        hi_bits = np.where(open_ & ~ok, mid_bits, hi_bits)
+
+def max_payload(gate, ac, legs):
+    """
+    Heaviest payload per leg that passes the hard gate (every check) with
+    the leg's fuel_onboard_kg, NaN where no payload does and inf where no
+    failing payload was found within BRACKET_STEPS. The closed-form
+    limit from gate.max_gross_weight_batch() is bracketed and then bisected
+    against evaluate_batch, so the result is the exact largest passing
+    payload as the gate computes it. payload_kg in `legs` is ignored.
+    """
+    fuel = np.asarray(legs["fuel_onboard_kg"], dtype=float)
+    shape = np.broadcast_shapes(*[np.shape(legs[field]) for field in legs])
+
+    def passes(payload):
+        return gate.evaluate_batch(ac, _leg_arrays(legs, payload_kg=payload))["passed"]
+
+    with np.errstate(invalid="ignore"):
+        estimate = np.broadcast_to(gate.max_gross_weight_batch(ac, legs) - ac.empty - fuel, shape)
+    estimate = np.where(np.isnan(estimate), 0.0, np.clip(estimate, 0.0, np.finfo(float).max))
+
+    # Widen a bracket [lo, hi] around the estimate until lo passes and hi fails
+    scale = np.maximum(estimate, 1.0)
+    lo = estimate.copy()
+    hi = estimate.copy()
+    lo_ok = passes(lo)
+    hi_ok = lo_ok.copy()
+
+    step = np.finfo(float).eps * scale
+    for _ in range(BRACKET_STEPS):
+        lower = ~lo_ok & (lo > 0)
+        higher = hi_ok & np.isfinite(hi)
+        if not (lower.any() or higher.any()):
+            break
+
+        lo = np.where(lower, np.maximum(lo - step, 0.0), lo)
+        hi = np.where(higher, hi + step, hi)
+        lo_ok = np.where(lower, passes(lo), lo_ok)
+        hi_ok = np.where(higher, passes(hi), hi_ok)
+        step = step * 2
+
+    # No payload at all: a weight-independent check fails, or the aircraft is over weight empty.
+    # Still passing at the widest bracket: the gate sets no payload limit there
+    result = _largest_passing(passes, np.where(lo_ok, lo, 0.0), np.where(lo_ok & ~hi_ok, hi, lo))
+    return np.where(lo_ok & ~hi_ok, result, np.where(lo_ok, np.inf, np.nan))
+
+def airport_envelope(gate, ac, inputs, origin_key, fuel_kg, payload_kg, keys=None):
+    """
+    Dispatch envelope of the direct leg from origin_key to every airport in
+    `keys` (default: every location but the origin), all in one vectorized
+    pass, with the planners' leg rules (mission_planning_engine.simulate_leg):
+    departure fuel covers the leg, the first alternate and the reserve,
+    and the hard gate sees the fuel left on arrival.
+
+      max_payload_kg  heaviest payload when departing with fuel_kg
+      min_fuel_kg     least departure fuel that flies payload_kg
+
+    NaN marks loads no payload / no fuel load makes legal; an infinite
+    max_payload_kg means the gate sets no payload limit (see max_payload).
+    """
+    location_data = inputs["location_data"]
+    alternate_data = inputs["alternate_data"]
+    distances = inputs["distances"]
+
+    locations = location_data["locations"]
+    if keys is None:
+        keys = [key for key in locations if key != origin_key]
+
+    def airport(key):
+        record = locations.get(key)
+        return record if record is not None else alternate_data["alternates"][key]
+
+    origin = airport(origin_key)
+    dests = [airport(key) for key in keys]
+
+    def column(records, field):
+        return np.array([r[field] for r in records], dtype=float)
+
+    def weather(field):
+        return np.array([d["weather"][field] for d in dests], dtype=float)
+
+    elevation = column(dests, "elevation_ft")
+    distance_nm = distances.row(origin_key)[[distances.ids[key] for key in keys]].astype(float)
+    leg_fuel = compute_leg_fuel_array(ac, origin["elevation_ft"], elevation, distance_nm)
+
+    # First alternate of each airport, as simulate_leg reserves for it
+    alt_keys = [(alternate_data.get(key) or [None])[0] for key in keys]
+    alt_fuel = np.zeros(len(keys))
+    with_alt = [i for i, alt_key in enumerate(alt_keys) if alt_key is not None]
+    if with_alt:
+        alt_fuel[with_alt] = compute_leg_fuel_array(
+            ac,
+            elevation[with_alt],
+            column([airport(alt_keys[i]) for i in with_alt], "elevation_ft"),
+            distances.matrix[[distances.ids[keys[i]] for i in with_alt], [distances.ids[alt_keys[i]] for i in with_alt]]
+        )
+
+    legs = {
+        "origin_elevation_ft": np.full(len(keys), float(origin["elevation_ft"])),
+        "elevation_ft": elevation,
+        "runway_length": column(dests, "runway_length"),
+        "oat_c": weather("oat_c"),
+        "qnh_hpa": weather("qnh_hpa"),
+        "wind_speed_mps": weather("wind_speed_mps"),
+        "visibility_km": weather("visibility_km"),
+        "payload_kg": np.full(len(keys), float(payload_kg)),
+        "fuel_onboard_kg": fuel_kg - leg_fuel,
+        "distance_nm": distance_nm
+    }
+
+    # Planners' fuel check: leg, first alternate and reserve
+    required = leg_fuel + alt_fuel + ac.reserve_fuel
+
+    # ---- Heaviest payload at the given departure fuel ----
+    payload_limit = np.where(required <= fuel_kg, max_payload(gate, ac, legs), np.nan)
+
+    # ---- Least departure fuel for the given payload ----
+    # More fuel only costs weight margin, so the payload either flies at the fuel floor or not at all
+    departure = min_departure_fuel_array(ac, leg_fuel, required, distance_nm)
+
+    passed = gate.evaluate_batch(ac, _leg_arrays(legs, fuel_onboard_kg=departure - leg_fuel))["passed"]
+    fuel_limit = np.where(passed, departure, np.nan)
+
+    return {
+        "keys": list(keys),
+        "distance_nm": distance_nm,
+        "leg_fuel_kg": leg_fuel,
+        "max_payload_kg": payload_limit,
+        "min_fuel_kg": fuel_limit
+    }
+
+
+def _kg(value, rounding):
+    """Limits are reported to 0.01 kg, rounded towards the legal side; None when there is no finite limit."""
+    return rounding(float(value) * 100) / 100 if np.isfinite(value) else None
+
+def build_envelope_report(inputs, aircraft_names=None, origin_key=None, keys=None, fuel_kg=None, payload_kg=None):
+    """Envelope of every (fleet aircraft, airport) pair of the mission in `inputs`."""
+
+    mission_data = inputs["mission_data"]
+    origin_key = (origin_key or mission_data["origin"]).lower()
+    if payload_kg is None:
+        payload_kg = mission_data["total_payload_kg"]
+
+    report = {}
+
+    for aircraft in mission_data["assigned_fleet"]:
+        ac_name = aircraft["aircraft_name"]
+        if aircraft_names and ac_name not in aircraft_names:
+            continue
+
+        ac = build_aircraft(ac_name, aircraft["type"])
+        gate = FixedWingHardGate() if ac.type == "fixed" else RotaryWingHardGate()
+        dispatch_fuel = aircraft["fuel_kg"] if fuel_kg is None else fuel_kg
+
+        envelope = airport_envelope(gate, ac, inputs, origin_key, dispatch_fuel, payload_kg, keys)
+
+        report[ac_name] = {
+            "dispatch_fuel_kg": dispatch_fuel,
+            "payload_kg": payload_kg,
+            "airports": {
+                key: {
+                    "distance_nm": round(float(envelope["distance_nm"][i]), 2),
+                    "leg_fuel_kg": round(float(envelope["leg_fuel_kg"][i]), 2),
+                    "max_payload_kg": _kg(envelope["max_payload_kg"][i], math.floor),
+                    "payload_unbounded": bool(np.isposinf(envelope["max_payload_kg"][i])),
+                    "min_fuel_kg": _kg(envelope["min_fuel_kg"][i], math.ceil)
+                }
+                for i, key in enumerate(envelope["keys"])
+            }
+        }
+
+    return {
+        "mission_id": mission_data["mission_id"],
+        "origin": origin_key,
+        "envelope": report
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Heaviest payload and least fuel per fleet aircraft for the direct leg to each airport"
+    )
+    parser.add_argument("--aircraft", action="append", help="fleet aircraft name (repeatable; default: whole fleet)")
+    parser.add_argument("--airport", action="append", help="destination key (repeatable; default: every location)")
+    parser.add_argument("--origin", help="departure airport (default: the mission origin)")
+    parser.add_argument("--fuel-kg", type=float, help="departure fuel for max_payload_kg (default: fleet fuel_kg)")
+    parser.add_argument("--payload-kg", type=float, help="payload for min_fuel_kg (default: mission total payload)")
+    parser.add_argument("--store", metavar="DB", help="read airports and weather from an airport_store.py SQLite store")
+    parser.add_argument("--at", metavar="TIME", help="with --store: use the weather valid at this ISO 8601 time")
+    parser.add_argument("--output", default="payload_envelope_output.json")
+    args = parser.parse_args()
+
+    inputs = load_store_inputs(args.store, at=args.at) if args.store else load_inputs()
+    keys = [key.lower() for key in args.airport] if args.airport else None
+
+    output = build_envelope_report(inputs, args.aircraft, args.origin, keys, args.fuel_kg, args.payload_kg)
+
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+
+    print(f"Payload/fuel envelope completed: {args.output}")
+
+if __name__ == "__main__":
+    main()
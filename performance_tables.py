@@ -0,0 +1,263 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from aircraft_profiles import build_aircraft, normalize_name
+from flight_physics import isa_density_ratio_array, pow_array
+
+DEFAULT_CHARTS_PATH = "performance_charts.json"
+
+# Tables a chart needs per gate kind, indexed [density altitude, gross weight]
+CHART_TABLES = {
+    "fixed": ("takeoff_distance_m", "landing_distance_m", "rate_of_climb_fpm"),
+    "rotary": ("power_margin_ratio", "oge_max_weight_kg")
+}
+
+# Tables indexed by density altitude only
+WEIGHT_INDEPENDENT = ("oge_max_weight_kg",)
+
+
+def _bracket(grid, x):
+    """Lower node index and fraction towards the next node of x on an ascending grid, x clamped to the grid."""
+    x = np.clip(x, grid[0], grid[-1])
+    i = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, len(grid) - 2)
+    return i, (x - grid[i]) / (grid[i + 1] - grid[i])
+
+
+class PerformanceChart:
+    """
+    Performance tables of one aircraft on a (density altitude, gross
+    weight) grid, e.g. digitized manufacturer charts, read by bilinear
+    interpolation. Lookups outside the grid are clamped to its edges,
+    never extrapolated.
+
+    A lookup interpolates along density altitude first (rows()) and then
+    along gross weight (values()); the scalar and vectorized gates run the
+    same operations, so both read bit-identical values.
+    """
+
+    def __init__(self, density_altitude_ft, gross_weight_kg, tables):
+
+        self.density_altitude_ft = np.asarray(density_altitude_ft, dtype=float)
+        self.gross_weight_kg = np.asarray(gross_weight_kg, dtype=float)
+
+        for axis, grid in (("density_altitude_ft", self.density_altitude_ft), ("gross_weight_kg", self.gross_weight_kg)):
+            if grid.ndim != 1 or len(grid) < 2 or not np.all(np.diff(grid) > 0):
+                raise ValueError(f"Chart axis {axis} must hold at least two ascending values")
+
+        self.tables = {}
+        for name, values in tables.items():
+            values = np.asarray(values, dtype=float)
+            expected = (len(self.density_altitude_ft),)
+            if name not in WEIGHT_INDEPENDENT:
+                expected += (len(self.gross_weight_kg),)
+            if values.shape != expected:
+                raise ValueError(f"Chart table {name} has shape {values.shape}, expected {expected}")
+            self.tables[name] = values
+
+    def missing(self, kind):
+        return [name for name in CHART_TABLES[kind] if name not in self.tables]
+
+    def rows(self, da):
+        """
+        Every table interpolated along density altitude at `da` (scalar or
+        1-D): rows over the gross weight grid, or plain values for the
+        WEIGHT_INDEPENDENT tables.
+        """
+        i, t = _bracket(self.density_altitude_ft, np.asarray(da, dtype=float))
+
+        rows = {}
+        for name, table in self.tables.items():
+            lo, hi = table[i], table[i + 1]
+            rows[name] = lo + (hi - lo) * (t if table.ndim == 1 else t[..., None])
+
+        return rows
+
+    def values(self, rows, weight, index=Ellipsis):
+        """
+        Tables at gross weight(s) `weight`, from rows(). `index` picks the
+        row of each weight when rows() was given several density altitudes.
+        """
+        j, u = _bracket(self.gross_weight_kg, np.asarray(weight, dtype=float))
+
+        values = {}
+        for name, row in rows.items():
+            if name in WEIGHT_INDEPENDENT:
+                values[name] = np.broadcast_to(row[index], np.shape(u))
+            else:
+                lo, hi = row[index, j], row[index, j + 1]
+                values[name] = lo + (hi - lo) * u
+
+        return values
+
+    def lookup(self, da, weight):
+        """Vectorized table values at (density altitude, gross weight) pairs; one rows() per distinct altitude."""
+
+        da, weight = np.broadcast_arrays(np.asarray(da, dtype=float), np.asarray(weight, dtype=float))
+        levels, inverse = np.unique(da.ravel(), return_inverse=True)
+
+        values = self.values(self.rows(levels), weight.ravel(), inverse.ravel())
+        return {name: value.reshape(da.shape) for name, value in values.items()}
+
+    def to_dict(self):
+        return {
+            "density_altitude_ft": self.density_altitude_ft.tolist(),
+            "gross_weight_kg": self.gross_weight_kg.tolist(),
+            **{name: table.tolist() for name, table in self.tables.items()}
+        }
+
+
+class PerformanceCharts:
+    """
+    PerformanceChart per aircraft model, matched on the profile name
+    case-insensitively. Aircraft without a chart keep the gates' analytic
+    model.
+
+    lookup() serves the scalar gates: the density altitude interpolation
+    is done once per airport weather snapshot (i.e. per density altitude)
+    and kept in a bounded LRU keyed by chart version, so a leg only
+    interpolates along gross weight. The bookkeeping is locked, so one instance can serve several
+    planning threads.
+    """
+
+    def __init__(self, charts=None, version=None, maxsize=4096):
+        self.charts = {normalize_name(name): chart for name, chart in (charts or {}).items()}
+        self.version = version
+        self.maxsize = maxsize
+
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def chart(self, ac):
+        """Chart of `ac`, or None when it has none."""
+
+        chart = self.charts.get(normalize_name(ac.name))
+        if chart is None:
+            return None
+
+        missing = chart.missing(ac.type)
+        if missing:
+            raise ValueError(f"Performance chart for {ac.name} lacks tables: {', '.join(missing)}")
+
+        return chart
+
+    def lookup(self, ac, chart, da, weight):
+        """Table values of `chart` at one density altitude and gross weight, as floats."""
+
+        key = (self.version, normalize_name(ac.name), da)
+
+        with self._lock:
+            rows = self._rows.get(key)
+            if rows is not None:
+                self._rows.move_to_end(key)
+
+        if rows is None:
+            rows = chart.rows(da)
+            with self._lock:
+                self._rows[key] = rows
+                if len(self._rows) > self.maxsize:
+                    self._rows.popitem(last=False)
+
+        return {name: float(value) for name, value in chart.values(rows, weight).items()}
+
+
+def parse_charts(data, version=None):
+    return PerformanceCharts(
+        {
+            name: PerformanceChart(
+                entry["density_altitude_ft"],
+                entry["gross_weight_kg"],
+                {table: values for table, values in entry.items() if table not in ("density_altitude_ft", "gross_weight_kg")}
+            )
+            for name, entry in data.items()
+        },
+        version=version or hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    )
+
+_charts = {}
+
+def load_charts(path=DEFAULT_CHARTS_PATH):
+    """Charts in `path`, re-read only when the file changes; no file means no charts."""
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return PerformanceCharts()
+
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _charts.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path) as f:
+            cached = (stamp, parse_charts(json.load(f)))
+        _charts[path] = cached
+
+    return cached[1]
+
+
+def model_chart(ac, density_altitude_ft, gross_weight_kg):
+    """
+    The gates' analytic performance model sampled on a grid, as a starting
+    point to overwrite with manufacturer chart data.
+    """
+    da = np.asarray(density_altitude_ft, dtype=float)[:, None]
+    weight = np.asarray(gross_weight_kg, dtype=float)[None, :]
+    lambda_w = weight / ac.mtow if ac.mtow else np.zeros_like(weight)
+
+    if ac.type == "fixed":
+        da_factor = (da / 1000) * ac.to_da_sensitivity
+        tables = {
+            "takeoff_distance_m": ac.takeoff_base * pow_array(lambda_w, 2) * (1 + da_factor),
+            "landing_distance_m": ac.landing_base * lambda_w * (1 + da_factor),
+            "rate_of_climb_fpm": np.broadcast_to(ac.roc * (1 - ac.roc_loss * (da / 1000)), (da.shape[0], weight.shape[1]))
+        }
+    else:
+        sigma = isa_density_ratio_array(da)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            P_avail = ac.engine_power * sigma
+            P_req = ac.engine_power * pow_array(lambda_w, 1.5)
+            power_margin = np.where(P_avail > 0, (P_avail - P_req) / P_avail, -1.0)
+        tables = {
+            "power_margin_ratio": power_margin,
+            "oge_max_weight_kg": ac.mtow * sigma[:, 0]
+        }
+
+    return PerformanceChart(density_altitude_ft, gross_weight_kg, tables)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Write the analytic performance model of an aircraft as a chart table, to fill in with manufacturer data"
+    )
+    parser.add_argument("--aircraft", required=True, help="model name as in aircraft_parameters.json")
+    parser.add_argument("--type", required=True, choices=["Fixed Wing", "Rotary Wing"])
+    parser.add_argument("--max-da-ft", type=float, default=12000)
+    parser.add_argument("--da-step-ft", type=float, default=1000)
+    parser.add_argument("--weight-points", type=int, default=11, help="gross weight nodes from empty weight to MTOW")
+    parser.add_argument("--output", default=DEFAULT_CHARTS_PATH, help="charts file to add the aircraft to")
+    args = parser.parse_args()
+
+    ac = build_aircraft(args.aircraft, args.type)
+    da_grid = np.arange(0, args.max_da_ft + args.da_step_ft / 2, args.da_step_ft)
+    weight_grid = np.linspace(ac.empty, ac.mtow, args.weight_points)
+
+    data = {}
+    if os.path.exists(args.output):
+        with open(args.output) as f:
+            data = json.load(f)
+
+    data[ac.name] = model_chart(ac, da_grid, weight_grid).to_dict()
+
+    with open(args.output, "w") as f:
+        json.dump(data, f, indent=2)
+
+    print(f"Performance chart for {ac.name} written: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from mission_inputs import load_inputs
+from airport_store import load_store_inputs
+from hard_feasibility_checks import evaluate_fleet
+from dynamic_mission_gate import run_dynamic_mission
+from run_full_simulation import simulate_fleet
+from safety_margin_analysis import analyze_safety_margins
+from objective_threshold import evaluate_thresholds
+from objective_engine import score_objectives
+
+
+def _hard_gate(results):
+    inputs = results["inputs"]
+    return evaluate_fleet(inputs["location_data"], inputs["mission_data"], inputs["distances"])
+
+def _dynamic_mission(results):
+    inputs = results["inputs"]
+    return run_dynamic_mission(
+        inputs["location_data"], inputs["mission_data"], inputs["alternate_data"], inputs["distances"]
+    )
+
+def _full_simulation(results):
+    inputs = results["inputs"]
+    return simulate_fleet(
+        inputs["location_data"], inputs["mission_data"], inputs["alternate_data"], inputs["distances"]
+    )
+
+def _safety_margin(results):
+    inputs = results["inputs"]
+    return analyze_safety_margins(
+        results["hard_gate"], inputs["location_data"], inputs["mission_data"], inputs["distances"]
+    )
+
+def _objective_threshold(results):
+    return evaluate_thresholds(results["hard_gate"], results["safety_margin"], results["inputs"]["mission_data"])
+
+def _objective_engine(results):
+    return score_objectives(results["dynamic_mission"], results["safety_margin"], results["inputs"]["mission_data"])
+
+
+# name -> (dependencies, stage function, JSON artifact written by the standalone script)
+STAGES = {
+    "hard_gate": (("inputs",), _hard_gate, "hard_gate_output.json"),
+    "dynamic_mission": (("inputs",), _dynamic_mission, "dynamic_mission_output.json"),
+    "full_simulation": (("inputs",), _full_simulation, "full_mission_simulation_output.json"),
+    "safety_margin": (("inputs", "hard_gate"), _safety_margin, "safety_margin_output.json"),
+    "objective_threshold": (("inputs", "hard_gate", "safety_margin"), _objective_threshold, "objective_threshold_output.json"),
+    "objective_engine": (("inputs", "dynamic_mission", "safety_margin"), _objective_engine, "objective_engine_output.json")
+}
+
+
+def required_stages(targets):
+    """Targets plus everything they depend on, in STAGES order."""
+
+    needed = set()
+    pending = list(targets)
+
+    while pending:
+        name = pending.pop()
+        if name in needed or name == "inputs":
+            continue
+        if name not in STAGES:
+            raise KeyError(f"Unknown pipeline stage: {name}")
+        needed.add(name)
+        pending.extend(STAGES[name][0])
+
+    return [name for name in STAGES if name in needed]
+
+def write_artifact(name, result, out_dir="."):
+
+    path = os.path.join(out_dir, STAGES[name][2])
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+
+    return path
+
+def run_pipeline(inputs=None, targets=None, write=(), out_dir=".", jobs=2, on_stage=None):
+    """
+    Runs the simulation stages as a dependency DAG in one process.
+
+    Stage results are passed in memory; a stage starts as soon as its
+    dependencies finish, so independent stages (hard gate, dynamic
+    mission) run side by side on `jobs` threads. The inputs are parsed once
+    (or taken as given, see mission_inputs.load_inputs). Only stages named
+    in `write` get their JSON artifact written to `out_dir`.
+
+    Returns {stage name: result}, including "inputs".
+    """
+    results = {"inputs": inputs if inputs is not None else load_inputs()}
+
+    remaining = required_stages(targets or STAGES)
+
+    with ThreadPoolExecutor(max(1, jobs)) as pool:
+
+        running = {}
+
+        while remaining or running:
+
+            for name in list(remaining):
+                if all(dep in results for dep in STAGES[name][0]):
+                    remaining.remove(name)
+                    running[pool.submit(_timed, STAGES[name][1], results)] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = running.pop(future)
+                results[name], elapsed = future.result()
+
+                if name in write:
+                    write_artifact(name, results[name], out_dir)
+                if on_stage is not None:
+                    on_stage(name, elapsed)
+
+    return results
+
+def _timed(stage, results):
+    start = time.perf_counter()
+    result = stage(results)
+    return result, time.perf_counter() - start
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Aerobridge simulation pipeline (in-memory stage DAG)")
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        metavar="STAGE",
+        help=f"stages to run, dependencies included (default: all of {', '.join(STAGES)})"
+    )
+    parser.add_argument(
+        "--write",
+        nargs="*",
+        metavar="STAGE",
+        help="write JSON artifacts; no names means every stage that ran"
+    )
+    parser.add_argument(
+        "--out-dir",
+        default=".",
+        help="directory for written artifacts (default: current directory)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=2,
+        help="stages run concurrently (default: 2)"
+    )
+    parser.add_argument(
+        "--store",
+        metavar="DB",
+        help="read airports and weather from an airport_store.py SQLite store instead of the JSON files"
+    )
+    parser.add_argument(
+        "--at",
+        metavar="TIME",
+        help="with --store: use the weather valid at this ISO 8601 time (default: latest)"
+    )
+    args = parser.parse_args()
+
+    targets = (args.stages or list(STAGES)) + (args.write or [])
+
+    try:
+        ran = required_stages(targets)
+    except KeyError as e:
+        parser.error(e.args[0])
+
+    if args.write is None:
+        write = ()
+    elif not args.write:
+        write = ran
+    else:
+        write = args.write
+
+    def report(name, elapsed):
+        print(f"{name} completed ({elapsed:.2f} s)" + (f" -> {STAGES[name][2]}" if name in write else ""))
+
+    inputs = load_store_inputs(args.store, at=args.at) if args.store else None
+
+    run_pipeline(inputs, targets=targets, write=write, out_dir=args.out_dir, jobs=args.jobs, on_stage=report)
+
+    print("Aerobridge pipeline completed.")
+
+if __name__ == "__main__":
+    main()
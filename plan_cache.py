@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from aircraft_profiles import load_catalog
+
+DEFAULT_CACHE_PATH = os.path.join(".aerobridge_cache", "plans.sqlite")
+
+# Bump when planner changes alter outputs for the same inputs
+PLAN_CACHE_FORMAT = 1
+
+
+def plan_key(ctx, search="bnb", top_k=3, trace=False):
+    """
+    Content hash of everything a plan depends on: the mission (deliveries,
+    fleet and fuel, scenario), the resolved scenario weights and
+    thresholds, the aircraft catalog version, the version of the
+    performance charts the context's hard gates were built with, and the
+    current records of every airport the planner can read (origin,
+    destinations and their alternates, weather included).
+    """
+    airport_keys = [ctx.origin_key]
+    for delivery in ctx.deliveries:
+        airport_keys.append(delivery["destination"])
+        airport_keys.extend(ctx.alternate_data.get(delivery["destination"], []))
+
+    locations = ctx.location_data["locations"]
+
+    effective = {
+        "format": PLAN_CACHE_FORMAT,
+        "mission": ctx.mission_data,
+        "scenario": {"weights": ctx.weights, "thresholds": ctx.thresholds},
+        "aircraft": load_catalog().version,
+        "charts": ctx.charts.version,
+        "airports": {key: locations.get(key) for key in airport_keys},
+        "alternates": {d["destination"]: ctx.alternate_data.get(d["destination"], []) for d in ctx.deliveries},
+        "search": [search, top_k, trace]
+    }
+
+    return hashlib.sha256(json.dumps(effective, sort_keys=True).encode()).hexdigest()
+
+
+class PlanCache:
+    """
+    Planning outputs in a local SQLite file, keyed by plan_key(). Entries
+    are evicted least-recently-used once their (compressed) total passes
+    `max_bytes`. Hit/miss counters live in the database too, so the stats
+    cover every process sharing the file.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connect(self):
+        # Connections must not cross a fork, so each process opens its own
+        if self._conn is None or self._pid != os.getpid():
+
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "key TEXT PRIMARY KEY, result BLOB NOT NULL, size INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS plans_last_used ON plans (last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO stats VALUES (?, 0)",
+                [("hits",), ("misses",), ("evictions",)]
+            )
+
+            self._conn = conn
+            self._pid = os.getpid()
+
+        return self._conn
+
+    def _count(self, conn, name, n=1):
+        conn.execute("UPDATE stats SET value = value + ? WHERE name = ?", (n, name))
+
+    def get(self, key):
+        """Cached planning output for `key`, or None."""
+
+        with self._lock:
+            conn = self._connect()
+
+            row = conn.execute("SELECT result FROM plans WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(conn, "misses")
+                return None
+
+            conn.execute("UPDATE plans SET last_used = ? WHERE key = ?", (time.time_ns(), key))
+            self._count(conn, "hits")
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, result):
+
+        blob = zlib.compress(json.dumps(result).encode())
+
+        with self._lock:
+            conn = self._connect()
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?)",
+                    (key, blob, len(blob), time.time_ns())
+                )
+
+                # Newest first; everything past the byte budget goes
+                evicted = conn.execute(
+                    "DELETE FROM plans WHERE key IN ("
+                    "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS running FROM plans) "
+                    "WHERE running > ?)",
+                    (self.max_bytes,)
+                ).rowcount
+                if evicted:
+                    self._count(conn, "evictions", evicted)
+
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM plans")
+            conn.execute("UPDATE stats SET value = 0")
+
+    def stats(self):
+
+        with self._lock:
+            conn = self._connect()
+            counts = dict(conn.execute("SELECT name, value FROM stats"))
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM plans").fetchone()
+
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "hits": counts["hits"],
+            "misses": counts["misses"],
+            "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "evictions": counts["evictions"]
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
@@ -0,0 +1,111 @@
+import multiprocessing
+import sys
+
+from hard_feasibility_checks import FixedWingHardGate, RotaryWingHardGate, HardGateCache
+from leg_tensor import LegFeasibilityTensor
+from performance_tables import load_charts
+from scenario_config import get_scenario_config
+
+
+def gate_kind(aircraft):
+    return "fixed" if "fixed" in aircraft["type"].lower() else "rotary"
+
+def new_evaluators(charts=None):
+    """Hard-gate caches per gate kind, both reading one PerformanceCharts (the current charts file by default)."""
+
+    charts = load_charts() if charts is None else charts
+    return {
+        "fixed": HardGateCache(FixedWingHardGate(charts)),
+        "rotary": HardGateCache(RotaryWingHardGate(charts))
+    }
+
+def fork_context():
+    """
+    Multiprocessing context for the planner worker pools.
+
+    Workers inherit the parent's warm inputs, planning contexts and hard-gate
+    caches unpickled (they hold locks and mapped snapshots), so the pools
+    need the POSIX "fork" start method. Windows has no fork and on macOS it
+    is unsafe once system frameworks are loaded, so those platforms get a
+    clear error instead of a crashed pool.
+    """
+    if sys.platform == "darwin" or "fork" not in multiprocessing.get_all_start_methods():
+        raise RuntimeError(
+            f"planner worker pools need the POSIX 'fork' start method, which is not available on {sys.platform}; "
+            "plan with --jobs 1 (the planning service needs fork even then)"
+        )
+    return multiprocessing.get_context("fork")
+
+def merge_deliveries(deliveries):
+    """Sums weights of duplicate destinations (keys lowercased, first-seen order)."""
+
+    merged = {}
+    for d in deliveries:
+        key = d["destination"].lower()
+        merged[key] = merged.get(key, 0) + d["weight_kg"]
+
+    return [{"destination": k, "weight_kg": v} for k, v in merged.items()]
+
+
+class PlanningContext:
+    """
+    Everything a planner reads for one mission: the parsed airport data
+    (see mission_inputs.load_inputs), the payloads.json style mission, its
+    scenario config resolved once, the merged deliveries, warm-start
+    routes, the hard-gate caches and per-aircraft leg feasibility tensors.
+
+    Planner functions take the context explicitly instead of reading
+    module globals, so threads or async tasks can plan different missions
+    in one process. with_mission() derives a context for another mission
+    that shares the airport data and caches.
+    """
+
+    def __init__(self, inputs, mission_data=None, evaluators=None, warm_start=None):
+
+        self.inputs = inputs
+        self.location_data = inputs["location_data"]
+        self.alternate_data = inputs["alternate_data"]
+        self.distances = inputs["distances"]
+
+        self.mission_data = mission_data if mission_data is not None else inputs["mission_data"]
+
+        self.config = get_scenario_config(self.mission_data)
+        self.weights = self.config["weights"]
+        self.thresholds = self.config["thresholds"]
+        self.scenario_id = self.mission_data.get("scenario_id", "Balanced")
+
+        self.origin_key = self.mission_data["origin"].lower()
+        self.origin = self.location_data["locations"][self.origin_key]
+        self.total_payload_kg = self.mission_data["total_payload_kg"]
+        self.fleet = self.mission_data["assigned_fleet"]
+        self.deliveries = merge_deliveries(self.mission_data["deliveries"])
+
+        self.warm_start = warm_start or {}
+        self.evaluators = evaluators if evaluators is not None else new_evaluators()
+        self._leg_tensors = {}
+
+        # The charts the gates were built with, which may be older than the charts file
+        self.charts = self.evaluators["fixed"].evaluator.charts
+
+    def with_mission(self, mission_data, warm_start=None):
+        return PlanningContext(self.inputs, mission_data, self.evaluators, warm_start)
+
+    def evaluator(self, aircraft):
+        """Shared hard-gate cache for a fleet entry's aircraft type."""
+        return self.evaluators[gate_kind(aircraft)]
+
+    def leg_tensor(self, ac, evaluator, fuel_kg, minimum_fuel=False):
+        """
+        LegFeasibilityTensor of this mission's legs for a profile departing
+        with fuel_kg (or, with minimum_fuel, the least legal load up to
+        fuel_kg), built once. It covers this mission's airports and a
+        single fuel level, the one every leg of the planners departs with;
+        there is no network-wide tensor over several fuel buckets.
+        """
+        key = (ac.key, fuel_kg, minimum_fuel)
+        tensor = self._leg_tensors.get(key)
+        if tensor is None:
+            tensor = self._leg_tensors.setdefault(
+                key, LegFeasibilityTensor(self, ac, evaluator, [fuel_kg], minimum_fuel)
+            )
+        return tensor
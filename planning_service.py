@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import mission_planning_engine
+from mission_inputs import load_inputs
+from planning_context import PlanningContext, fork_context, new_evaluators
+from plan_cache import DEFAULT_CACHE_PATH, PlanCache, plan_key
+from aircraft_profiles import build_aircraft, load_catalog
+from performance_tables import load_charts
+
+# Top-level payloads.json keys the planner reads
+MISSION_KEYS = ("mission_id", "origin", "deliveries", "total_payload_kg", "assigned_fleet")
+
+SEARCH_MODES = ("dp", "bnb", "exhaustive")
+
+
+# ---- Worker side ----
+
+# Per-process warm state: parsed inputs, distance matrix and gate caches
+_warm = {}
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def warm_inputs(location_path, alternate_path):
+    """
+    Shared inputs for this worker, re-parsed only when a file changes. The
+    hard gates read the performance charts when they are built, so a new
+    charts version rebuilds them (and drops their caches) as well.
+    """
+    stamp = (_file_stamp(location_path), _file_stamp(alternate_path), load_charts().version)
+
+    if _warm.get("stamp") != stamp:
+        inputs = load_inputs(location_path=location_path, alternate_path=alternate_path, mission_path=None)
+        _warm["stamp"] = stamp
+        _warm["inputs"] = inputs
+        _warm["evaluators"] = new_evaluators()
+
+    # Compiles every catalog model once (memoized per catalog version)
+    catalog = load_catalog()
+    if _warm.get("catalog") != catalog.version:
+        for category, models in catalog.data.items():
+            for model in models:
+                build_aircraft(model, category, catalog)
+        _warm["catalog"] = catalog.version
+
+    return _warm["inputs"], _warm["evaluators"]
+
+def check_mission(mission_data, search):
+    """Raises ValueError for a mission or search mode the planner can't take."""
+
+    if not isinstance(mission_data, dict):
+        raise ValueError("Mission must be a JSON object")
+
+    missing = [key for key in MISSION_KEYS if key not in mission_data]
+    if missing:
+        raise ValueError(f"Mission is missing: {', '.join(missing)}")
+    if search not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {search}")
+
+    for aircraft in mission_data["assigned_fleet"]:
+        if mission_planning_engine.fuel_load(aircraft) not in mission_planning_engine.FUEL_LOADS:
+            raise ValueError(f"Unknown fuel_load: {aircraft['fuel_load']}")
+
+def plan_cache(path):
+    """This process's PlanCache for `path`."""
+
+    caches = _warm.setdefault("plan_caches", {})
+    if path not in caches:
+        caches[path] = PlanCache(path)
+    return caches[path]
+
+def plan_mission(mission_data, search="bnb", top_k=3, location_path="location_params.json",
+                 alternate_path="alternate_airports.json", cache_path=None):
+    """
+    simulation_mission_planning_output.json structure for one payloads.json
+    style mission, planned against this process's warm inputs. With
+    `cache_path`, identical plans come from the SQLite plan cache.
+    """
+    inputs, evaluators = warm_inputs(location_path, alternate_path)
+
+    ctx = PlanningContext(inputs, mission_data, evaluators)
+
+    cache = plan_cache(cache_path) if cache_path else None
+    key = plan_key(ctx, search, top_k) if cache else None
+
+    output = cache.get(key) if cache else None
+    if output is None:
+        final_output = mission_planning_engine.plan_routes(ctx, search, top_k)
+        output = mission_planning_engine.build_planning_report(ctx, final_output)
+        if cache:
+            cache.put(key, output)
+
+    return output
+
+
+# ---- Service ----
+
+class PlanningService:
+    """
+    Long-running planner. Missions are planned in a fork-based process
+    pool whose workers keep the parsed inputs, distance matrix, compiled
+    aircraft profiles and hard-gate caches warm between requests. Needs the
+    POSIX fork start method (not Windows or macOS).
+    """
+
+    def __init__(self, jobs=2, location_path="location_params.json", alternate_path="alternate_airports.json",
+                 cache_path=None):
+        self.jobs = jobs
+        self.location_path = location_path
+        self.alternate_path = alternate_path
+        self.cache_path = cache_path
+        self.served = 0
+        self.failed = 0
+        self.pool = None
+
+    def start(self):
+        # Warm the parent first so forked workers start with everything loaded
+        warm_inputs(self.location_path, self.alternate_path)
+        self.pool = ProcessPoolExecutor(self.jobs, mp_context=fork_context())
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    async def plan(self, mission_data, search="bnb", top_k=3):
+
+        check_mission(mission_data, search)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.pool, plan_mission, mission_data, search, top_k, self.location_path, self.alternate_path,
+            self.cache_path
+        )
+
+    def health(self):
+        health = {"status": "ok", "jobs": self.jobs, "served": self.served, "failed": self.failed}
+        if self.cache_path:
+            health["plan_cache"] = plan_cache(self.cache_path).stats()
+        return health
+
+    async def handle(self, reader, writer):
+        """One HTTP/1.1 request per connection: GET /health, POST /plan?search=&top_k=."""
+
+        try:
+            status, body = await self._respond(reader)
+        except Exception as e:
+            status, body = 500, {"error": str(e)}
+
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {http.client.responses.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + payload
+        )
+
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, reader):
+
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) < 2:
+            return 400, {"error": "Malformed request"}
+
+        method, target = request_line[0], request_line[1]
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if method == "GET" and url.path == "/health":
+            return 200, self.health()
+
+        if method != "POST" or url.path != "/plan":
+            return 404, {"error": f"No route for {method} {url.path}"}
+
+        try:
+            mission_data = json.loads(body)
+            top_k = int(query.get("top_k", 3))
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        try:
+            output = await self.plan(mission_data, query.get("search", "bnb"), top_k)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            self.failed += 1
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+        self.served += 1
+        return 200, output
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None):
+
+        self.start()
+        try:
+            if unix_path:
+                server = await asyncio.start_unix_server(self.handle, path=unix_path)
+            else:
+                server = await asyncio.start_server(self.handle, host, port)
+
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+
+# ---- Client ----
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, path, timeout=60):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class PlanningClient:
+    """Minimal blocking client for PlanningService (TCP or Unix socket)."""
+
+    def __init__(self, host="127.0.0.1", port=8765, unix_path=None, timeout=60):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None):
+
+        if self.unix_path:
+            conn = _UnixHTTPConnection(self.unix_path, self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+        try:
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            result = json.loads(response.read())
+        finally:
+            conn.close()
+
+        if response.status != 200:
+            raise RuntimeError(f"Planning service returned {response.status}: {result.get('error')}")
+
+        return result
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def plan(self, mission_data, search="bnb", top_k=3):
+        return self._request("POST", f"/plan?search={search}&top_k={top_k}", json.dumps(mission_data))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Warm mission planning service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on (or connect to) a Unix socket instead of TCP")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the service")
+    serve.add_argument("--jobs", type=int, default=2, help="planner worker processes (default: 2)")
+    serve.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+        help=f"serve repeated plans from a SQLite plan cache (default: {DEFAULT_CACHE_PATH})"
+    )
+
+    plan = commands.add_parser("plan", help="send a payloads.json style mission to a running service")
+    plan.add_argument("mission", nargs="?", default="payloads.json")
+    plan.add_argument("--search", choices=SEARCH_MODES, default="bnb")
+    plan.add_argument("--top-k", type=int, default=3)
+    plan.add_argument("--output", help="write the planning output here instead of stdout")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        service = PlanningService(jobs=args.jobs, cache_path=args.cache)
+        print(f"Planning service listening on {args.unix or f'{args.host}:{args.port}'}")
+        try:
+            asyncio.run(service.serve(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    with open(args.mission) as f:
+        mission_data = json.load(f)
+
+    client = PlanningClient(args.host, args.port, args.unix)
+
+    start = time.perf_counter()
+    output = client.plan(mission_data, args.search, args.top_k)
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"Planned {mission_data['mission_id']} in {elapsed:.3f} s -> {args.output}")
+    else:
+        print(json.dumps(output, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import heapq
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from flight_physics import compute_leg_fuel_array, leg_time_hr_array
+
+# Graphs are cached per payload bucket; edges are gated at the bucket's upper bound
+PAYLOAD_BUCKET_KG = 50
+
+# Edge costs a search can minimise
+WEIGHTS = ("fuel", "time")
+
+# Airport record fields the hard gate reads at the destination
+_GATE_COLUMNS = ("elevation_ft", "runway_length")
+_WEATHER_COLUMNS = ("oat_c", "qnh_hpa", "wind_speed_mps", "visibility_km")
+
+
+def refuel_capable(airport):
+    """Airports refuel unless their record says "refuel": false (the Universal Refueling default)."""
+    return bool(airport.get("refuel", True))
+
+def payload_bucket(payload_kg, step=PAYLOAD_BUCKET_KG):
+    return math.ceil(payload_kg / step) * step
+
+def _airport_state(airport):
+    return (
+        airport["elevation_ft"],
+        airport["runway_length"],
+        tuple(airport["coords"]),
+        tuple(airport["weather"].items()),
+        refuel_capable(airport)
+    )
+
+
+class ReachabilityGraph:
+    """
+    Directed graph of the legs one aircraft can fly between any two known
+    airports (locations and alternates) when departing with its dispatch
+    fuel and up to `payload_kg` on board. An edge exists when the leg fuel
+    fits within dispatch fuel minus reserve and the leg passes the hard
+    gate; it carries the leg fuel, time and distance.
+
+    The aircraft only departs again from refuel-capable airports, so
+    paths through the graph are refuel stops. route() and nearest() run
+    A* / Dijkstra over it minimising fuel or time. refresh() rebuilds only
+    the edges touching airports whose weather, runway, elevation, coords
+    or refuel flag changed.
+    """
+
+    def __init__(self, ac, evaluator, airports, distances, dispatch_fuel_kg, payload_kg):
+
+        self.ac = ac
+        self.evaluator = evaluator
+        self.airports = airports
+        self.distances = distances
+        self.dispatch_fuel_kg = dispatch_fuel_kg
+        self.payload_kg = payload_kg
+
+        self.nodes_rebuilt = 0
+        self._build()
+
+    # ---- Building ----
+
+    def _build(self):
+
+        self.keys = tuple(self.distances.keys)
+        self._states = [_airport_state(self.airports[key]) for key in self.keys]
+
+        records = [self.airports[key] for key in self.keys]
+        self._columns = {field: np.array([r[field] for r in records], dtype=float) for field in _GATE_COLUMNS}
+        for field in _WEATHER_COLUMNS:
+            self._columns[field] = np.array([r["weather"][field] for r in records], dtype=float)
+        self.refuel = np.array([state[-1] for state in self._states], dtype=bool)
+
+        # edges[i][j] = (fuel_kg, time_hr, distance_nm); reverse[j] = {i with an edge i -> j}
+        self.edges = [{} for _ in self.keys]
+        self.reverse = [set() for _ in self.keys]
+
+        for i in range(len(self.keys)):
+            self._link_row(i)
+
+    def _legs(self, src, dst, fuel_onboard_kg):
+        """(src, dst, fuel, time, distance) of the flyable, gate-passing legs among the pairs given."""
+
+        ac = self.ac
+        columns = self._columns
+
+        src, dst = np.broadcast_arrays(np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64))
+        distance_nm = self.distances.matrix[src, dst]
+
+        fuel = compute_leg_fuel_array(ac, columns["elevation_ft"][src], columns["elevation_ft"][dst], distance_nm)
+        keep = np.flatnonzero((src != dst) & (fuel <= fuel_onboard_kg - ac.reserve_fuel))
+
+        src, dst, distance_nm, fuel = src[keep], dst[keep], distance_nm[keep], fuel[keep]
+        if not len(keep):
+            return src, dst, fuel, np.zeros(0), distance_nm
+
+        legs = {field: columns[field][dst] for field in _GATE_COLUMNS + _WEATHER_COLUMNS}
+        legs.update(
+            origin_elevation_ft=columns["elevation_ft"][src],
+            payload_kg=self.payload_kg,
+            fuel_onboard_kg=fuel_onboard_kg - fuel,
+            distance_nm=distance_nm
+        )
+        passed = self.evaluator.evaluate_batch(ac, legs)["passed"]
+
+        src, dst, distance_nm, fuel = src[passed], dst[passed], distance_nm[passed], fuel[passed]
+        time_hr = leg_time_hr_array(ac, columns["elevation_ft"][src], columns["elevation_ft"][dst], distance_nm)
+
+        return src, dst, fuel, time_hr, distance_nm
+
+    def _edge_map(self, legs):
+        _, dst, fuel, time_hr, distance_nm = legs
+        return dict(zip(dst.tolist(), zip(fuel.tolist(), time_hr.tolist(), distance_nm.tolist())))
+
+    def _link_row(self, i):
+        """Recomputes the legs departing airport i."""
+
+        for j in self.edges[i]:
+            self.reverse[j].discard(i)
+
+        if self.refuel[i]:
+            self.edges[i] = self._edge_map(self._legs(i, np.arange(len(self.keys)), self.dispatch_fuel_kg))
+        else:
+            self.edges[i] = {}
+
+        for j in self.edges[i]:
+            self.reverse[j].add(i)
+
+    def _link_column(self, j):
+        """Recomputes the legs arriving at airport j."""
+
+        for i in self.reverse[j]:
+            del self.edges[i][j]
+        self.reverse[j] = set()
+
+        src, _, fuel, time_hr, distance_nm = self._legs(
+            np.flatnonzero(self.refuel), j, self.dispatch_fuel_kg
+        )
+        for i, edge in zip(src.tolist(), zip(fuel.tolist(), time_hr.tolist(), distance_nm.tolist())):
+            self.edges[i][j] = edge
+            self.reverse[j].add(i)
+
+    def refresh(self):
+        """Rebuilds the edges of airports whose state changed since the last build; returns their keys."""
+
+        if tuple(self.distances.keys) != self.keys:
+            self._build()
+            self.nodes_rebuilt += len(self.keys)
+            return list(self.keys)
+
+        changed = []
+        for i, key in enumerate(self.keys):
+            airport = self.airports[key]
+            state = _airport_state(airport)
+            if state == self._states[i]:
+                continue
+
+            self._states[i] = state
+            self.refuel[i] = state[-1]
+            for field in _GATE_COLUMNS:
+                self._columns[field][i] = airport[field]
+            for field in _WEATHER_COLUMNS:
+                self._columns[field][i] = airport["weather"][field]
+            changed.append(i)
+
+        for i in changed:
+            self._link_row(i)
+            self._link_column(i)
+
+        self.nodes_rebuilt += len(changed)
+        return [self.keys[i] for i in changed]
+
+    # ---- Queries ----
+
+    def route(self, source, target, weight="fuel", start_fuel_kg=None):
+        """
+        Cheapest path from source to target (A*, bounded below by the
+        great-circle distance at cruise), or None. start_fuel_kg is the
+        fuel on board at source if it cannot refuel there.
+        """
+        target_index = self.distances.ids[target]
+
+        per_nm = self.ac.fuel_per_nm if weight == "fuel" else self.ac.hours_per_nm
+        if per_nm <= 0 or (weight == "fuel" and self.ac.climb_fuel_rate < 0):
+            per_nm = 0.0
+        remaining = (self.distances.matrix[target_index] * per_nm).tolist()
+
+        return self._search(source, {target_index}, weight, start_fuel_kg, remaining)
+
+    def nearest(self, source, targets, weight="fuel", start_fuel_kg=None):
+        """Cheapest path from source to whichever of `targets` is cheapest to reach (Dijkstra), or None."""
+
+        ids = self.distances.ids
+        target_indexes = {ids[key] for key in targets if key in ids and key != source}
+
+        return self._search(source, target_indexes, weight, start_fuel_kg, None)
+
+    def _search(self, source, targets, weight, start_fuel_kg, remaining):
+
+        if weight not in WEIGHTS:
+            raise ValueError(f"Unknown weight: {weight}")
+        if not targets:
+            return None
+
+        cost_index = WEIGHTS.index(weight)
+        start = self.distances.ids[source]
+
+        # An airport without fuel is left with whatever is on board
+        if self.refuel[start] or start_fuel_kg is None:
+            first_hops = self.edges[start]
+        else:
+            first_hops = self._edge_map(self._legs(start, np.arange(len(self.keys)), start_fuel_kg))
+
+        best = {start: 0.0}
+        previous = {}
+        settled = set()
+        heap = [(remaining[start] if remaining else 0.0, 0.0, start)]
+
+        while heap:
+            _, cost, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+
+            if node in targets:
+                return self._path(start, node, previous, first_hops)
+
+            if node == start:
+                edges = first_hops
+            elif self.refuel[node]:
+                edges = self.edges[node]
+            else:
+                continue
+
+            for nxt, edge in edges.items():
+                new_cost = cost + edge[cost_index]
+                if new_cost < best.get(nxt, math.inf):
+                    best[nxt] = new_cost
+                    previous[nxt] = node
+                    heapq.heappush(heap, (new_cost + (remaining[nxt] if remaining else 0.0), new_cost, nxt))
+
+        return None
+
+    def _path(self, start, end, previous, first_hops):
+
+        nodes = [end]
+        while nodes[-1] != start:
+            nodes.append(previous[nodes[-1]])
+        nodes.reverse()
+
+        legs = []
+        for a, b in zip(nodes, nodes[1:]):
+            fuel_kg, time_hr, distance_nm = (first_hops if a == start else self.edges[a])[b]
+            legs.append({
+                "from": self.keys[a],
+                "to": self.keys[b],
+                "distance_nm": distance_nm,
+                "fuel_kg": fuel_kg,
+                "time_hr": time_hr
+            })
+
+        return {
+            "path": [self.keys[i] for i in nodes],
+            "legs": legs,
+            "distance_nm": sum(leg["distance_nm"] for leg in legs),
+            "fuel_kg": sum(leg["fuel_kg"] for leg in legs),
+            "time_hr": sum(leg["time_hr"] for leg in legs)
+        }
+
+
+class ReachabilityGraphs:
+    """
+    ReachabilityGraph cache over one airport dataset, keyed by aircraft
+    profile, dispatch fuel and payload bucket (least recently used
+    dropped past `maxsize`). get() refreshes a cached graph first, so an
+    airport update only rebuilds that airport's edges.
+    """
+
+    def __init__(self, location_data, alternate_data, distances, maxsize=32):
+        self.location_data = location_data
+        self.alternate_data = alternate_data
+        self.distances = distances
+        self.maxsize = maxsize
+
+        self._graphs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def airport(self, key):
+        airport = self.location_data["locations"].get(key)
+        return airport if airport is not None else self.alternate_data["alternates"][key]
+
+    def airports(self):
+        """Every airport record by key; locations win over alternates, as in the distance matrix."""
+
+        airports = dict(self.location_data["locations"])
+        for key, alt in self.alternate_data["alternates"].items():
+            airports.setdefault(key, alt)
+
+        return airports
+
+    def get(self, ac, evaluator, dispatch_fuel_kg, payload_kg):
+
+        key = (ac.key, dispatch_fuel_kg, payload_bucket(payload_kg))
+
+        with self._lock:
+            graph = self._graphs.get(key)
+
+            if graph is None:
+                graph = ReachabilityGraph(
+                    ac, evaluator, self.airports(), self.distances, dispatch_fuel_kg, key[2]
+                )
+                self._graphs[key] = graph
+                if len(self._graphs) > self.maxsize:
+                    self._graphs.popitem(last=False)
+            else:
+                self._graphs.move_to_end(key)
+                if tuple(self.distances.keys) != graph.keys:
+                    graph.airports = self.airports()
+                graph.refresh()
+
+        return graph
@@ -0,0 +1,320 @@
+import bisect
+import heapq
+import itertools
+import math
+from operator import le
+
+
+def permutation_from_rank(n, rank):
+    """
+    Lehmer-code unranking: the rank-th permutation of range(n) in
+    itertools.permutations (lexicographic) order.
+    """
+    pool = list(range(n))
+    sequence = []
+
+    for i in range(n, 0, -1):
+        index, rank = divmod(rank, math.factorial(i - 1))
+        sequence.append(pool.pop(index))
+
+    return tuple(sequence)
+
+def iter_permutation_range(n, start, stop):
+    """
+    Yields (rank, permutation) for ranks in [start, stop), unranking only
+    the first one and stepping with next-permutation after that.
+    """
+    if start >= stop:
+        return
+
+    sequence = list(permutation_from_rank(n, start))
+
+    for rank in range(start, stop):
+        yield rank, tuple(sequence)
+
+        i = n - 2
+        while i >= 0 and sequence[i] > sequence[i + 1]:
+            i -= 1
+        if i < 0:
+            return
+
+        j = n - 1
+        while sequence[j] < sequence[i]:
+            j -= 1
+
+        sequence[i], sequence[j] = sequence[j], sequence[i]
+        sequence[i + 1:] = reversed(sequence[i + 1:])
+
+def permutation_shards(n, shards):
+    """Splits the n! permutation ranks into at most `shards` contiguous ranges."""
+    total = math.factorial(n)
+    size = -(-total // max(1, shards))
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+class _Reversed:
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+
+class TopK:
+    """
+    Bounded heap holding the k entries with the smallest rank keys seen so
+    far. Keys must be unique (include the ordering as a tie-break), so
+    memory stays at k entries however many candidates are pushed.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def full(self):
+        return len(self._heap) >= self.k
+
+    def worst(self):
+        return self._heap[0][0].key if self._heap else None
+
+    def push(self, key, item):
+        if self.k <= 0:
+            return False
+
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (_Reversed(key), item))
+            return True
+
+        if key < self._heap[0][0].key:
+            heapq.heapreplace(self._heap, (_Reversed(key), item))
+            return True
+
+        return False
+
+    def items(self):
+        """Kept items, best (smallest key) first."""
+        return [item for _, item in sorted(self._heap, key=lambda entry: entry[0].key)]
+
+
+class SubsetRouteSearch:
+    """
+    Held-Karp style search over delivery orderings.
+
+    Partial routes ("labels") are grouped by (visited set, last stop).
+    Every label in a group shares the same future, so the next leg is
+    simulated once per group instead of once per ordering. This needs a
+    planner whose next leg depends on nothing else, e.g. one that refuels
+    to the same load at every stop.
+
+    Callbacks supplied by the planner:
+      leg(label, stop)             -> leg outcome, must depend only on the group
+      advance(label, stop, outcome) -> child label dict with a "status" key
+      metrics(label)               -> tuple, lower is better on every entry
+      viable(mask, last)           -> False when no passing completion of a
+                                      route that visited `mask` and ended at
+                                      `last` can exist (skipped unsimulated)
+
+    Within a group, a label dominates another when it is no worse on every
+    metric and either strictly better on one or earlier in permutation
+    order (the exhaustive tie-break). Labels with k or more dominators can
+    never reach the top k and are dropped.
+    """
+
+    def __init__(self, n_stops, root, leg, advance, metrics=None, viable=None):
+        self.n_stops = n_stops
+        self.root = dict(root, sequence=())
+        self.leg = leg
+        self.advance = advance
+        self.metrics = metrics
+        self.viable = viable or (lambda mask, last: True)
+        self.legs_simulated = 0
+
+    def _child(self, label, stop, outcome):
+        child = self.advance(label, stop, outcome)
+        child["sequence"] = label["sequence"] + (stop,)
+        return child
+
+    def _insert(self, bucket, child, k):
+        if self.metrics is None:
+            bucket.append([None, child["sequence"], child, 0])
+            return
+
+        metrics = self.metrics(child)
+        sequence = child["sequence"]
+
+        # Buckets are sorted by (metrics, sequence): dominators of an entry
+        # always sort before it, and entries it dominates sort after it, so
+        # the sequence tie-break needs no check and dominance is just <= on
+        # every metric.
+        pos = bisect.bisect_left(bucket, (metrics, sequence), key=lambda e: (e[0], e[1]))
+
+        beaten_by = 0
+        for j in range(pos):
+            if all(map(le, bucket[j][0], metrics)):
+                beaten_by += 1
+                if beaten_by >= k:
+                    return
+
+        bucket.insert(pos, [metrics, sequence, child, beaten_by])
+
+        # Every entry keeps its dominator count. Dominance is transitive, so
+        # a dropped entry's k dominators also dominate whatever it did and
+        # counts never have to be taken back: one pass per insert.
+        for i in range(len(bucket) - 1, pos, -1):
+            entry = bucket[i]
+            if all(map(le, metrics, entry[0])):
+                entry[3] += 1
+                if entry[3] >= k:
+                    del bucket[i]
+
+    def best_labels(self, k=3, bound=None, threshold=None):
+        """
+        Complete, passing labels (unordered). Any ordering missing from the
+        result is dominated by at least k returned orderings, or has
+        bound(label) below `threshold` on some prefix (e.g. the k-th best
+        score of routes already known to pass).
+        """
+        layer = {(0, -1): [[None, (), self.root, 0]]}
+
+        for _ in range(self.n_stops):
+            next_layer = {}
+
+            for (mask, _), labels in layer.items():
+                for stop in range(self.n_stops):
+                    if mask & (1 << stop):
+                        continue
+                    if not self.viable(mask | (1 << stop), stop):
+                        continue
+
+                    outcome = self.leg(labels[0][2], stop)
+                    self.legs_simulated += 1
+
+                    key = (mask | (1 << stop), stop)
+
+                    for _, _, label, _ in labels:
+                        child = self._child(label, stop, outcome)
+                        if child["status"] != "PASS":
+                            continue
+                        if threshold is not None and bound(child) < threshold:
+                            continue
+                        self._insert(next_layer.setdefault(key, []), child, k)
+
+            layer = next_layer
+
+        return [entry[2] for labels in layer.values() for entry in labels]
+
+    def failed_routes(self, limit):
+        """
+        First `limit` failing orderings in itertools.permutations order,
+        as (sequence, failing label) pairs. Every completion of a failed
+        prefix shares the label of that prefix.
+        """
+        found = []
+
+        def walk(label, mask):
+            for stop in range(self.n_stops):
+                if len(found) >= limit:
+                    return
+                if mask & (1 << stop):
+                    continue
+
+                child = self._child(label, stop, self.leg(label, stop))
+                self.legs_simulated += 1
+                child_mask = mask | (1 << stop)
+
+                if child["status"] == "PASS":
+                    walk(child, child_mask)
+                    continue
+
+                rest = [s for s in range(self.n_stops) if not child_mask & (1 << s)]
+                for tail in itertools.permutations(rest):
+                    if len(found) >= limit:
+                        return
+                    found.append((child["sequence"] + tail, child))
+
+        if limit > 0:
+            walk(self.root, 0)
+
+        return found
+
+    def branch_and_bound(self, k, bound, score, order=None, incumbents=(), limit=None):
+        """
+        Depth-first search that keeps the k best complete routes and drops a
+        partial route once bound(label) falls below the current k-th best.
+
+        bound(label)  -> upper bound on score() of any passing completion
+        score(label)  -> score of a complete, passing label (higher is better)
+        order(label, stops) -> optional visiting order for the open stops
+        incumbents    -> stop sequences (e.g. yesterday's best) simulated
+                         first to seed the k-th best threshold
+        limit         -> stop once this many complete routes were scored
+                         (the result is then not the exact top k)
+
+        Failed legs (fuel, hard gate, policy threshold) end their subtree.
+        Returns the k best labels, best first; ties keep permutation order.
+        """
+        full = (1 << self.n_stops) - 1
+        best = TopK(k)
+        offered = set()
+
+        def threshold():
+            return -best.worst()[0] if best.full() else None
+
+        def offer(label):
+            if label["sequence"] in offered:
+                return
+            offered.add(label["sequence"])
+            best.push((-score(label), label["sequence"]), label)
+
+        def walk(label, mask):
+            if mask == full:
+                offer(label)
+                return
+
+            stops = [stop for stop in range(self.n_stops) if not mask & (1 << stop)]
+            if order is not None:
+                stops = order(label, stops)
+
+            label_bound = bound(label)
+
+            for stop in stops:
+                if limit is not None and len(offered) >= limit:
+                    return
+                kth = threshold()
+                if kth is not None and label_bound < kth:
+                    return
+                if not self.viable(mask | (1 << stop), stop):
+                    continue
+
+                child = self._child(label, stop, self.leg(label, stop))
+                self.legs_simulated += 1
+
+                if child["status"] != "PASS":
+                    continue
+
+                kth = threshold()
+                if kth is not None and bound(child) < kth:
+                    continue
+
+                walk(child, mask | (1 << stop))
+
+        for sequence in incumbents:
+            label, mask = self.root, 0
+            for stop in sequence:
+                label = self._child(label, stop, self.leg(label, stop))
+                self.legs_simulated += 1
+                mask |= 1 << stop
+                if label["status"] != "PASS":
+                    break
+            else:
+                if mask == full:
+                    offer(label)
+
+        walk(self.root, 0)
+
+        return best.items()
@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import random
+import time
+
+from mission_inputs import load_inputs, load_json
+from mission_planning_engine import plan_routes, with_fuel_load
+from planning_context import PlanningContext
+
+SEARCH_MODES = ("dp", "bnb", "exhaustive")
+
+
+def synthetic_inputs(directory, n_stops, seed=0, location_path="location_params.json",
+                     mission_path="payloads.json", alternate_path="alternate_airports.json"):
+    """
+    Mission inputs with `n_stops` deliveries to seeded random airstrips
+    around the origin of `mission_path`, written to `directory` and loaded
+    from there. The airstrips are low with long runways and mild weather,
+    so most orderings pass and the search has to rank them.
+    """
+    rng = random.Random(seed)
+
+    location_data = load_json(location_path)
+    mission_data = load_json(mission_path)
+    origin = location_data["locations"][mission_data["origin"].lower()]
+
+    deliveries = []
+    for i in range(n_stops):
+        key = f"strip{i:02d}"
+        location_data["locations"][key] = {
+            "name": key,
+            "icao": f"WX{i:02d}",
+            "elevation_ft": rng.choice([100, 300, 600, 900]),
+            "coords": [origin["coords"][0] + rng.uniform(-1.2, 1.2), origin["coords"][1] + rng.uniform(-1.0, 1.5)],
+            "surface": "Aspal",
+            "runway_length": 2500,
+            "runway_heading_deg": 100,
+            "weather": {
+                "oat_c": rng.randint(15, 25),
+                "qnh_hpa": rng.randint(1004, 1012),
+                "wind_speed_mps": rng.uniform(0, 3),
+                "visibility_km": 10
+            }
+        }
+        deliveries.append({"destination": key, "weight_kg": rng.choice([50, 80, 100, 150]), "priority": "High"})
+
+    mission_data["deliveries"] = deliveries
+    mission_data["total_payload_kg"] = sum(d["weight_kg"] for d in deliveries)
+
+    paths = [os.path.join(directory, os.path.basename(path)) for path in (location_path, mission_path, alternate_path)]
+    for path, data in zip(paths, (location_data, mission_data, load_json(alternate_path))):
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    return load_inputs(*paths)
+
+def time_search(inputs, search, top_k=3, fuel_load=None):
+    """(seconds, plan_routes output) for one search mode on a fresh context."""
+
+    mission_data = with_fuel_load(inputs["mission_data"], fuel_load) if fuel_load else None
+    ctx = PlanningContext(inputs, mission_data)
+
+    start = time.perf_counter()
+    output = plan_routes(ctx, search, top_k)
+
+    return time.perf_counter() - start, output
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Planning time of the route search modes on synthetic missions of growing size"
+    )
+    parser.add_argument("--stops", default="6,8,10,12", help="comma-separated delivery counts (default: 6,8,10,12)")
+    parser.add_argument("--search", default="dp,bnb", help="comma-separated search modes; the first is the reference")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--fuel-load", choices=["dispatch", "minimum"])
+    parser.add_argument("--workdir", default=".aerobridge_cache/benchmark", help="where the synthetic inputs are written")
+    args = parser.parse_args()
+
+    modes = args.search.split(",")
+    for mode in modes:
+        if mode not in SEARCH_MODES:
+            parser.error(f"unknown search mode: {mode}")
+
+    print("stops  " + "  ".join(f"{mode:>10}" for mode in modes) + "  same")
+
+    for n_stops in [int(n) for n in args.stops.split(",")]:
+        directory = os.path.join(args.workdir, f"{n_stops}_{args.seed}")
+        os.makedirs(directory, exist_ok=True)
+        inputs = synthetic_inputs(directory, n_stops, args.seed)
+
+        results = [time_search(inputs, mode, args.top_k, args.fuel_load) for mode in modes]
+        same = all(output == results[0][1] for _, output in results)
+
+        print(f"{n_stops:>5}  " + "  ".join(f"{seconds:>9.3f}s" for seconds, _ in results) + f"  {'yes' if same else 'NO'}")
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,24 @@
 import json
-import math
+from aircraft_profiles import load_catalog
+from mission_inputs import load_inputs, load_json
 
-with open("hard_gate_output.json") as f:
-    hard_gate_data = json.load(f)
 
-with open("location_params.json") as f:
-    location_data = json.load(f)
+def get_aircraft_params(catalog, aircraft_name):
 
-with open("aircraft_parameters.json") as f:
-    aircraft_data = json.load(f)
-
-with open("payloads.json") as f:
-    mission_data = json.load(f)
-
-def haversine_nm(lat1, lon1, lat2, lon2):
-    R_km = 6371
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-
-    a = math.sin(dphi/2)**2 + \
-        math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
-
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return (R_km * c) * 0.539957
-
-
-def get_aircraft_params(aircraft_name):
-
-    for category in aircraft_data:
-        for model in aircraft_data[category]:
-            if model.lower() == aircraft_name.lower():
-
-                params = aircraft_data[category][model]
-
-                def get_val(key, default=0):
-                    return params.get(key, {}).get("value", default)
+    try:
+        params = catalog.params(aircraft_name)
+    except KeyError:
+        return None
 
-                return {
-                    "cruise": get_val("Cruise Speed") or 120,
-                    "roc": get_val("Rate of Climb") or 1000,
-                    "service_ceiling": get_val("Service Ceiling") or 20000,
-                    "max_crosswind": get_val("Max Crosswind") or 20
-                }
+    def get_val(key, default=0):
+        return params.get(key, {}).get("value", default)
 
-    return None
+    return {
+        "cruise": get_val("Cruise Speed") or 120,
+        "roc": get_val("Rate of Climb") or 1000,
+        "service_ceiling": get_val("Service Ceiling") or 20000,
+        "max_crosswind": get_val("Max Crosswind") or 20
+    }
 
 def extract_margin(check_name, check_data):
 
@@ -103,14 +76,12 @@ def compute_environmental_risk(ac, location):
 
     return max(0, round(R_env, 4))
 
-def compute_temporal_stress(ac, origin, destination):
+def compute_temporal_stress(ac, location_data, distances, origin_key, destination_key):
 
-    distance_nm = haversine_nm(
-        origin["coords"][0],
-        origin["coords"][1],
-        destination["coords"][0],
-        destination["coords"][1]
-    )
+    origin = location_data["locations"][origin_key]
+    destination = location_data["locations"][destination_key]
+
+    distance_nm = distances.distance_nm(origin_key, destination_key)
 
     cruise_time = distance_nm / ac["cruise"] if ac["cruise"] > 0 else 0
 
@@ -153,17 +124,10 @@ def find_minimum_margin(aircraft_data):
         "value": round(min_margin, 4)
     }
 
-origin_key = mission_data["origin"].lower()
-origin = location_data["locations"][origin_key]
+def analyze_aircraft_margins(aircraft_name, aircraft_result, location_data, origin_key, distances, catalog):
+    """Minimum-margin and tactical-risk sections for one aircraft's hard-gate results."""
 
-final_output = {
-    "mission_id": hard_gate_data["mission_id"],
-    "safety_margin_analysis": {}
-}
-
-for aircraft_name, aircraft_result in hard_gate_data["hard_gate_summary"].items():
-
-    ac = get_aircraft_params(aircraft_name)
+    ac = get_aircraft_params(catalog, aircraft_name)
 
     minimum_margin = find_minimum_margin(aircraft_result)
 
@@ -180,7 +144,7 @@ for aircraft_name, aircraft_result in hard_gate_data["hard_gate_summary"].items(
             continue
 
         env_risk = compute_environmental_risk(ac, location)
-        temp_stress = compute_temporal_stress(ac, origin, location)
+        temp_stress = compute_temporal_stress(ac, location_data, distances, origin_key, location_name)
 
         tactical_index = round(0.6 * env_risk + 0.4 * temp_stress, 4)
 
@@ -196,13 +160,45 @@ for aircraft_name, aircraft_result in hard_gate_data["hard_gate_summary"].items(
         reverse=True
     )
 
-    final_output["safety_margin_analysis"][aircraft_name] = {
+    return {
         "minimum_margin_section": minimum_margin,
         "highest_tactical_risk_section": tactical_sections[0] if tactical_sections else None,
         "all_tactical_sections": tactical_sections
     }
 
-with open("safety_margin_output.json", "w") as f:
-    json.dump(final_output, f, indent=2)
+def analyze_safety_margins(hard_gate_data, location_data, mission_data, distances, catalog=None):
+    """Minimum-margin and tactical-risk sections per aircraft from hard-gate results."""
+
+    catalog = catalog or load_catalog()
+
+    origin_key = mission_data["origin"].lower()
+
+    final_output = {
+        "mission_id": hard_gate_data["mission_id"],
+        "safety_margin_analysis": {}
+    }
+
+    for aircraft_name, aircraft_result in hard_gate_data["hard_gate_summary"].items():
+        final_output["safety_margin_analysis"][aircraft_name] = analyze_aircraft_margins(
+            aircraft_name, aircraft_result, location_data, origin_key, distances, catalog
+        )
+
+    return final_output
+
+def main():
+
+    inputs = load_inputs()
+    final_output = analyze_safety_margins(
+        load_json("hard_gate_output.json"),
+        inputs["location_data"],
+        inputs["mission_data"],
+        inputs["distances"]
+    )
+
+    with open("safety_margin_output.json", "w") as f:
+        json.dump(final_output, f, indent=2)
+
+    print("Safety Margin Analysis (Enhanced Tactical Version) completed.")
 
-print("Safety Margin Analysis (Enhanced Tactical Version) completed.")
+if __name__ == "__main__":
+    main()
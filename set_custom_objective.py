@@ -1,6 +1,26 @@
 import json
 import sys
 
+def apply_custom_objective(mission_data, weights, policy_id=None, thresholds=None):
+    """
+    Copy of a payloads.json style mission switched to a 'Custom' scenario,
+    so a planner can run it in memory (see planning_context.PlanningContext)
+    without touching payloads.json.
+    """
+    data = dict(mission_data)
+
+    data["scenario_id"] = "Custom"
+    custom_config = {"weights": weights}
+
+    if policy_id:
+        custom_config["policy_id"] = policy_id
+    elif thresholds:
+        custom_config["thresholds"] = thresholds
+
+    data["custom_config"] = custom_config
+
+    return data
+
 def set_custom_objective(weights, policy_id=None, thresholds=None):
     """
     Updates payloads.json with a 'Custom' scenario.
@@ -11,15 +31,7 @@ def set_custom_objective(weights, policy_id=None, thresholds=None):
         with open("payloads.json", "r") as f:
             data = json.load(f)
             
-        data["scenario_id"] = "Custom"
-        custom_config = {"weights": weights}
-        
-        if policy_id:
-            custom_config["policy_id"] = policy_id
-        elif thresholds:
-            custom_config["thresholds"] = thresholds
-            
-        data["custom_config"] = custom_config
+        data = apply_custom_objective(data, weights, policy_id, thresholds)
         
         with open("payloads.json", "w") as f:
             json.dump(data, f, indent=2)
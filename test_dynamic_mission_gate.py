@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from dynamic_mission_gate import run_aircraft_mission
+from mission_inputs import load_inputs
+
+
+def airstrip(name, lon, refuel=True):
+    # On the equator a degree of longitude is about 60 nm
+    return {
+        "name": name,
+        "icao": name.upper()[:4],
+        "elevation_ft": 100,
+        "coords": [0.0, lon],
+        "surface": "Aspal",
+        "runway_length": 2500,
+        "runway_heading_deg": 90,
+        "refuel": refuel,
+        "weather": {"oat_c": 20, "qnh_hpa": 1013, "wind_speed_mps": 0, "visibility_km": 10}
+    }
+
+def diversion_inputs(directory, payload_kg):
+    """
+    base -> drop (no fuel there) -> far, where far is out of reach even
+    through refuel stops. From drop the only alternate is beyond the fuel
+    left on board, but reachable by refueling back at base on the way.
+    """
+    location_data = {"locations": {
+        "base": airstrip("base", 0.0),
+        "drop": airstrip("drop", 1.0, refuel=False),
+        "far": airstrip("far", 30.0)
+    }}
+    alternate_data = {"alternates": {"alt": airstrip("alt", -1.6)}}
+    mission_data = {
+        "mission_id": "DIVERSION-TEST",
+        "origin": "base",
+        "scenario_id": "Custom",
+        "total_payload_kg": payload_kg + 100,
+        "deliveries": [
+            {"destination": "drop", "weight_kg": 100, "priority": "High"},
+            {"destination": "far", "weight_kg": payload_kg, "priority": "High"}
+        ],
+        "assigned_fleet": [{"aircraft_name": "Cessna 208b", "type": "Fixed Wing", "fuel_kg": 400}]
+    }
+
+    paths = [os.path.join(directory, name) for name in ("location_params.json", "payloads.json", "alternate_airports.json")]
+    for path, data in zip(paths, (location_data, mission_data, alternate_data)):
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    return load_inputs(*paths)
+
+def run(inputs):
+    return run_aircraft_mission(
+        inputs["mission_data"]["assigned_fleet"][0],
+        inputs["location_data"],
+        inputs["mission_data"],
+        inputs["alternate_data"],
+        inputs["distances"]
+    )
+
+
+def test_refuel_stop_diversion_counts_towards_totals(tmp_path):
+    inputs = diversion_inputs(str(tmp_path), 200)
+    distances = inputs["distances"]
+
+    result = run(inputs)
+    diversion = result["legs"][-1]
+
+    assert result["mission_status"] == "FAIL_FUEL_BEFORE_DEST"
+    assert diversion["diverted_to"] == "alt"
+    assert diversion["via"] == ["base"]
+
+    # Out to drop, back through base to alt, and home from alt
+    flown_nm = 2 * distances.distance_nm("base", "drop") + 2 * distances.distance_nm("base", "alt")
+    assert result["total_distance_nm"] == pytest.approx(flown_nm, abs=0.01)
+    assert result["total_time_hr"] == pytest.approx(flown_nm / 140, abs=0.01)
+
+
+def test_diversion_is_gated_with_the_cargo_on_board(tmp_path):
+    # Over gross weight with the undelivered cargo aboard: no diversion hop passes
+    result = run(diversion_inputs(str(tmp_path), 1800))
+
+    assert result["legs"][-1] == {"mission_abort": True, "reason": "Insufficient fuel even for alternate"}
@@ -0,0 +1,69 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from aircraft_profiles import build_aircraft
+from hard_feasibility_checks import FixedWingHardGate, RotaryWingHardGate, leg_arrays
+from mission_inputs import load_inputs
+from performance_tables import PerformanceCharts, model_chart
+
+AIRCRAFT = [
+    ("Cessna 208b", "Fixed Wing"),
+    ("EC725 Caracal", "Rotary Wing"),
+    ("Bell 412", "Rotary Wing"),
+    ("MI-17", "Rotary Wing")
+]
+
+PAYLOADS_KG = (0, 300, 900, 2500)
+FUELS_KG = (50, 400, 1200)
+
+
+@pytest.fixture(scope="module")
+def sample_legs():
+    """Every ordered pair of sample airports (locations and alternates) over the payload/fuel grid."""
+
+    inputs = load_inputs()
+    airports = dict(inputs["location_data"]["locations"])
+    airports.update(inputs["alternate_data"]["alternates"])
+
+    return [
+        {
+            "origin": airports[a],
+            "destination": airports[b],
+            "distance_nm": inputs["distances"].distance_nm(a, b),
+            "payload_kg": payload,
+            "fuel_onboard_kg": fuel
+        }
+        for (a, b), payload, fuel in itertools.product(itertools.permutations(airports, 2), PAYLOADS_KG, FUELS_KG)
+    ]
+
+
+@pytest.mark.parametrize("charted", [False, True])
+@pytest.mark.parametrize("name, ac_type", AIRCRAFT)
+def test_batch_matches_scalar(sample_legs, name, ac_type, charted):
+    ac = build_aircraft(name, ac_type)
+
+    # The analytic model, or the same model sampled as a chart table
+    charts = PerformanceCharts()
+    if charted:
+        charts = PerformanceCharts({ac.name: model_chart(ac, np.arange(0, 14001, 1000), np.linspace(ac.empty, ac.mtow, 11))})
+    gate = FixedWingHardGate(charts) if ac.type == "fixed" else RotaryWingHardGate(charts)
+
+    batch = gate.evaluate_batch(ac, leg_arrays(sample_legs))
+
+    for n, leg in enumerate(sample_legs):
+        details = gate.evaluate(ac, leg)
+        status = gate.evaluate_status(ac, leg, short_circuit=False)
+
+        mask = sum(1 << bit for bit, check in enumerate(gate.CHECKS) if details[check]["status"] == "FAIL")
+        assert int(batch["status"][n]) == mask
+        assert bool(batch["passed"][n]) == (status["hard_gate_overall_status"] == "PASS")
+        assert details["hard_gate_overall_status"] == status["hard_gate_overall_status"]
+
+        for key, margin in status["margins"].items():
+            assert batch["margins"][key][n] == pytest.approx(margin, rel=1e-12, abs=1e-9), key
+
+    # The grid must exercise both outcomes
+    assert batch["passed"].any() and not batch["passed"].all()
+    assert np.count_nonzero(batch["status"]) > 0
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import mission_planning_engine
+from mission_inputs import load_inputs, load_json
+from planning_context import PlanningContext
+from planning_service import PlanningClient, PlanningService
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    """PlanningClient of a one-worker service listening on a Unix socket in this process."""
+
+    unix_path = str(tmp_path_factory.mktemp("service") / "plan.sock")
+
+    started = {}
+
+    async def serve():
+        started["loop"] = asyncio.get_running_loop()
+        started["task"] = asyncio.current_task()
+        await PlanningService(jobs=1).serve(unix_path=unix_path)
+
+    def run():
+        try:
+            asyncio.run(serve())
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 30
+    while not os.path.exists(unix_path):
+        assert thread.is_alive() and time.monotonic() < deadline, "service did not start"
+        time.sleep(0.05)
+
+    yield PlanningClient(unix_path=unix_path)
+
+    started["loop"].call_soon_threadsafe(started["task"].cancel)
+    thread.join(30)
+
+
+def test_health(client):
+    health = client.health()
+
+    assert health["status"] == "ok"
+    assert health["jobs"] == 1
+
+
+def test_plan_matches_engine(client):
+    mission_data = load_json("payloads.json")
+
+    ctx = PlanningContext(load_inputs(), mission_data)
+    expected = mission_planning_engine.build_planning_report(ctx, mission_planning_engine.plan_routes(ctx, "bnb", 2))
+
+    assert client.plan(mission_data, "bnb", 2) == json.loads(json.dumps(expected))
+    assert client.health()["served"] >= 1
+
+
+@pytest.mark.parametrize("mission_data, search", [
+    ({"mission_id": "NO-FLEET", "origin": "timika", "deliveries": [], "total_payload_kg": 0}, "bnb"),
+    (None, "greedy")
+])
+def test_bad_request_is_rejected(client, mission_data, search):
+    if mission_data is None:
+        mission_data = load_json("payloads.json")
+
+    with pytest.raises(RuntimeError, match="returned 400"):
+        client.plan(mission_data, search)
@@ -0,0 +1,36 @@
+import pytest
+
+from mission_planning_engine import plan_routes, with_fuel_load
+from planning_context import PlanningContext
+from route_search_benchmark import synthetic_inputs
+
+CASES = [
+    # n_stops, seed, top_k, fuel_load, scenario_id, custom weights
+    (6, 0, 3, "dispatch", "Custom", None),
+    (7, 1, 3, "dispatch", "Custom", None),
+    (6, 2, 3, "minimum", "Custom", None),
+    (6, 3, 1, "dispatch", "Balanced", None),
+    (6, 4, 5, "dispatch", "Emergency", None),
+    (6, 5, 3, "dispatch", "Custom", {"delivery": 0.6, "temporal": 0, "fuel_efficiency": 0.2, "environmental": 0.1, "safety": 0.1}),
+    (6, 6, 3, "dispatch", "Custom", {"delivery": 0.6, "temporal": 0.2, "fuel_efficiency": 0.2, "environmental": 0.1, "safety": -0.1}),
+]
+
+
+@pytest.mark.parametrize("n_stops, seed, top_k, fuel_load, scenario_id, weights", CASES)
+def test_searches_match_exhaustive(tmp_path, n_stops, seed, top_k, fuel_load, scenario_id, weights):
+    inputs = synthetic_inputs(str(tmp_path), n_stops, seed)
+
+    mission_data = with_fuel_load(dict(inputs["mission_data"], scenario_id=scenario_id), fuel_load)
+    if weights is not None:
+        mission_data["custom_config"] = dict(mission_data["custom_config"], weights=weights)
+
+    results = {search: plan_routes(PlanningContext(inputs, mission_data), search, top_k) for search in ("exhaustive", "dp", "bnb")}
+
+    assert results["dp"] == results["exhaustive"]
+    assert results["bnb"] == results["exhaustive"]
+    assert any(
+        record["simulation"]["mission_status"] == "PASS"
+        for routes in results["exhaustive"]["route_planning"].values()
+        for record in routes
+    )
+
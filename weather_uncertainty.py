@@ -0,0 +1,288 @@
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from airport_store import load_store_inputs
+from hard_feasibility_checks import FixedWingHardGate, RotaryWingHardGate
+from leg_tensor import MARGIN_KEYS
+from mission_inputs import load_inputs
+from mission_planning_engine import FUEL_LOADS, aircraft_legs, fleet_member, plan_routes, required_margin, with_fuel_load
+from planning_context import PlanningContext, fork_context
+
+WEATHER_FIELDS = ("oat_c", "qnh_hpa", "wind_speed_mps", "visibility_km")
+
+# 1-sigma spread of each weather field around the reported value; an airport
+# record can override any of them with a "weather_uncertainty" object
+DEFAULT_SPREAD = {"oat_c": 2.0, "qnh_hpa": 1.5, "wind_speed_mps": 1.5, "visibility_km": 1.5}
+
+# Draws below zero are clipped for these fields
+NON_NEGATIVE = ("wind_speed_mps", "visibility_km")
+
+# Draws per seeded chunk; chunks are the unit of work handed to workers
+CHUNK_DRAWS = 5000
+
+QUANTILES = (0.05, 0.5, 0.95)
+
+# Leg fields that do not depend on the weather
+_LOAD_FIELDS = ("origin_elevation_ft", "elevation_ft", "runway_length", "payload_kg", "fuel_onboard_kg", "distance_nm")
+
+
+def weather_spread(airport, spread=None):
+    return dict(spread or DEFAULT_SPREAD, **airport.get("weather_uncertainty", {}))
+
+def sample_weather(airports, draws, rng, spread=None):
+    """
+    {field: [airport, draw] array}: independent normal draws around each
+    airport's reported weather, NON_NEGATIVE fields clipped at zero.
+    """
+    samples = {}
+
+    for field in WEATHER_FIELDS:
+        mean = np.array([a["weather"][field] for a in airports], dtype=float)[:, None]
+        sigma = np.array([weather_spread(a, spread)[field] for a in airports], dtype=float)[:, None]
+
+        values = rng.normal(mean, sigma, (len(airports), draws))
+        if field in NON_NEGATIVE:
+            np.maximum(values, 0, out=values)
+        samples[field] = values
+
+    return samples
+
+def route_legs(ctx, ac, evaluator, aircraft, route_sequence):
+    """
+    The weather-independent part of each leg of a route, flown as
+    simulate_route() flies it: departure fuel from the leg tensor, fuel
+    on board after the leg, payload dropped at each stop. Returns _LOAD_FIELDS
+    arrays per leg, the fuel check per leg and the destination keys.
+    """
+    tensor = aircraft_legs(ctx, ac, evaluator, aircraft)
+    locations = ctx.location_data["locations"]
+    weights = {d["destination"]: d["weight_kg"] for d in ctx.deliveries}
+
+    columns = {field: [] for field in _LOAD_FIELDS}
+    fuel_ok = []
+
+    current_key = ctx.origin_key
+    payload = ctx.total_payload_kg
+
+    for dest_key in route_sequence:
+        i, j = tensor.sources[current_key], tensor.targets[dest_key]
+        departure = tensor.departure_fuel(current_key, dest_key)
+
+        columns["origin_elevation_ft"].append(locations[current_key]["elevation_ft"])
+        columns["elevation_ft"].append(locations[dest_key]["elevation_ft"])
+        columns["runway_length"].append(locations[dest_key]["runway_length"])
+        columns["payload_kg"].append(payload)
+        columns["fuel_onboard_kg"].append(departure - tensor.fuel_kg[i, j])
+        columns["distance_nm"].append(tensor.distance_nm[i, j])
+        fuel_ok.append(tensor.required_kg[i, j] <= departure)
+
+        payload -= weights[dest_key]
+        current_key = dest_key
+
+    return {
+        "loads": {field: np.array(values, dtype=float) for field, values in columns.items()},
+        "fuel_ok": np.array(fuel_ok, dtype=bool),
+        "keys": list(route_sequence)
+    }
+
+
+def evaluate_draws(ctx, routes, seed, draws, spread=None):
+    """
+    One seeded chunk: samples the weather at every delivery airport `draws`
+    times and runs the legs of every route through evaluate_batch against
+    the same draws. Per route, [leg, draw] arrays of the gate status bits,
+    the scoring margin (MARGIN_KEYS) and whether the leg passes as the
+    planners judge it (fuel, hard gate, policy threshold).
+    """
+    rng = np.random.default_rng(seed)
+
+    keys = [d["destination"] for d in ctx.deliveries]
+    index = {key: n for n, key in enumerate(keys)}
+    samples = sample_weather([ctx.location_data["locations"][key] for key in keys], draws, rng, spread)
+
+    outcomes = []
+    for route in routes:
+        _, ac, evaluator = fleet_member(ctx, route["fleet_index"])
+        legs = route["legs"]
+        rows = [index[key] for key in legs["keys"]]
+
+        batch = {field: values[:, None] for field, values in legs["loads"].items()}
+        batch.update({field: samples[field][rows] for field in WEATHER_FIELDS})
+
+        # Draws are nearly all distinct and no threshold is compared against
+        # the scalar gates, so the powers need not be bit-exact
+        result = evaluator.evaluate_batch(ac, batch, exact=False)
+
+        margins = [result["margins"][key] for key in MARGIN_KEYS if key in result["margins"]]
+        margin = np.minimum.reduce(margins) if margins else np.full(result["passed"].shape, np.nan)
+
+        # Policy threshold as in leg_status: a leg without a margin is not held to it
+        policy_ok = np.isnan(margin) | (margin >= required_margin(ctx, ac))
+
+        outcomes.append({
+            "status": result["status"],
+            "margin": margin,
+            "passed": result["passed"] & policy_ok & legs["fuel_ok"][:, None]
+        })
+
+    return outcomes
+
+# Context and routes of the pool a worker process belongs to (set by its initializer)
+_worker_state = None
+
+def _init_worker(ctx, routes, spread):
+    global _worker_state
+    _worker_state = (ctx, routes, spread)
+
+def _worker_draws(seed, draws):
+    ctx, routes, spread = _worker_state
+    return evaluate_draws(ctx, routes, seed, draws, spread)
+
+
+def _quantiles(values):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    return {f"p{round(q * 100)}": round(float(v), 4) for q, v in zip(QUANTILES, np.quantile(values, QUANTILES))}
+
+def _probability(passed):
+    p = float(passed.mean())
+    return {"pass_probability": round(p, 4), "pass_probability_stderr": round(float(np.sqrt(p * (1 - p) / passed.size)), 4)}
+
+def summarize_route(ctx, route, outcomes):
+    """Pass probability and margin quantiles per leg and for the whole route."""
+
+    _, ac, _ = fleet_member(ctx, route["fleet_index"])
+    checks = FixedWingHardGate.CHECKS if ac.type == "fixed" else RotaryWingHardGate.CHECKS
+
+    status = np.concatenate([o["status"] for o in outcomes], axis=1)
+    margin = np.concatenate([o["margin"] for o in outcomes], axis=1)
+    passed = np.concatenate([o["passed"] for o in outcomes], axis=1)
+
+    legs = []
+    current_key = ctx.origin_key
+    for n, dest_key in enumerate(route["legs"]["keys"]):
+        legs.append({
+            "from": current_key,
+            "to": dest_key,
+            **_probability(passed[n]),
+            "fuel_ok": bool(route["legs"]["fuel_ok"][n]),
+            "check_failure_probability": {
+                check: round(float(((status[n] >> bit) & 1).mean()), 4) for bit, check in enumerate(checks)
+            },
+            "margin_quantiles": _quantiles(margin[n])
+        })
+        current_key = dest_key
+
+    with np.errstate(invalid="ignore"):
+        route_margin = np.fmin.reduce(margin, axis=0) if len(margin) else np.zeros(0)
+
+    return {
+        "route_sequence": route["legs"]["keys"],
+        "mission_status": route["mission_status"],
+        **_probability(passed.all(axis=0)),
+        "min_margin_quantiles": _quantiles(route_margin),
+        "legs": legs
+    }
+
+
+def weather_uncertainty(ctx, draws=20000, seed=0, jobs=1, search="bnb", top_k=3, spread=None):
+    """
+    Monte Carlo GO/NO-GO for the mission of a PlanningContext: plans the
+    top-k routes per fleet aircraft on the reported weather, then flies
+    them through `draws` weather samples per delivery airport.
+
+    The draws are split into CHUNK_DRAWS chunks, each seeded from its own
+    child of SeedSequence(seed), so the result depends only on the seed and
+    draw count, never on how chunks are spread over `jobs` worker processes.
+    Every route sees the same draws, so their probabilities compare directly.
+    """
+    planned = plan_routes(ctx, search, top_k)
+
+    routes = []
+    for i, aircraft in enumerate(ctx.fleet):
+        _, ac, evaluator = fleet_member(ctx, i)
+        for record in planned["route_planning"][aircraft["aircraft_name"]]:
+            routes.append({
+                "fleet_index": i,
+                "mission_status": record["simulation"]["mission_status"],
+                "legs": route_legs(ctx, ac, evaluator, aircraft, record["route_sequence"])
+            })
+
+    sizes = [min(CHUNK_DRAWS, draws - start) for start in range(0, draws, CHUNK_DRAWS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if jobs > 1 and len(sizes) > 1:
+        # Workers inherit the context and routes unpickled, so the pool must fork
+        pool = ProcessPoolExecutor(
+            jobs,
+            mp_context=fork_context(),
+            initializer=_init_worker,
+            initargs=(ctx, routes, spread)
+        )
+        with pool:
+            chunks = list(pool.map(_worker_draws, seeds, sizes))
+    else:
+        chunks = [evaluate_draws(ctx, routes, s, size, spread) for s, size in zip(seeds, sizes)]
+
+    report = {aircraft["aircraft_name"]: [] for aircraft in ctx.fleet}
+    for n, route in enumerate(routes):
+        summary = summarize_route(ctx, route, [chunk[n] for chunk in chunks])
+        report[ctx.fleet[route["fleet_index"]]["aircraft_name"]].append(summary)
+
+    locations = ctx.location_data["locations"]
+
+    return {
+        "mission_id": ctx.mission_data["mission_id"],
+        "draws": draws,
+        "seed": seed,
+        "weather_spread": {d["destination"]: weather_spread(locations[d["destination"]], spread) for d in ctx.deliveries},
+        "routes": report
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo hard-gate pass probability of the planned routes under weather uncertainty"
+    )
+    parser.add_argument("--draws", type=int, default=20000, help="weather samples per airport (default: 20000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes, each taking seeded chunks of draws")
+    parser.add_argument("--search", choices=["dp", "bnb", "exhaustive"], default="bnb")
+    parser.add_argument("--top-k", type=int, default=3, help="planned routes per aircraft to sample (default: 3)")
+    parser.add_argument("--fuel-load", choices=FUEL_LOADS, help="override every fleet entry's fuel_load (see mission_planning_engine.py)")
+    parser.add_argument(
+        "--spread",
+        action="append",
+        metavar="FIELD=SIGMA",
+        help=f"default 1-sigma spread of a weather field (repeatable; default: {DEFAULT_SPREAD})"
+    )
+    parser.add_argument("--store", metavar="DB", help="read airports and weather from an airport_store.py SQLite store")
+    parser.add_argument("--at", metavar="TIME", help="with --store: use the weather valid at this ISO 8601 time")
+    parser.add_argument("--output", default="weather_uncertainty_output.json")
+    args = parser.parse_args()
+
+    spread = dict(DEFAULT_SPREAD)
+    for item in args.spread or []:
+        field, _, sigma = item.partition("=")
+        if field not in WEATHER_FIELDS:
+            parser.error(f"unknown weather field: {field}")
+        spread[field] = float(sigma)
+
+    inputs = load_store_inputs(args.store, at=args.at) if args.store else load_inputs()
+    mission_data = with_fuel_load(inputs["mission_data"], args.fuel_load) if args.fuel_load else None
+    ctx = PlanningContext(inputs, mission_data)
+
+    output = weather_uncertainty(ctx, args.draws, args.seed, args.jobs, args.search, args.top_k, spread)
+
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+
+    print(f"Weather uncertainty analysis completed: {args.output}")
+
+if __name__ == "__main__":
+    main()